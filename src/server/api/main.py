@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from server.api.routers import chat_route, keyword_search_route
+from server.core.config import get_settings
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 from typing import List
 import logging
 
@@ -12,6 +16,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Brotli is optional, responses fall back to gzip when it is not installed
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+settings = get_settings()
+
 # Get environment variables
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 PORT = int(os.getenv("PORT", "8000"))
@@ -42,12 +54,30 @@ def get_allowed_origins() -> List[str]:
         logger.info(f"Development CORS origins: {origins}")
         return origins
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Application startup complete")
+    logger.info(f"Environment: {ENVIRONMENT}")
+    logger.info(f"Host: {HOST}")
+    logger.info(f"Port: {PORT}")
+    await keyword_search_route.build_suggest_index()
+    # Refreshes the dashboard snapshots whenever the corpus changes
+    snapshot_refresher = asyncio.create_task(keyword_search_route.refresh_dashboard_snapshots())
+    try:
+        yield
+    finally:
+        snapshot_refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshot_refresher
+        logger.info("Application shutdown")
+
 app = FastAPI(
     title="Caribbean Gender News Chat API",
     description="API for chatting with Caribbean gender news data",
     version="1.0.0",
     # Disable automatic trailing slash redirection
-    redirect_slashes=False
+    redirect_slashes=False,
+    lifespan=lifespan
 )
 
 # Configure CORS with dynamic origins
@@ -61,6 +91,19 @@ app.add_middleware(
     max_age=3600
 )
 
+# Compress responses larger than the threshold, preferring brotli when the client accepts it
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=settings.BROTLI_QUALITY,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_fallback=True
+    )
+    logger.info(f"Brotli/gzip compression enabled for responses over {settings.COMPRESSION_MINIMUM_SIZE} bytes")
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+    logger.info(f"Gzip compression enabled for responses over {settings.COMPRESSION_MINIMUM_SIZE} bytes")
+
 # Include routers
 app.include_router(chat_route.router, prefix="/chatbot/chat", tags=["chat"])
 app.include_router(keyword_search_route.router, prefix="/keyword-search", tags=["keyword-search"])
@@ -83,19 +126,6 @@ async def health_check():
     logger.info("Health check endpoint accessed")
     return {"status": "healthy"}
 
-# Add startup event handler
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application startup complete")
-    logger.info(f"Environment: {ENVIRONMENT}")
-    logger.info(f"Host: {HOST}")
-    logger.info(f"Port: {PORT}")
-
-# Add shutdown event handler
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Application shutdown")
-
 # Add this for direct execution
 if __name__ == "__main__":
     import uvicorn
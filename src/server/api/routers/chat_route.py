@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from ...core.logging import setup_logger
 from server.service.chat_service import ChatService
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = setup_logger(name=__name__)
 
 # Initialize service
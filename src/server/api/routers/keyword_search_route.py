@@ -6,21 +6,47 @@ It provides endpoints for retrieving country data and performing keyword searche
 
 Routes:
     - GET /countries: Retrieves list of unique countries
-    - GET /search: Search articles with filters
-    - GET /dashboards: Retrieves saved dashboards
+    - GET /search: Search articles with filters and an optional full-text query
+    - GET /export: Stream every article matching the filters as NDJSON or CSV
+    - GET /articles/{link_or_id}/related: Retrieves the articles nearest to an article
+    - GET /suggest: Autocomplete suggestions for titles, sources and countries
+    - GET /analytics: Article counts over time and top-N breakdowns for dashboards
+    - GET /cache/stats: Retrieves search result cache metrics
+    - GET /dashboards: Retrieves a page of saved dashboards
+    - GET /dashboards/{dashboard_id}/view: Retrieves a dashboard with its precomputed results
     - POST /dashboards: Save a new dashboard
     - PATCH /dashboards/{dashboard_id}: Update dashboard name
+
+The /countries and /search responses carry an ETag derived from the corpus version and the
+normalised query, so repeat requests with a matching If-None-Match get a 304 without touching
+MongoDB, and a Cache-Control header so browsers and CDNs can reuse them.
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Body, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from src.server.core.config import get_settings
 from src.server.core.logging import setup_logger
+from src.server.service.search_cache import normalise_search_params, make_etag, etag_matches
+from src.server.service.suggest_index import SUGGESTION_TYPES
+from src.server.service.related_articles_service import get_related_articles
+from src.server.service.export_service import iter_ndjson, iter_csv, iter_gzip
+from src.server.service.dashboard_service import get_dashboard_view, refresh_dashboard_snapshot, run_snapshot_refresher
 from src.server.service.search_service import (
     get_unique_countries, 
+    get_current_corpus_version,
     search_articles, 
+    iter_export_articles,
+    get_article_analytics,
+    get_suggestions,
+    suggest_index,
+    SEARCH_RESULT_FIELDS,
+    get_search_cache_stats,
     get_saved_dashboards,
+    DASHBOARD_FIELDS,
     save_dashboard,
     update_dashboard_name
 )
+import asyncio
 from typing import Optional, List
 from datetime import datetime
 from pydantic import BaseModel
@@ -28,6 +54,8 @@ from pydantic import BaseModel
 # Configure logging using our custom logger
 logger = setup_logger("server.api.routers.keyword_search_route")
 
+settings = get_settings()
+
 # Pydantic models
 class DashboardCreate(BaseModel):
     selected_keywords: List[str]
@@ -38,10 +66,34 @@ class DashboardCreate(BaseModel):
 class DashboardUpdate(BaseModel):
     dashboard_name: str
 
-router = APIRouter(tags=["keyword-search"])
+router = APIRouter(tags=["keyword-search"], default_response_class=ORJSONResponse)
+
+def build_cache_control(max_age: int) -> str:
+    """Builds the Cache-Control header value for a cacheable response"""
+    return f"public, max-age={max_age}, stale-while-revalidate={settings.HTTP_STALE_WHILE_REVALIDATE_SECONDS}"
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """Builds an empty 304 response carrying the validators of the current representation"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parses and validates a comma-separated fields parameter.
+    
+    Raises:
+        HTTPException: If a field is not a known article field
+    """
+    selected_fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    if selected_fields:
+        unknown_fields = [field for field in selected_fields if field not in SEARCH_RESULT_FIELDS]
+        if unknown_fields:
+            error_msg = f"Unknown fields: {', '.join(unknown_fields)}. Allowed fields: {', '.join(SEARCH_RESULT_FIELDS)}"
+            logger.error(error_msg)
+            raise HTTPException(status_code=400, detail=error_msg)
+    return selected_fields
 
 @router.get("/countries")
-async def get_countries():
+async def get_countries(request: Request, response: Response):
     """
     Retrieves a list of unique countries from the database.
     
@@ -53,8 +105,21 @@ async def get_countries():
     """
     logger.info("Received request for unique countries")
     try:
+        etag = make_etag("countries", get_current_corpus_version())
+        cache_control = build_cache_control(settings.COUNTRIES_HTTP_MAX_AGE_SECONDS)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            logger.info("Countries not modified, returning 304")
+            return not_modified_response(etag, cache_control)
+        
         countries = get_unique_countries()
         logger.info(f"Successfully retrieved {len(countries)} countries")
+        
+        # An empty list means the lookup failed, so do not let it be cached
+        if countries:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = cache_control
+        else:
+            response.headers["Cache-Control"] = "no-store"
         return {"countries": countries}
     except Exception as e:
         error_msg = f"Failed to retrieve countries: {str(e)}"
@@ -63,20 +128,28 @@ async def get_countries():
 
 @router.get("/search")
 async def search_news_articles(
+    request: Request,
     category: Optional[List[str]] = Query(default=None, alias="category[]"),
     country: Optional[List[str]] = Query(default=None, alias="country[]"),
     start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
     end_date: Optional[str] = Query(None, description="End date (ISO format)"),
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=50, description="Items per page")
+    page_size: int = Query(10, ge=1, le=50, description="Items per page"),
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to return, defaults to all"),
+    q: Optional[str] = Query(None, max_length=200, description="Words to search for in titles and summaries, ranked by relevance")
 ):
     """
-    Search articles with filters for categories, countries, and date range.
+    Search articles with filters for categories, countries, and date range,
+    and optionally a full-text query over titles and summaries.
     """
     logger.info("Received search request")
     logger.info(f"Raw category parameter: {category}")
     logger.info(f"Raw country parameter: {country}")
     logger.info(f"Raw date parameters: start={start_date}, end={end_date}")
+    logger.info(f"Raw text query: {q}")
+    
+    # Validate the requested fields for slim rows
+    selected_fields = parse_fields(fields)
     
     try:
         # Validate dates if provided
@@ -91,6 +164,15 @@ async def search_news_articles(
         
         logger.info(f"Processed categories: {categories}")
         logger.info(f"Processed countries: {countries}")
+        
+        # Answer conditional requests from the corpus version alone
+        etag = make_etag("search", get_current_corpus_version(), normalise_search_params(
+            categories, countries, start_date, end_date, page, page_size, selected_fields, q
+        ))
+        cache_control = build_cache_control(settings.SEARCH_HTTP_MAX_AGE_SECONDS)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            logger.info("Search results not modified, returning 304")
+            return not_modified_response(etag, cache_control)
             
         results = search_articles(
             categories=categories,
@@ -98,11 +180,18 @@ async def search_news_articles(
             start_date=start_date,
             end_date=end_date,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            fields=selected_fields,
+            q=q
         )
         
         logger.info(f"Search completed successfully. Found {results['total']} articles")
-        return results
+        
+        # Results are plain JSON types, so skip FastAPI's encoder and serialise with orjson directly
+        return ORJSONResponse(
+            content=results,
+            headers={"ETag": etag, "Cache-Control": cache_control}
+        )
         
     except ValueError as e:
         error_msg = f"Invalid date format: {str(e)}"
@@ -113,29 +202,306 @@ async def search_news_articles(
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+@router.get("/export")
+async def export_news_articles(
+    category: Optional[List[str]] = Query(default=None, alias="category[]"),
+    country: Optional[List[str]] = Query(default=None, alias="country[]"),
+    start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end_date: Optional[str] = Query(None, description="End date (ISO format)"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    compress: bool = Query(False, description="Gzip the export stream"),
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to export, defaults to all"),
+    q: Optional[str] = Query(None, max_length=200, description="Words to search for in titles and summaries")
+):
+    """
+    Streams every article matching the search filters, without the page size limit of /search.
+    Articles are read from a server-side cursor and encoded as they are sent, so memory use
+    does not grow with the size of the export. The cursor is opened before the response starts,
+    so a failing query is answered with an error status instead of a truncated export.
+    """
+    logger.info(f"Received export request: format={export_format}, compress={compress}")
+    selected_fields = parse_fields(fields)
+    
+    try:
+        # Validate dates if provided
+        if start_date:
+            datetime.fromisoformat(start_date)
+        if end_date:
+            datetime.fromisoformat(end_date)
+    except ValueError as e:
+        error_msg = f"Invalid date format: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    # Open the cursor before the response starts, so query and database errors get a status code
+    try:
+        articles = await asyncio.to_thread(
+            iter_export_articles,
+            categories=category or [],
+            countries=country or [],
+            start_date=start_date,
+            end_date=end_date,
+            fields=selected_fields,
+            q=q
+        )
+    except ValueError as e:
+        error_msg = f"Invalid export filters: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
+    except Exception as e:
+        error_msg = f"Failed to export articles: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+    
+    if export_format == "csv":
+        chunks = iter_csv(articles, selected_fields or SEARCH_RESULT_FIELDS)
+        media_type = "text/csv; charset=utf-8"
+    else:
+        chunks = iter_ndjson(articles)
+        media_type = "application/x-ndjson"
+    
+    headers = {
+        "Content-Disposition": f'attachment; filename="articles-export.{export_format}"',
+        "Cache-Control": "no-store"
+    }
+    # Setting Content-Encoding also stops the compression middleware from compressing twice
+    if compress:
+        chunks = iter_gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+@router.get("/articles/{link_or_id:path}/related")
+async def get_related(
+    link_or_id: str,
+    k: int = Query(5, ge=1, le=20, description="Number of related articles"),
+    category: Optional[List[str]] = Query(default=None, alias="category[]"),
+    country: Optional[List[str]] = Query(default=None, alias="country[]"),
+    start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end_date: Optional[str] = Query(None, description="End date (ISO format)")
+):
+    """
+    Retrieves the articles most similar to an article, using its stored summary embedding.
+    A link must be percent-encoded so that its own query string is not read as parameters.
+    
+    Args:
+        link_or_id: The article's link, or the ID of its vector store document
+        
+    Returns:
+        dict: Contains the 'article' and its 'related' articles
+        
+    Raises:
+        HTTPException: If the article is not found or the query fails
+    """
+    logger.info(f"Received related articles request for {link_or_id}")
+    try:
+        # Validate dates if provided
+        if start_date:
+            datetime.fromisoformat(start_date)
+        if end_date:
+            datetime.fromisoformat(end_date)
+        
+        results = await asyncio.to_thread(
+            get_related_articles,
+            link_or_id,
+            k=k,
+            categories=category or [],
+            countries=country or [],
+            start_date=start_date,
+            end_date=end_date
+        )
+        
+    except ValueError as e:
+        error_msg = f"Invalid date format: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
+    except Exception as e:
+        error_msg = f"Failed to retrieve related articles: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+    
+    if results is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return results
+
+async def build_suggest_index():
+    """Builds the autocomplete index, called from the app lifespan so the first lookups do not wait for it"""
+    try:
+        await asyncio.to_thread(suggest_index.build, get_current_corpus_version())
+    except Exception as e:
+        logger.warning(f"Failed to build suggest index at startup: {str(e)}")
+
+async def refresh_dashboard_snapshots():
+    """
+    Refreshes the stale dashboard snapshots whenever the corpus changes, run as a task from the app lifespan.
+    Shares the dashboard service with the view route so a refresh never overlaps a request-triggered rebuild.
+    """
+    await run_snapshot_refresher(settings.DASHBOARD_SNAPSHOT_REFRESH_SECONDS)
+
+@router.get("/suggest")
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=25, description="Maximum number of suggestions"),
+    types: Optional[List[str]] = Query(default=None, alias="type[]", description="Suggestion types: title, source, country")
+):
+    """
+    Retrieves autocomplete suggestions for article titles, sources and countries.
+    
+    Returns:
+        dict: Contains list of suggestions under 'suggestions' key
+        
+    Raises:
+        HTTPException: If a type is invalid or the lookup fails
+    """
+    if types:
+        unknown_types = [suggestion_type for suggestion_type in types if suggestion_type not in SUGGESTION_TYPES]
+        if unknown_types:
+            error_msg = f"Unknown types: {', '.join(unknown_types)}. Allowed types: {', '.join(SUGGESTION_TYPES)}"
+            logger.error(error_msg)
+            raise HTTPException(status_code=400, detail=error_msg)
+    
+    try:
+        return {"suggestions": get_suggestions(prefix, limit=limit, types=types)}
+    except Exception as e:
+        error_msg = f"Failed to retrieve suggestions: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@router.get("/analytics")
+async def get_analytics(
+    category: Optional[List[str]] = Query(default=None, alias="category[]"),
+    country: Optional[List[str]] = Query(default=None, alias="country[]"),
+    start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end_date: Optional[str] = Query(None, description="End date (ISO format)"),
+    granularity: str = Query("month", pattern="^(month|week)$", description="Time series bucket: month or week"),
+    top_n: int = Query(10, ge=1, le=50, description="Number of countries and categories in the breakdowns")
+):
+    """
+    Retrieves article counts over time and the top countries and categories for the filters.
+    
+    Returns:
+        dict: Contains 'series', 'top_countries', 'top_categories' and 'total'
+        
+    Raises:
+        HTTPException: If the dates are invalid or the query fails
+    """
+    logger.info("Received analytics request")
+    try:
+        # Validate dates if provided
+        if start_date:
+            datetime.fromisoformat(start_date)
+        if end_date:
+            datetime.fromisoformat(end_date)
+        
+        return get_article_analytics(
+            categories=category or [],
+            countries=country or [],
+            start_date=start_date,
+            end_date=end_date,
+            granularity=granularity,
+            top_n=top_n
+        )
+        
+    except ValueError as e:
+        error_msg = f"Invalid date format: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
+    except Exception as e:
+        error_msg = f"Failed to retrieve analytics: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Retrieves the search result cache metrics.
+    
+    Returns:
+        dict: Contains hit ratio, size and eviction metrics under 'cache' key
+    """
+    logger.info("Received request for search cache stats")
+    return {"cache": get_search_cache_stats()}
+
 @router.get("/dashboards")
-async def get_dashboards():
+async def get_dashboards(
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: Optional[int] = Query(None, ge=1, le=200, description="Dashboards per page, every dashboard when omitted"),
+    fields: Optional[str] = Query(None, description="Comma-separated dashboard fields to return")
+):
     """
-    Retrieves a list of saved dashboards from the database.
+    Retrieves a page of saved dashboards from the database, or all of them when no page_size is given.
     
     Returns:
-        dict: Contains list of dashboard names and their IDs
+        dict: Contains list of dashboards under 'dashboards' with pagination info
         
     Raises:
-        HTTPException: If database query fails
+        HTTPException: If the fields are invalid or the database query fails
     """
     logger.info("Received request for saved dashboards")
+    selected_fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    if selected_fields:
+        unknown_fields = [field for field in selected_fields if field not in DASHBOARD_FIELDS]
+        if unknown_fields:
+            error_msg = f"Unknown fields: {', '.join(unknown_fields)}. Allowed fields: {', '.join(DASHBOARD_FIELDS)}"
+            logger.error(error_msg)
+            raise HTTPException(status_code=400, detail=error_msg)
+    
     try:
-        dashboards = get_saved_dashboards()
-        logger.info(f"Successfully retrieved {len(dashboards)} dashboards")
-        return {"dashboards": dashboards}
+        results = get_saved_dashboards(page=page, page_size=page_size, fields=selected_fields)
+        logger.info(f"Successfully retrieved {len(results['dashboards'])} dashboards")
+        return results
     except Exception as e:
         error_msg = f"Failed to retrieve dashboards: {str(e)}"
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+@router.get("/dashboards/{dashboard_id}/view")
+async def view_dashboard(dashboard_id: str, request: Request, background_tasks: BackgroundTasks):
+    """
+    Retrieves a dashboard with the precomputed first page of its search, its facets and counts.
+    A stale snapshot is returned immediately and refreshed in the background.
+    
+    Args:
+        dashboard_id: ID of the dashboard to view
+        
+    Returns:
+        dict: Contains 'dashboard', 'snapshot' and 'stale'
+        
+    Raises:
+        HTTPException: If the dashboard is not found or the snapshot cannot be built
+    """
+    logger.info(f"Received request to view dashboard {dashboard_id}")
+    try:
+        # May build the snapshot inline, so it runs off the event loop
+        view = await asyncio.to_thread(get_dashboard_view, dashboard_id)
+    except Exception as e:
+        error_msg = f"Failed to retrieve dashboard view: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+    
+    if view is None:
+        raise HTTPException(status_code=404, detail="Dashboard not found")
+    
+    if view["stale"]:
+        logger.info(f"Snapshot for dashboard {dashboard_id} is stale, refreshing in the background")
+        background_tasks.add_task(refresh_dashboard_snapshot, dashboard_id)
+        # Stale snapshots must not be cached by the client
+        return ORJSONResponse(content=view, headers={"Cache-Control": "no-cache"})
+    
+    # The dashboard name can change without a new snapshot, so it is part of the ETag
+    cache_control = build_cache_control(settings.SEARCH_HTTP_MAX_AGE_SECONDS)
+    etag = make_etag(
+        "dashboard_view",
+        view["snapshot"]["corpus_version"],
+        {"dashboard_id": dashboard_id, "dashboard_name": view["dashboard"].get("dashboard_name")}
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag, cache_control)
+    
+    return ORJSONResponse(content=view, headers={"ETag": etag, "Cache-Control": cache_control})
+
 @router.post("/dashboards")
-async def create_dashboard(dashboard: DashboardCreate):
+async def create_dashboard(dashboard: DashboardCreate, background_tasks: BackgroundTasks):
     """
     Save a new dashboard with the selected filters.
     
@@ -169,6 +535,7 @@ async def create_dashboard(dashboard: DashboardCreate):
         )
         
         logger.info(f"Successfully saved dashboard: {dashboard_name}")
+        background_tasks.add_task(refresh_dashboard_snapshot, saved_dashboard["_id"])
         return {"dashboard": saved_dashboard}
         
     except ValueError as e:
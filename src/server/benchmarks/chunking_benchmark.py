@@ -0,0 +1,87 @@
+"""
+Chunking Benchmark
+
+Times the summariser's chunking of synthetic articles with a realistic spread of lengths: mostly
+news-length articles and a few very long pages. It compares the length-aware strategy (auto) with
+the SemanticChunker used for every article before (semantic), and reports the strategy each article
+took, the time per article and the time saved. The semantic mode loads the embedding model on its
+first article, which is reported separately and left out of the per-article time.
+
+Usage:
+    python -m server.benchmarks.chunking_benchmark
+    python -m server.benchmarks.chunking_benchmark --articles 50 --modes auto
+"""
+
+# Python Imports
+import argparse
+import random
+import time
+
+# Local Imports
+from server.service.news_articles.article_chunking import ChunkingStats, chunk_article, count_tokens
+
+WORDS = [
+    "the", "minister", "said", "government", "island", "women", "gender", "policy", "report",
+    "survey", "violence", "education", "health", "workers", "economy", "tourism", "climate",
+    "community", "leaders", "announced", "programme", "funding", "new", "law", "court", "police",
+    "students", "girls", "rights", "equality", "caribbean", "regional", "development", "support"
+]
+
+
+def make_article(generator: random.Random, words: int) -> str:
+    """An article of about the given number of words, in paragraphs of sentences."""
+    paragraphs = []
+    written = 0
+    while written < words:
+        sentences = []
+        for _ in range(generator.randint(2, 5)):
+            length = generator.randint(8, 25)
+            sentences.append(" ".join(generator.choice(WORDS) for _ in range(length)).capitalize() + ".")
+            written += length
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def make_articles(count: int, seed: int) -> list:
+    generator = random.Random(seed)
+    lengths = [generator.randint(200, 1500) if index % 10 else generator.randint(8000, 30000) for index in range(count)]
+    return [make_article(generator, length) for length in lengths]
+
+
+def run(mode: str, articles: list):
+    """Chunk every article, returning the stats, the seconds per article and the warm-up seconds."""
+    stats = ChunkingStats()
+    started = time.perf_counter()
+    chunk_article(articles[0], mode=mode)
+    warm_up = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for article in articles:
+        chunk_article(article, mode=mode, stats=stats)
+    return stats, (time.perf_counter() - started) / len(articles), warm_up
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare length-aware and semantic chunking of articles")
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--modes", default="auto,semantic")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles, args.seed)
+    tokens = sorted(count_tokens(article) for article in articles)
+    print(f"{len(articles)} articles, median {tokens[len(tokens) // 2]} tokens, longest {tokens[-1]} tokens")
+
+    per_article = {}
+    for mode in args.modes.split(","):
+        stats, seconds, warm_up = run(mode, articles)
+        per_article[mode] = seconds
+        print(f"{mode:<9} {seconds * 1000:>9.1f} ms/article, first call {warm_up:.1f}s, {stats.summary()}")
+
+    if {'auto', 'semantic'} <= set(per_article):
+        saved = per_article['semantic'] - per_article['auto']
+        print(f"Saved {saved * 1000:.1f} ms per article ({saved / per_article['semantic']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
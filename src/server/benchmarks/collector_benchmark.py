@@ -0,0 +1,91 @@
+"""
+Collector Benchmark
+
+Runs the async Newscatcher collector against the fake server in-process, once with a single
+request in flight and once with the configured concurrency, and reports the wall time, the number
+of requests and 429 responses, and the articles collected. The fake server adds latency to every
+response and enforces a rate limit, so the concurrent run has to stay under it. Both runs must
+collect the same articles.
+
+Usage:
+    python -m server.benchmarks.collector_benchmark
+    python -m server.benchmarks.collector_benchmark --queries 40 --latency 0.1 --rate-limit 10
+"""
+
+# Python Imports
+import argparse
+import asyncio
+import time
+
+# Third Party Imports
+import httpx
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app, load_fixture_keywords
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
+
+
+async def run_collector(app, queries, concurrency: int, rate: float, page_size: int):
+    """Collect every query from the fake server, returning the timings and the links collected."""
+    links = set()
+    requests_before = app.state.requests
+    limited_before = app.state.rate_limited
+
+    def on_page(query, page, articles):
+        links.update(article['link'] for article in articles)
+
+    collector = AsyncNewscatcherCollector(
+        api_key="benchmark",
+        base_url="http://fake",
+        concurrency=concurrency,
+        rate_per_second=rate,
+        page_size=page_size,
+        transport=httpx.ASGITransport(app=app)
+    )
+    started = time.perf_counter()
+    progress = await collector.collect(queries, "365 days ago", on_page=on_page)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'seconds': elapsed,
+        'requests': app.state.requests - requests_before,
+        'rate_limited': app.state.rate_limited - limited_before,
+        'complete': sum(1 for query_progress in progress.values() if query_progress.complete),
+        'links': links
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential against concurrent Newscatcher collection")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--corpus-size", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    app = create_app(args.corpus_size, args.latency, args.rate_limit)
+    # The most frequent keywords of the fake corpus, so queries span several pages
+    queries = load_fixture_keywords()[:args.queries]
+    # Stay a little under the server's limit, as the real settings do
+    rate = args.rate_limit * 0.9
+
+    print(f"{len(queries)} queries, {args.corpus_size} articles, latency {args.latency}s, "
+          f"server limit {args.rate_limit}/s, client rate {rate:.1f}/s")
+    print(f"{'concurrency':<12} {'seconds':>8} {'requests':>9} {'429s':>6} {'complete':>9} {'articles':>9}")
+
+    results = {}
+    for concurrency in (1, args.concurrency):
+        result = asyncio.run(run_collector(app, queries, concurrency, rate, args.page_size))
+        results[concurrency] = result
+        print(f"{concurrency:<12} {result['seconds']:>8.2f} {result['requests']:>9} {result['rate_limited']:>6} "
+              f"{result['complete']:>9} {len(result['links']):>9}")
+
+    sequential, concurrent = results[1], results[args.concurrency]
+    print(f"Speed-up: {sequential['seconds'] / concurrent['seconds']:.1f}x, "
+          f"same articles: {sequential['links'] == concurrent['links']}")
+
+
+if __name__ == "__main__":
+    main()
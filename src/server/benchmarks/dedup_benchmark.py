@@ -0,0 +1,88 @@
+"""
+Deduplication Benchmark
+
+Two parts, neither needing a database:
+
+1. Collects many keyword queries from the fake Newscatcher server through a LinkDeduplicator and
+   reports how many upserts the run-scoped link set saves, with the queries returning the most
+   duplicates.
+2. Fills a Bloom filter with synthetic stored links and reports its size, its measured false
+   positive rate and its lookup time.
+
+Usage:
+    python -m server.benchmarks.dedup_benchmark
+    python -m server.benchmarks.dedup_benchmark --queries 200 --stored-links 1000000
+"""
+
+# Python Imports
+import argparse
+import asyncio
+import time
+
+# Third Party Imports
+import httpx
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app, load_fixture_keywords
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
+from server.service.news_articles.link_deduplicator import BloomFilter, LinkDeduplicator
+
+
+def run_dedup(queries, corpus_size: int, page_size: int) -> LinkDeduplicator:
+    """Collect the queries, passing every page through a deduplicator without a Bloom filter."""
+    app = create_app(corpus_size)
+    deduplicator = LinkDeduplicator(collection=None, use_bloom_filter=False)
+    collector = AsyncNewscatcherCollector(
+        api_key="benchmark",
+        base_url="http://fake",
+        rate_per_second=1000,
+        page_size=page_size,
+        transport=httpx.ASGITransport(app=app)
+    )
+    asyncio.run(collector.collect(queries, "365 days ago", lambda query, page, articles: deduplicator.filter(query, articles)))
+    return deduplicator
+
+
+def run_bloom(stored_links: int, error_rate: float) -> None:
+    """Measure the false positive rate and lookup time of a Bloom filter of stored_links links."""
+    bloom_filter = BloomFilter(stored_links, error_rate)
+    started = time.perf_counter()
+    for index in range(stored_links):
+        bloom_filter.add(f"https://source{index % 500}.com/news/{index}")
+    build_seconds = time.perf_counter() - started
+
+    probes = 200_000
+    started = time.perf_counter()
+    false_positives = sum(1 for index in range(probes) if f"https://unseen{index % 500}.com/story/{index}" in bloom_filter)
+    lookup_seconds = time.perf_counter() - started
+
+    print(f"Bloom filter: {stored_links} links, {len(bloom_filter.bits) / 2 ** 20:.1f} MiB, "
+          f"{bloom_filter.hash_count} hashes, built in {build_seconds:.1f}s")
+    print(f"  false positive rate {false_positives / probes:.4%} (target {error_rate:.4%}), "
+          f"{lookup_seconds / probes * 1e6:.1f} µs per lookup")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure run-scoped link deduplication and the Bloom filter")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--corpus-size", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--stored-links", type=int, default=200_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    queries = load_fixture_keywords()[:args.queries]
+    deduplicator = run_dedup(queries, args.corpus_size, args.page_size)
+    received = sum(stats.received for stats in deduplicator.stats.values())
+    new = sum(stats.new for stats in deduplicator.stats.values())
+    print(f"{len(queries)} queries returned {received} articles, {new} distinct: "
+          f"{received - new} upserts saved ({(received - new) / max(received, 1):.1%})")
+    print("Queries with the most duplicates:")
+    for row in deduplicator.report(limit=0)[:10]:
+        print(f"  {row['query']:<30} {row['duplicate_ratio']:>7.1%} of {row['received']}")
+
+    run_bloom(args.stored_links, args.error_rate)
+
+
+if __name__ == "__main__":
+    main()
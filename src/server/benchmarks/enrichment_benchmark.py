@@ -0,0 +1,140 @@
+"""
+Enrichment Benchmark
+
+Compares the three-pass enrichment (summariser, Caribbean check and categoriser, the last two on
+the summary) with the fused enricher's single structured-output call, on a random sample of
+articles from MongoDB. The model is called for real and without the response cache, one article at
+a time, so the numbers are the cost and latency of each flow. It reports the model calls, input and
+output tokens and seconds per article of each flow, and how often the fused call agrees with the
+three passes on the category and the Caribbean flag. Nothing is written to the database.
+
+Usage:
+    python -m server.benchmarks.enrichment_benchmark
+    python -m server.benchmarks.enrichment_benchmark --articles 50
+"""
+
+# Python Imports
+import argparse
+import time
+from typing import Any, Dict
+
+# Third Party Imports
+from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Local Imports
+from server.service.llm_service import OpenAI
+from server.service.news_articles import news_article_categoriser as categoriser
+from server.service.news_articles import news_article_summariser as summariser
+from server.service.news_articles.article_chunking import chunk_article
+from server.service.news_articles.async_collector import COUNTRIES
+from server.service.news_articles.news_article_collector import connect_to_mongodb
+from server.service.news_articles.news_article_enricher import create_enrichment_chain
+from server.service.news_articles.news_article_updater import create_caribbean_prompt
+
+
+class TokenUsage(BaseCallbackHandler):
+    """Counts the model calls and tokens of the chains it is passed to"""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+                self.calls += 1
+                self.input_tokens += usage.get('input_tokens', 0)
+                self.output_tokens += usage.get('output_tokens', 0)
+
+
+def run_three_pass(chains: Dict[str, Any], content: str, usage: TokenUsage) -> Dict[str, str]:
+    config = {'callbacks': [usage]}
+    summary = chains['summary'].invoke({"context": chunk_article(content)}, config=config)
+    flag = chains['caribbean'].invoke({"countries": COUNTRIES, "article_summary": summary}, config=config)
+    category = chains['category'].invoke({
+        "categories": categoriser.categories,
+        "summary": summary,
+        "format_instructions": categoriser.format_instructions
+    }, config=config)
+    return {'category': category.category, 'is_caribbean': flag.is_caribbean}
+
+
+def run_fused(chain, content: str, usage: TokenUsage) -> Dict[str, str]:
+    context = "\n\n".join(chunk.page_content for chunk in chunk_article(content))
+    result = chain.invoke({"context": context}, config={'callbacks': [usage]})
+    if result['parsing_error'] is not None:
+        raise ValueError(str(result['parsing_error']))
+    return {'category': result['parsed'].category, 'is_caribbean': result['parsed'].is_caribbean}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare three-pass and fused article enrichment")
+    parser.add_argument("--articles", type=int, default=20)
+    args = parser.parse_args()
+
+    # The provider's model, without the response cache the stages use
+    model = OpenAI().get_model("gpt4o")
+    caribbean_parser, caribbean_prompt = create_caribbean_prompt()
+    three_pass_chains = {
+        'summary': create_stuff_documents_chain(llm=model, prompt=summariser.stuff_prompt),
+        'caribbean': caribbean_prompt | model | caribbean_parser,
+        'category': categoriser.prompt | model | categoriser.parser
+    }
+    fused_chain = create_enrichment_chain(model)
+
+    client, collection = connect_to_mongodb()
+    try:
+        articles = list(collection.aggregate([
+            {'$match': {'content': {'$nin': [None, ""]}}},
+            {'$sample': {'size': args.articles}},
+            {'$project': {'content': 1}}
+        ]))
+    finally:
+        client.close()
+
+    flows = {'three-pass': TokenUsage(), 'fused': TokenUsage()}
+    seconds = dict.fromkeys(flows, 0.0)
+    errors = dict.fromkeys(flows, 0)
+    agreement = {'category': 0, 'is_caribbean': 0}
+    compared = 0
+    for article in articles:
+        results = {}
+        for flow, usage in flows.items():
+            started = time.perf_counter()
+            try:
+                if flow == 'fused':
+                    results[flow] = run_fused(fused_chain, article['content'], usage)
+                else:
+                    results[flow] = run_three_pass(three_pass_chains, article['content'], usage)
+            except Exception as e:
+                errors[flow] += 1
+                print(f"{flow} failed on article {article['_id']}: {str(e)}")
+            seconds[flow] += time.perf_counter() - started
+        if len(results) == len(flows):
+            compared += 1
+            for field in agreement:
+                agreement[field] += results['three-pass'][field] == results['fused'][field]
+
+    count = max(len(articles), 1)
+    print(f"{len(articles)} articles")
+    print(f"{'flow':<11} {'calls':>6} {'input tok':>10} {'output tok':>11} {'seconds':>8} {'errors':>7}  (per article)")
+    for flow, usage in flows.items():
+        print(f"{flow:<11} {usage.calls / count:>6.1f} {usage.input_tokens / count:>10.0f} "
+              f"{usage.output_tokens / count:>11.0f} {seconds[flow] / count:>8.2f} {errors[flow]:>7}")
+
+    three_pass, fused = flows['three-pass'], flows['fused']
+    if three_pass.input_tokens and seconds['three-pass']:
+        total_three_pass = three_pass.input_tokens + three_pass.output_tokens
+        total_fused = fused.input_tokens + fused.output_tokens
+        print(f"Fused saves {1 - total_fused / total_three_pass:.1%} of the tokens and "
+              f"{1 - seconds['fused'] / seconds['three-pass']:.1%} of the time")
+    if compared:
+        print(f"Agreement with the three passes: category {agreement['category'] / compared:.1%}, "
+              f"Caribbean flag {agreement['is_caribbean'] / compared:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Fake Newscatcher Server
+
+A local stand-in for the Newscatcher v3 /api/search endpoint, for benchmarking the collectors
+without calling the paid API. The corpus is generated deterministically from a seed: each article
+mentions a few keywords from topics_singleword_keywords.json among filler words. A query matches an
+article when any of its OR-combined terms appears in the article's title or content, and results
+are paginated, capped and sorted by date like the real API. Within an OR-combined term, words
+separated by spaces must all appear, as in the real query syntax.
+
+The server can add latency to every response and enforce a request rate limit, answering 429 with
+a Retry-After header when it is exceeded.
+
+Use it in-process through httpx.ASGITransport, or run it with uvicorn:
+    python -m server.benchmarks.fake_newscatcher --port 8765 --latency 0.05 --rate-limit 20
+"""
+
+# Python Imports
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Third Party Imports
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Maximum number of results the API returns for one search, whatever the number of pages
+MAX_RESULTS = 10_000
+
+FILLER_WORDS = (
+    "the government police report said year country people local court minister community "
+    "national public health school family support case law services week island officials"
+).split()
+
+KEYWORDS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'topics_singleword_keywords.json')
+
+# Words of a query term: quoted phrases or single words
+_WORD = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def load_fixture_keywords() -> List[str]:
+    """Load every keyword of topics_singleword_keywords.json, the vocabulary of the fake corpus."""
+    with open(KEYWORDS_FILE, 'r') as file:
+        keywords_data = json.load(file)
+    keywords = set()
+    for item in keywords_data:
+        for language_keywords in item.get('keywords', {}).values():
+            keywords.update(language_keywords)
+    return sorted(keywords)
+
+
+def generate_corpus(size: int, keywords: List[str], seed: int = 42, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Generate `size` articles, newest first, each mentioning one to three keywords and published
+    every 30 minutes back from `now`, the current hour by default.
+    Keyword popularity follows a long tail, so some keywords match far more articles than others.
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(keywords))]
+    now = now or datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    articles = []
+    for index in range(size):
+        mentioned = rng.choices(keywords, weights=weights, k=rng.randint(1, 3))
+        words = rng.choices(FILLER_WORDS, k=40) + mentioned
+        rng.shuffle(words)
+        published = now - timedelta(minutes=index * 30)
+        domain = f"source{rng.randrange(200)}.com"
+        articles.append({
+            'title': " ".join(words[:10]).capitalize(),
+            'content': " ".join(words),
+            'link': f"https://{domain}/news/{index}",
+            'domain_url': domain,
+            'published_date': published.strftime('%Y-%m-%d %H:%M:%S'),
+            'language': 'en',
+            'country': rng.choice(['JM', 'TT', 'BB', 'GY', 'HT'])
+        })
+    return articles
+
+
+def parse_query_terms(q: str) -> List[List[str]]:
+    """Split a query into its OR-combined terms, each a list of lowercase words that must all match."""
+    terms = []
+    for term in re.split(r'\s+OR\s+', q.strip()):
+        words = [(phrase or word).lower() for phrase, word in _WORD.findall(term)]
+        if words:
+            terms.append(words)
+    return terms
+
+
+def parse_from(value: Optional[str], now: datetime) -> datetime:
+    """Parse the 'from_' parameter: 'N days ago' or a date, with or without a time."""
+    if not value:
+        return now - timedelta(days=7)
+    match = re.fullmatch(r'\s*(\d+)\s+days?\s+ago\s*', value)
+    if match:
+        return now - timedelta(days=int(match.group(1)))
+    for date_format in ('%Y/%m/%d %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid from_: {value}")
+
+
+def create_app(
+    corpus_size: int = 20_000,
+    latency: float = 0.0,
+    rate_limit: Optional[float] = None,
+    retry_after: int = 1,
+    seed: int = 42
+) -> FastAPI:
+    """
+    Create the fake server.
+
+    Args:
+    corpus_size (int): Number of articles in the corpus.
+    latency (float): Seconds added to every response.
+    rate_limit (float): Requests per second allowed before answering 429, None for no limit.
+    retry_after (int): Retry-After value of 429 responses, in seconds.
+    seed (int): Seed of the generated corpus.
+
+    Returns:
+    FastAPI: The app. Its state holds the corpus and request counters.
+    """
+    app = FastAPI(title="Fake Newscatcher")
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    corpus = generate_corpus(corpus_size, load_fixture_keywords(), seed, now)
+    searchable = [(article, f"{article['title']} {article['content']}".lower()) for article in corpus]
+
+    app.state.corpus = corpus
+    app.state.requests = 0
+    app.state.rate_limited = 0
+    # One-second window counter for the rate limit
+    window = {'start': time.monotonic(), 'count': 0}
+
+    @app.get("/api/search")
+    async def search(request: Request):
+        app.state.requests += 1
+        if rate_limit is not None:
+            current = time.monotonic()
+            if current - window['start'] >= 1.0:
+                window['start'], window['count'] = current, 0
+            window['count'] += 1
+            if window['count'] > rate_limit:
+                app.state.rate_limited += 1
+                return JSONResponse(
+                    status_code=429,
+                    content={'message': 'Too many requests'},
+                    headers={'Retry-After': str(retry_after)}
+                )
+        if latency:
+            await asyncio.sleep(latency)
+
+        params = request.query_params
+        terms = parse_query_terms(params.get('q', ''))
+        page = int(params.get('page', 1))
+        page_size = int(params.get('page_size', 100))
+        from_date = parse_from(params.get('from_'), now).strftime('%Y-%m-%d %H:%M:%S')
+
+        matches = [
+            article for article, text in searchable
+            if article['published_date'] >= from_date
+            and any(all(word in text for word in term) for term in terms)
+        ]
+        total_hits = len(matches)
+        matches = matches[:MAX_RESULTS]
+        total_pages = math.ceil(len(matches) / page_size)
+        if not matches:
+            return {'status': 'No matches for your search.', 'total_hits': 0, 'page': page,
+                    'total_pages': 0, 'page_size': page_size, 'articles': []}
+        return {
+            'status': 'ok',
+            'total_hits': total_hits,
+            'page': page,
+            'total_pages': total_pages,
+            'page_size': page_size,
+            'articles': matches[(page - 1) * page_size:page * page_size]
+        }
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Newscatcher server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--corpus-size", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.corpus_size, args.latency, args.rate_limit), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
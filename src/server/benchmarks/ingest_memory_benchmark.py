@@ -0,0 +1,97 @@
+"""
+Ingest Memory Benchmark
+
+Collects the same queries from the fake Newscatcher server twice into a scratch MongoDB database:
+once accumulating every article before a single upload, as the collector used to, and once
+streaming each page into MongoDB as it arrives. tracemalloc reports the peak Python memory of each
+run. The streaming peak should stay flat as the number of queries grows.
+
+Usage:
+    python -m server.benchmarks.ingest_memory_benchmark --connection-string "mongodb://localhost:27017"
+    python -m server.benchmarks.ingest_memory_benchmark --queries 80 --page-size 1000
+"""
+
+# Python Imports
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+# Third Party Imports
+import httpx
+from pymongo import MongoClient
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app, load_fixture_keywords
+from server.core.config import get_settings
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
+from server.service.news_articles.news_article_collector import (
+    make_upload_sink,
+    new_upload_stats,
+    upload_articles_to_mongodb
+)
+
+SCRATCH_DATABASE = "ingest_memory_benchmark"
+
+
+def make_collector(app, page_size: int) -> AsyncNewscatcherCollector:
+    return AsyncNewscatcherCollector(
+        api_key="benchmark",
+        base_url="http://fake",
+        rate_per_second=1000,
+        page_size=page_size,
+        transport=httpx.ASGITransport(app=app)
+    )
+
+
+def accumulate_then_upload(app, collection, queries, page_size: int):
+    """The previous behaviour: every page is kept in one list, uploaded at the end."""
+    articles = []
+
+    def on_page(query, page, page_articles):
+        articles.extend(page_articles)
+
+    asyncio.run(make_collector(app, page_size).collect(queries, "365 days ago", on_page))
+    return upload_articles_to_mongodb(collection, articles)
+
+
+def stream_pages(app, collection, queries, page_size: int):
+    """Each page is upserted as it arrives."""
+    totals = new_upload_stats()
+    asyncio.run(make_collector(app, page_size).collect(queries, "365 days ago", make_upload_sink(collection, totals)))
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the peak memory of accumulated and streamed ingestion")
+    parser.add_argument("--connection-string", default=None)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--corpus-size", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app(args.corpus_size)
+    queries = load_fixture_keywords()[:args.queries]
+    client = MongoClient(args.connection_string or get_settings().MONGODB_CONNECTION_STRING)
+    try:
+        print(f"{len(queries)} queries, {args.corpus_size} articles, page size {args.page_size}")
+        print(f"{'mode':<12} {'seconds':>8} {'peak MiB':>9} {'received':>9} {'upserted':>9}")
+        for name, run in (("accumulate", accumulate_then_upload), ("stream", stream_pages)):
+            client.drop_database(SCRATCH_DATABASE)
+            collection = client[SCRATCH_DATABASE]["articles"]
+            collection.create_index([("link", 1)], unique=True)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            stats = run(app, collection, queries, args.page_size)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:<12} {elapsed:>8.2f} {peak / 2 ** 20:>9.1f} {stats['received']:>9} {stats['upserted']:>9}")
+    finally:
+        client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Near Duplicate Benchmark
+
+Generates a synthetic corpus in which some stories are syndicated under several links, each copy
+with a few words changed and its own byline and footer, and clusters it with the MinHasher and an
+LSHIndex as assign_duplicate_clusters does. It reports the signature throughput, the candidate
+comparisons made against all pairs, the precision and recall of the near duplicate pairs against
+the exact Jaccard similarity, the syndicated copies detected and the LLM calls the clusters save.
+No database is needed.
+
+Usage:
+    python -m server.benchmarks.near_duplicate_benchmark
+    python -m server.benchmarks.near_duplicate_benchmark --stories 1000 --threshold 0.8
+"""
+
+# Python Imports
+import argparse
+import random
+import time
+from itertools import combinations
+
+# Local Imports
+from server.service.news_articles.near_duplicates import ENRICHMENT_FIELDS, LSHIndex, MinHasher
+
+VOCABULARY = [
+    "government", "minister", "island", "tourism", "hurricane", "budget", "election", "police",
+    "court", "bank", "economy", "cricket", "festival", "school", "health", "hospital", "port",
+    "energy", "solar", "fisheries", "trade", "tax", "debt", "climate", "storm", "rainfall",
+    "airport", "cruise", "investment", "loan", "parliament", "opposition", "report", "survey",
+    "farmers", "prices", "fuel", "water", "roads", "housing", "crime", "youth", "teachers",
+    "students", "visitors", "hotel", "beach", "coral", "reef", "currency", "exports", "imports"
+]
+
+
+def make_story(generator: random.Random, words: int) -> list:
+    return [generator.choice(VOCABULARY) + str(generator.randint(0, 50)) for _ in range(words)]
+
+
+def syndicate(generator: random.Random, story: list, changed: float) -> str:
+    """A copy of a story with a fraction of its words changed and its own byline and footer."""
+    copy = [generator.choice(VOCABULARY) if generator.random() < changed else word for word in story]
+    byline = f"By staff reporter {generator.randint(0, 999)} for outlet {generator.randint(0, 99)}"
+    footer = f"Read more stories from outlet {generator.randint(0, 99)} online"
+    return " ".join([byline, *copy, footer])
+
+
+def make_corpus(stories: int, copies: int, words: int, changed: float, seed: int):
+    """Articles as (story, text), the first stories syndicated into several copies."""
+    generator = random.Random(seed)
+    corpus = []
+    for story_index in range(stories):
+        story = make_story(generator, words)
+        count = generator.randint(2, copies) if story_index % 4 == 0 else 1
+        corpus.extend((story_index, syndicate(generator, story, changed)) for _ in range(count))
+    generator.shuffle(corpus)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MinHash LSH near duplicate detection on a synthetic corpus")
+    parser.add_argument("--stories", type=int, default=600)
+    parser.add_argument("--copies", type=int, default=6, help="Maximum copies of a syndicated story")
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--changed", type=float, default=0.01, help="Fraction of words changed in each copy")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    hasher = MinHasher()
+    corpus = make_corpus(args.stories, args.copies, args.words, args.changed, args.seed)
+
+    started = time.perf_counter()
+    signatures = [hasher.signature(text) for _, text in corpus]
+    bands = [hasher.band_keys(signature) for signature in signatures]
+    signature_seconds = time.perf_counter() - started
+
+    # Cluster in order, like assign_duplicate_clusters does in _id order
+    index = LSHIndex(hasher)
+    comparisons = 0
+    duplicates = 0
+    found_pairs = set()
+    started = time.perf_counter()
+    for position, signature in enumerate(signatures):
+        cluster, best = None, args.threshold
+        for candidate in index.candidates(bands[position]):
+            comparisons += 1
+            similarity = hasher.similarity(signature, index.entries[candidate]['signature'])
+            if similarity >= args.threshold:
+                found_pairs.add((candidate, position))
+            if similarity >= best:
+                cluster, best = index.entries[candidate]['cluster'], similarity
+        duplicates += cluster is not None
+        index.add(position, signature, bands[position], cluster if cluster is not None else position)
+    cluster_seconds = time.perf_counter() - started
+
+    shingles = [hasher.shingles(text) for _, text in corpus]
+    true_pairs = {
+        (first, second) for first, second in combinations(range(len(corpus)), 2)
+        if len(shingles[first] & shingles[second]) / len(shingles[first] | shingles[second]) >= args.threshold
+    }
+    true_positives = len(found_pairs & true_pairs)
+    syndicated = len(corpus) - len({story for story, _ in corpus})
+    wrong_clusters = sum(
+        1 for position in range(len(corpus))
+        if corpus[index.entries[position]['cluster']][0] != corpus[position][0]
+    )
+
+    print(f"{len(corpus)} articles from {args.stories} stories, {syndicated} syndicated copies, "
+          f"{hasher.num_perm} permutations in {hasher.bands} bands of {hasher.rows}")
+    print(f"Signatures: {len(corpus) / signature_seconds:.0f} articles/s")
+    print(f"Clustering: {cluster_seconds:.2f}s, {comparisons} candidate comparisons instead of "
+          f"{len(corpus) * (len(corpus) - 1) // 2} pairs")
+    print(f"Pairs at Jaccard >= {args.threshold}: {len(true_pairs)} exact, {len(found_pairs)} found, "
+          f"precision {true_positives / max(len(found_pairs), 1):.3f}, recall {true_positives / max(len(true_pairs), 1):.3f}")
+    print(f"Syndicated copies detected: {duplicates} of {syndicated}, articles clustered with another story: {wrong_clusters}")
+    print(f"LLM calls saved: {duplicates * len(ENRICHMENT_FIELDS)} "
+          f"of {len(corpus) * len(ENRICHMENT_FIELDS)}")
+
+
+if __name__ == "__main__":
+    main()
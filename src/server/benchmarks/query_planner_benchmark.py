@@ -0,0 +1,81 @@
+"""
+Query Planner Benchmark
+
+Collects every keyword of topics_singleword_keywords.json from the fake Newscatcher server twice:
+once with one search per keyword, and once through the QueryPlanner's OR-combined batches. The
+fake corpus is generated from the same keywords, so some batches have more hits than the API
+returns and have to be split. The benchmark reports the requests made by each mode and checks that
+both collected exactly the same links. No database is needed.
+
+Usage:
+    python -m server.benchmarks.query_planner_benchmark
+    python -m server.benchmarks.query_planner_benchmark --corpus-size 50000 --max-length 200
+"""
+
+# Python Imports
+import argparse
+import asyncio
+import time
+
+# Third Party Imports
+import httpx
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
+from server.service.news_articles.news_article_collector import load_keywords_by_language
+from server.service.news_articles.query_planner import QueryPlanner
+
+
+def make_collector(app, page_size: int) -> AsyncNewscatcherCollector:
+    return AsyncNewscatcherCollector(
+        api_key="benchmark",
+        base_url="http://fake",
+        rate_per_second=1000,
+        page_size=page_size,
+        transport=httpx.ASGITransport(app=app)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-keyword searches with planned OR batches")
+    parser.add_argument("--corpus-size", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--max-length", type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(args.corpus_size)
+    keywords_by_language = load_keywords_by_language()
+    keywords = sorted({keyword for language_keywords in keywords_by_language.values() for keyword in language_keywords})
+
+    per_keyword_links = set()
+    collector = make_collector(app, args.page_size)
+    started = time.perf_counter()
+    asyncio.run(collector.collect(
+        keywords, "365 days ago",
+        lambda query, page, articles: per_keyword_links.update(article['link'] for article in articles)
+    ))
+    per_keyword = (time.perf_counter() - started, collector.requests_made)
+
+    planned_links = set()
+    collector = make_collector(app, args.page_size)
+    planner = QueryPlanner(args.max_length)
+    started = time.perf_counter()
+    asyncio.run(planner.collect(
+        collector, planner.plan(keywords_by_language), "365 days ago",
+        lambda query, page, articles: planned_links.update(article['link'] for article in articles)
+    ))
+    planned = (time.perf_counter() - started, collector.requests_made)
+
+    print(f"{len(keywords)} keywords, {args.corpus_size} articles, page size {args.page_size}, "
+          f"max query length {planner.max_length}")
+    print(f"{'mode':<12} {'seconds':>8} {'requests':>9} {'links':>7}")
+    print(f"{'per keyword':<12} {per_keyword[0]:>8.2f} {per_keyword[1]:>9} {len(per_keyword_links):>7}")
+    print(f"{'planned':<12} {planned[0]:>8.2f} {planned[1]:>9} {len(planned_links):>7}")
+    print(f"{planner.queries_planned} batches planned, {planner.splits} split, {planner.queries_searched} queries searched")
+    print(f"Calls saved: {per_keyword[1] - planned[1]} ({(per_keyword[1] - planned[1]) / per_keyword[1]:.1%}), "
+          f"same links: {per_keyword_links == planned_links}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Read Routing Check
+
+Runs one read per operation with the read preference the search service uses for it, and reports
+which replica set member served it. Command monitoring records the server address of every command.
+On a single-host replica set every read is served by the primary, because secondaryPreferred falls
+back to it. With secondaries present, the analytics operations should move to them.
+
+Start a local single-host replica set with:
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval 'rs.initiate()'
+
+Usage:
+    python -m server.benchmarks.read_routing_check --connection-string "mongodb://localhost:27017/?replicaSet=rs0"
+"""
+
+# Python Imports
+import argparse
+
+# Third Party Imports
+from pymongo import MongoClient, monitoring
+
+# Local Imports
+from server.core.config import get_settings
+from server.service.read_routing import ANALYTICS_OPERATIONS, read_preference_for
+
+SCRATCH_DATABASE = "read_routing_check"
+OPERATIONS = ("search", "countries", "dashboards") + ANALYTICS_OPERATIONS
+
+
+class ServerRecorder(monitoring.CommandListener):
+    """Records the address of the server that ran the last command."""
+
+    def __init__(self):
+        self.last_address = None
+
+    def started(self, event):
+        self.last_address = event.connection_id
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check which replica set member serves each operation")
+    parser.add_argument("--connection-string", default=None)
+    args = parser.parse_args()
+
+    recorder = ServerRecorder()
+    client = MongoClient(
+        args.connection_string or get_settings().MONGODB_CONNECTION_STRING,
+        event_listeners=[recorder]
+    )
+    try:
+        client[SCRATCH_DATABASE]["articles"].insert_one({"msbm_caribbean_article": "True"})
+        primary = client.primary
+        print(f"Primary: {primary}, secondaries: {sorted(client.secondaries) or 'none'}")
+        print(f"{'operation':<12} {'read preference':<55} {'served by':<22} {'member'}")
+
+        for operation in OPERATIONS:
+            read_preference = read_preference_for(operation)
+            collection = client.get_database(SCRATCH_DATABASE, read_preference=read_preference)["articles"]
+            collection.count_documents({"msbm_caribbean_article": "True"})
+            member = "primary" if recorder.last_address == primary else "secondary"
+            print(f"{operation:<12} {repr(read_preference):<55} {str(recorder.last_address):<22} {member}")
+    finally:
+        client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Search Serialisation Benchmark
+
+Compares the cost of encoding a /keyword-search/search response with FastAPI's default JSON encoder
+against orjson, and the bytes sent on the wire with and without gzip/brotli compression.
+Payloads are synthetic articles shaped like search_articles() results, so no database is needed.
+
+Usage:
+    python -m server.benchmarks.search_serialisation_benchmark
+"""
+
+# Python Imports
+import gzip
+import json
+import random
+import string
+import timeit
+
+# Third Party Imports
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+# Brotli is optional, its column is skipped when it is not installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAGE_SIZES = (10, 50)
+SLIM_FIELDS = ("title", "link", "published_date", "media_source")
+REPEATS = 200
+
+
+def random_words(count: int) -> str:
+    """Generate `count` random lowercase words."""
+    return " ".join(
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10)))
+        for _ in range(count)
+    )
+
+
+def make_article() -> dict:
+    """Generate a synthetic article shaped like a search result row."""
+    domain = f"{random_words(1)}.com"
+    return {
+        "title": random_words(12).capitalize(),
+        "link": f"https://www.{domain}/news/{random_words(5).replace(' ', '-')}",
+        "domain_url": f"https://www.{domain}",
+        "published_date": "2024-05-01",
+        "msbm_country_full_name": "Jamaica",
+        "msbm_category": "Gender Based Violence",
+        # Summaries are prompted for 75 words
+        "msbm_llm_summary": random_words(75),
+        "media_source": domain
+    }
+
+
+def make_payload(page_size: int, fields=None) -> dict:
+    """Generate a search response with `page_size` articles, optionally limited to `fields`."""
+    articles = [make_article() for _ in range(page_size)]
+    if fields:
+        articles = [{field: article[field] for field in fields} for article in articles]
+    return {"articles": articles, "total": 1000, "page": 1, "total_pages": 1000 // page_size}
+
+
+def encode_default(payload: dict) -> bytes:
+    """Encode the way FastAPI's default JSONResponse does."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_orjson(payload: dict) -> bytes:
+    """Encode the way ORJSONResponse does."""
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def time_per_call(func, payload: dict) -> float:
+    """Return the best average time of one call in microseconds."""
+    timings = timeit.repeat(lambda: func(payload), number=REPEATS, repeat=5)
+    return min(timings) / REPEATS * 1_000_000
+
+
+def main():
+    random.seed(42)
+
+    header = f"{'page':>5} {'rows':>5} {'default us':>11} {'orjson us':>10} {'raw B':>8} {'gzip B':>8}"
+    if brotli is not None:
+        header += f" {'brotli B':>9}"
+    print(header)
+
+    for page_size in PAGE_SIZES:
+        for label, fields in (("full", None), ("slim", SLIM_FIELDS)):
+            payload = make_payload(page_size, fields)
+            body = encode_orjson(payload)
+
+            # GZipMiddleware uses compresslevel 9
+            row = (
+                f"{page_size:>5} {label:>5} "
+                f"{time_per_call(encode_default, payload):>11.1f} "
+                f"{time_per_call(encode_orjson, payload):>10.1f} "
+                f"{len(body):>8} {len(gzip.compress(body, compresslevel=9)):>8}"
+            )
+            if brotli is not None:
+                row += f" {len(brotli.compress(body, quality=4)):>9}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Suggest Index Benchmark
+
+Builds the /keyword-search/suggest prefix index from synthetic articles and reports its build
+time, approximate memory use and the p50/p99 latency of lookups for prefixes of 1 to 6 characters.
+No database is needed.
+
+Usage:
+    python -m server.benchmarks.suggest_benchmark
+    python -m server.benchmarks.suggest_benchmark --articles 100000
+"""
+
+# Python Imports
+import argparse
+import random
+import string
+import time
+
+# Local Imports
+from server.service.suggest_index import PrefixIndex
+
+COUNTRIES = (
+    "Jamaica", "Trinidad and Tobago", "Barbados", "Guyana", "Haiti", "Bahamas", "Belize",
+    "Dominica", "Grenada", "Saint Lucia", "Saint Vincent and the Grenadines", "Antigua and Barbuda"
+)
+LOOKUPS = 20_000
+
+
+def random_word() -> str:
+    """Generate a random lowercase word."""
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10)))
+
+
+def make_entries(article_count: int, source_count: int):
+    """Generate the (type, value, link) tuples of `article_count` synthetic articles."""
+    sources = [f"{random_word()}{random_word()}.com" for _ in range(source_count)]
+    for index in range(article_count):
+        title = " ".join(random_word() for _ in range(random.randint(6, 14))).capitalize()
+        yield "title", title, f"https://example.com/news/{index}"
+        yield "source", random.choice(sources), None
+        yield "country", random.choice(COUNTRIES), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the suggest prefix index")
+    parser.add_argument("--articles", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--sources", type=int, default=2_000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'articles':>9} {'keys':>8} {'build s':>8} {'MiB':>6} {'p50 us':>7} {'p99 us':>7}")
+    for article_count in args.articles:
+        started = time.perf_counter()
+        index = PrefixIndex(make_entries(article_count, args.sources))
+        build_seconds = time.perf_counter() - started
+
+        prefixes = [
+            "".join(random.choices(string.ascii_lowercase, k=random.randint(1, 6)))
+            for _ in range(LOOKUPS)
+        ]
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.lookup(prefix, limit=10)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+
+        print(
+            f"{article_count:>9} {len(index):>8} {build_seconds:>8.2f} "
+            f"{index.memory_bytes() / (1024 * 1024):>6.1f} "
+            f"{timings[len(timings) // 2]:>7.1f} {timings[int(len(timings) * 0.99)]:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
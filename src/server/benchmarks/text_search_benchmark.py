@@ -0,0 +1,156 @@
+"""
+Text Search Benchmark
+
+Measures the latency of q= searches at different corpus sizes. Synthetic articles are inserted
+into a scratch database, indexed the same way as the articles collection, and queried with the
+count and page pipeline that search_articles() runs, followed by highlighting.
+The scratch collection is dropped afterwards.
+
+Requires a MongoDB server, by default the one in MONGODB_CONNECTION_STRING.
+
+Usage:
+    python -m server.benchmarks.text_search_benchmark
+    python -m server.benchmarks.text_search_benchmark --sizes 10000 100000 --connection-string mongodb://localhost:27017
+"""
+
+# Python Imports
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+# Third Party Imports
+from pymongo import ASCENDING, DESCENDING, MongoClient
+
+# Local Imports
+from server.core.config import get_settings
+from server.service.text_search import ensure_text_index, parse_text_query, add_highlights
+
+SCRATCH_DATABASE = "text_search_benchmark"
+SCRATCH_COLLECTION = "articles"
+INSERT_BATCH_SIZE = 5000
+PAGE_SIZE = 10
+RUNS_PER_QUERY = 20
+
+# Words that occur in most summaries, weighted towards the start of the list
+COMMON_WORDS = (
+    "the government police report women children said year country people local court "
+    "minister community national public health school family support case law services"
+).split()
+# Topic words that queries search for, each occurring in a small share of summaries
+TOPIC_WORDS = (
+    "violence domestic sexual abuse harassment gender equality femicide trafficking rape "
+    "shelter protection order survivor pregnancy teenage pay gap parliament quota"
+).split()
+COUNTRIES = ("Jamaica", "Trinidad and Tobago", "Barbados", "Guyana", "Haiti", "Bahamas")
+CATEGORIES = ("Gender-Based Violence", "Gender Inequality", "Sexual Harassment", "Femicide")
+
+QUERIES = (
+    "violence",
+    "domestic violence",
+    '"sexual harassment"',
+    "femicide trafficking",
+    "pay gap -parliament",
+)
+
+
+def make_summary() -> str:
+    """Generate a 75 word summary with a few topic words among common words."""
+    words = random.choices(COMMON_WORDS, weights=range(len(COMMON_WORDS), 0, -1), k=70)
+    words += random.sample(TOPIC_WORDS, k=5)
+    random.shuffle(words)
+    return " ".join(words)
+
+
+def make_article(index: int) -> dict:
+    """Generate a synthetic article with the fields the search query and text index use."""
+    return {
+        "title": " ".join(random.sample(TOPIC_WORDS, 2) + random.sample(COMMON_WORDS, 6)).capitalize(),
+        "link": f"https://example.com/news/{index}",
+        "msbm_llm_summary": make_summary(),
+        "msbm_country_full_name": random.choice(COUNTRIES),
+        "msbm_category": random.choice(CATEGORIES),
+        "msbm_caribbean_article": "True",
+        "msbm_published_date": datetime(2020, 1, 1) + timedelta(hours=random.randrange(5 * 365 * 24))
+    }
+
+
+def load_corpus(collection, size: int) -> None:
+    """Replace the scratch collection with `size` synthetic articles and index it."""
+    collection.drop()
+    for start in range(0, size, INSERT_BATCH_SIZE):
+        collection.insert_many([make_article(i) for i in range(start, min(start + INSERT_BATCH_SIZE, size))])
+    collection.create_index(
+        [
+            ("msbm_caribbean_article", ASCENDING),
+            ("msbm_country_full_name", ASCENDING),
+            ("msbm_category", ASCENDING),
+            ("msbm_published_date", DESCENDING)
+        ],
+        name="search_filters"
+    )
+    ensure_text_index(collection)
+
+
+def run_search(collection, q: str) -> int:
+    """Run the count and first page of a q= search the way search_articles() does."""
+    query = {
+        "msbm_category": {"$exists": True},
+        "msbm_country_full_name": {"$exists": True},
+        "msbm_published_date": {"$gte": datetime(1900, 1, 1), "$lt": datetime(2101, 1, 1)},
+        "msbm_caribbean_article": "True",
+        "$text": {"$search": q}
+    }
+    text_score = {"$meta": "textScore"}
+    total = collection.count_documents(query)
+    articles = list(collection.aggregate([
+        {"$match": query},
+        {"$sort": {"score": text_score}},
+        {"$skip": 0},
+        {"$limit": PAGE_SIZE},
+        {"$project": {"_id": 0, "title": 1, "link": 1, "msbm_llm_summary": 1, "score": text_score}}
+    ]))
+    terms = parse_text_query(q)
+    for article in articles:
+        add_highlights(article, terms)
+    return total
+
+
+def time_query(collection, q: str) -> tuple:
+    """Return the number of matches and the p50 and p95 latency of a query in milliseconds."""
+    total = run_search(collection, q)  # Warm up
+    timings = []
+    for _ in range(RUNS_PER_QUERY):
+        started = time.perf_counter()
+        run_search(collection, q)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return total, statistics.median(timings), p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark q= text search latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--connection-string", default=None)
+    args = parser.parse_args()
+
+    random.seed(42)
+    client = MongoClient(args.connection_string or get_settings().MONGODB_CONNECTION_STRING)
+    collection = client[SCRATCH_DATABASE][SCRATCH_COLLECTION]
+
+    print(f"{'articles':>9} {'query':<24} {'matches':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    try:
+        for size in args.sizes:
+            load_corpus(collection, size)
+            for q in QUERIES:
+                total, p50, p95 = time_query(collection, q)
+                print(f"{size:>9} {q:<24} {total:>8} {p50:>8.1f} {p95:>8.1f}")
+    finally:
+        client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Watermark Benchmark
+
+Runs the collector twice over the same queries against the fake Newscatcher server, into a scratch
+MongoDB database. The first run has no watermarks and fetches the full window. The second run is
+what a daily run looks like: it starts every query from its watermark minus the overlap. The
+benchmark reports the requests and articles transferred by each run.
+
+Usage:
+    python -m server.benchmarks.watermark_benchmark --connection-string "mongodb://localhost:27017"
+    COLLECTOR_WATERMARK_OVERLAP_HOURS=6 python -m server.benchmarks.watermark_benchmark --queries 40
+"""
+
+# Python Imports
+import argparse
+import time
+
+# Third Party Imports
+import httpx
+from pymongo import MongoClient
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app, load_fixture_keywords
+from server.core.config import get_settings
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
+from server.service.news_articles.collector_watermarks import WatermarkStore
+from server.service.news_articles.news_article_collector import collect_news_articles
+
+SCRATCH_DATABASE = "watermark_benchmark"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full collection with a watermarked one")
+    parser.add_argument("--connection-string", default=None)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--corpus-size", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    app = create_app(args.corpus_size)
+    queries = load_fixture_keywords()[:args.queries]
+    client = MongoClient(args.connection_string or get_settings().MONGODB_CONNECTION_STRING)
+    try:
+        client.drop_database(SCRATCH_DATABASE)
+        collection = client[SCRATCH_DATABASE]["articles"]
+        collection.create_index([("link", 1)], unique=True)
+
+        print(f"{len(queries)} queries, {args.corpus_size} articles over {args.corpus_size // 48} days, "
+              f"page size {args.page_size}, overlap {get_settings().COLLECTOR_WATERMARK_OVERLAP_HOURS}h")
+        print(f"{'run':<12} {'seconds':>8} {'requests':>9} {'articles':>9} {'upserted':>9}")
+        for name in ("full", "watermarked"):
+            collector = AsyncNewscatcherCollector(
+                api_key="benchmark",
+                base_url="http://fake",
+                rate_per_second=1000,
+                page_size=args.page_size,
+                transport=httpx.ASGITransport(app=app)
+            )
+            started = time.perf_counter()
+            stats = collect_news_articles("benchmark", queries, collection, collector=collector)
+            elapsed = time.perf_counter() - started
+            print(f"{name:<12} {elapsed:>8.2f} {collector.requests_made:>9} {stats['received']:>9} {stats['upserted']:>9}")
+
+        watermarks = WatermarkStore(collection.database).load(queries)
+        print(f"Watermarks stored for {len(watermarks)} of {len(queries)} queries")
+    finally:
+        client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
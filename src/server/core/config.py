@@ -39,6 +39,76 @@ class Settings(BaseSettings):
     LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt4o")
     MAX_HISTORY: int = int(os.getenv("MAX_HISTORY", "5"))
     
+    # Newscatcher Collector Settings
+    NEWSCATCHER_BASE_URL: str = os.getenv("NEWSCATCHER_BASE_URL", "https://v3-api.newscatcherapi.com")
+    NEWSCATCHER_CONCURRENCY: int = int(os.getenv("NEWSCATCHER_CONCURRENCY", "8"))
+    NEWSCATCHER_RATE_PER_SECOND: float = float(os.getenv("NEWSCATCHER_RATE_PER_SECOND", "5"))
+    NEWSCATCHER_MAX_RETRIES: int = int(os.getenv("NEWSCATCHER_MAX_RETRIES", "5"))
+    NEWSCATCHER_MAX_RESULTS: int = int(os.getenv("NEWSCATCHER_MAX_RESULTS", "10000"))
+    NEWSCATCHER_MAX_QUERY_LENGTH: int = int(os.getenv("NEWSCATCHER_MAX_QUERY_LENGTH", "400"))
+    NEWSCATCHER_RECORD_MODE: str = os.getenv("NEWSCATCHER_RECORD_MODE", "off")
+    NEWSCATCHER_RECORDINGS_DIR: str = os.getenv("NEWSCATCHER_RECORDINGS_DIR", "recordings/newscatcher")
+    NEWSCATCHER_REPLAY_LATENCY: float = float(os.getenv("NEWSCATCHER_REPLAY_LATENCY", "0"))
+    NEWSCATCHER_REPLAY_RATE_LIMIT_EVERY: int = int(os.getenv("NEWSCATCHER_REPLAY_RATE_LIMIT_EVERY", "0"))
+    COLLECTOR_BULK_CHUNK_SIZE: int = int(os.getenv("COLLECTOR_BULK_CHUNK_SIZE", "500"))
+    COLLECTOR_WATERMARK_OVERLAP_HOURS: float = float(os.getenv("COLLECTOR_WATERMARK_OVERLAP_HOURS", "24"))
+    COLLECTOR_BLOOM_FILTER: bool = os.getenv("COLLECTOR_BLOOM_FILTER", "True").lower() == "true"
+    COLLECTOR_BLOOM_ERROR_RATE: float = float(os.getenv("COLLECTOR_BLOOM_ERROR_RATE", "0.001"))
+    
+    # Pipeline Orchestrator Settings
+    PIPELINE_POLL_SECONDS: float = float(os.getenv("PIPELINE_POLL_SECONDS", "30"))
+    PIPELINE_SETTLE_SECONDS: float = float(os.getenv("PIPELINE_SETTLE_SECONDS", "10"))
+    ENRICHMENT_SCAN_BATCH_SIZE: int = int(os.getenv("ENRICHMENT_SCAN_BATCH_SIZE", "100"))
+    
+    # Near Duplicate Settings
+    NEAR_DUPLICATE_NUM_PERM: int = int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "128"))
+    NEAR_DUPLICATE_BANDS: int = int(os.getenv("NEAR_DUPLICATE_BANDS", "32"))
+    NEAR_DUPLICATE_SHINGLE_SIZE: int = int(os.getenv("NEAR_DUPLICATE_SHINGLE_SIZE", "5"))
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+    
+    # Summariser Settings
+    SUMMARISER_WORKERS: int = int(os.getenv("SUMMARISER_WORKERS", "4"))
+    SUMMARISER_RATE_PER_SECOND: float = float(os.getenv("SUMMARISER_RATE_PER_SECOND", "2"))
+    SUMMARISER_MAX_RETRIES: int = int(os.getenv("SUMMARISER_MAX_RETRIES", "10"))
+    SUMMARISER_CHUNKING: str = os.getenv("SUMMARISER_CHUNKING", "auto")
+    SUMMARISER_DIRECT_MAX_TOKENS: int = int(os.getenv("SUMMARISER_DIRECT_MAX_TOKENS", "8000"))
+    SUMMARISER_WINDOW_TOKENS: int = int(os.getenv("SUMMARISER_WINDOW_TOKENS", "2000"))
+    SUMMARISER_MAX_PROMPT_TOKENS: int = int(os.getenv("SUMMARISER_MAX_PROMPT_TOKENS", "16000"))
+    ENRICHMENT_FUSED: bool = os.getenv("ENRICHMENT_FUSED", "True").lower() == "true"
+    
+    # LLM Response Cache Settings
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "cache/llm_responses.sqlite")
+    LLM_CACHE_MAX_BYTES: int = int(os.getenv("LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    
+    # Read Routing Settings
+    MONGODB_ANALYTICS_READ_PREFERENCE: str = os.getenv("MONGODB_ANALYTICS_READ_PREFERENCE", "secondaryPreferred")
+    MONGODB_MAX_STALENESS_SECONDS: int = int(os.getenv("MONGODB_MAX_STALENESS_SECONDS", "120"))
+    
+    # Search Cache Settings
+    SEARCH_CACHE_MAX_BYTES: int = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+    SEARCH_CACHE_TTL_SECONDS: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+    CORPUS_VERSION_TTL_SECONDS: int = int(os.getenv("CORPUS_VERSION_TTL_SECONDS", "30"))
+    SEARCH_HTTP_MAX_AGE_SECONDS: int = int(os.getenv("SEARCH_HTTP_MAX_AGE_SECONDS", "60"))
+    COUNTRIES_HTTP_MAX_AGE_SECONDS: int = int(os.getenv("COUNTRIES_HTTP_MAX_AGE_SECONDS", "3600"))
+    HTTP_STALE_WHILE_REVALIDATE_SECONDS: int = int(os.getenv("HTTP_STALE_WHILE_REVALIDATE_SECONDS", "300"))
+    
+    # Hybrid Retrieval Settings
+    HYBRID_VECTOR_K: int = int(os.getenv("HYBRID_VECTOR_K", "10"))
+    HYBRID_LEXICAL_K: int = int(os.getenv("HYBRID_LEXICAL_K", "10"))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", "60"))
+    CHAT_CONTEXT_K: int = int(os.getenv("CHAT_CONTEXT_K", "4"))
+    
+    # Dashboard Snapshot Settings
+    DASHBOARD_SNAPSHOT_PAGE_SIZE: int = int(os.getenv("DASHBOARD_SNAPSHOT_PAGE_SIZE", "10"))
+    DASHBOARD_SNAPSHOT_FACET_SIZE: int = int(os.getenv("DASHBOARD_SNAPSHOT_FACET_SIZE", "20"))
+    DASHBOARD_SNAPSHOT_REFRESH_SECONDS: int = int(os.getenv("DASHBOARD_SNAPSHOT_REFRESH_SECONDS", "60"))
+    
+    # Response Compression Settings
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "4"))
+    
     # New fields with exact case matching
     huggingface_api_key: str = os.getenv("huggingface_api_key", "")
     openrouter_api_key: str = os.getenv("openrouter_api_key", "")
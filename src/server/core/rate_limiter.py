@@ -0,0 +1,122 @@
+"""
+Rate Limiter Module
+-----------------
+Token bucket rate limiting for calls to external APIs. The bucket refills at a fixed rate up to
+its capacity and each call takes one token, which allows short bursts while holding the average
+rate. When the API answers 429, the whole bucket can be paused for the Retry-After period, so
+every concurrent caller backs off together instead of each one retrying on its own.
+
+Classes:
+    - AsyncTokenBucket: Token bucket shared by the coroutines of one event loop
+    - TokenBucket: Token bucket shared by threads, e.g. the workers of a thread pool
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class AsyncTokenBucket:
+    """Token bucket for asyncio code"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second, the sustained number of calls per second
+            capacity: Maximum number of tokens, the largest burst. Defaults to rate
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given number of seconds, e.g. after a 429 response.
+        Overlapping pauses extend to the latest end time.
+
+        Args:
+            seconds: How long to pause for
+        """
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # Do not allow a burst when the pause ends
+        self._tokens = 0.0
+        self._updated_at = max(self._updated_at, self._paused_until)
+
+
+class TokenBucket:
+    """Thread-safe token bucket for blocking code"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second, the sustained number of calls per second
+            capacity: Maximum number of tokens, the largest burst. Defaults to rate
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and takes it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            # Sleep outside the lock, so pause() is not blocked by waiting threads
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given number of seconds, e.g. after a rate limit error.
+        Overlapping pauses extend to the latest end time.
+
+        Args:
+            seconds: How long to pause for
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            # Do not allow a burst when the pause ends
+            self._tokens = 0.0
+            self._updated_at = max(self._updated_at, self._paused_until)
@@ -0,0 +1,297 @@
+"""
+Analytics Service Module
+----------------------
+This module maintains and queries the article rollup collection used by dashboard analytics.
+Each rollup document holds the number of Caribbean articles for one country, category and
+period (a month or a week). The enrichment pipeline merges the articles it changes into the
+rollups, so dashboard queries never have to scan the articles collection. Each article keeps the
+rollups it is counted in, so a merge moves it between rollups when its category, flag or date
+changes and merging it again changes nothing.
+
+Functions:
+    - ensure_rollup_indexes(): Creates the indexes used by analytics queries
+    - merge_article_rollups(): Brings the rollups up to date with a set of articles
+    - rebuild_article_rollups(): Recomputes every rollup from the articles collection
+    - query_article_rollups(): Returns a time series and top-N breakdowns from the rollups
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from server.core.logging import setup_logger
+
+logger = setup_logger("server.service.analytics_service")
+
+ROLLUP_COLLECTION = "article_rollups"
+GRANULARITIES = ("month", "week")
+
+# Field of an article holding the country, category and periods it is counted under
+ROLLUP_KEY_FIELD = "msbm_rollup_key"
+
+# Articles read per query when merging
+MERGE_BATCH_SIZE = 500
+
+
+def _rollup_pipeline(match: Dict[str, Any], granularity: str, when_matched: Any) -> List[Dict[str, Any]]:
+    """
+    Builds the aggregation that groups matching articles into rollup documents and merges
+    them into the rollup collection.
+
+    Args:
+        match: Filter selecting the articles to roll up
+        granularity: 'month' or 'week'
+        when_matched: $merge whenMatched behaviour for rollups that already exist
+
+    Returns:
+        list: The aggregation pipeline
+    """
+    period = {"$dateTrunc": {"date": "$msbm_published_date", "unit": granularity}}
+    if granularity == "week":
+        period["$dateTrunc"]["startOfWeek"] = "monday"
+
+    return [
+        {"$match": {
+            **match,
+            # Only articles that the search API can return are counted
+            "msbm_caribbean_article": "True",
+            "msbm_category": {"$nin": [None, ""]},
+            "msbm_published_date": {"$type": "date"}
+        }},
+        {"$group": {
+            "_id": {
+                "granularity": granularity,
+                # Null rather than missing, matching the keys merge_article_rollups writes
+                "country": {"$ifNull": ["$msbm_country_full_name", None]},
+                "category": "$msbm_category",
+                "period": period
+            },
+            "count": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 1,
+            "granularity": "$_id.granularity",
+            "country": "$_id.country",
+            "category": "$_id.category",
+            "period": "$_id.period",
+            "count": 1
+        }},
+        {"$merge": {
+            "into": ROLLUP_COLLECTION,
+            "on": "_id",
+            "whenMatched": when_matched,
+            "whenNotMatched": "insert"
+        }}
+    ]
+
+
+def ensure_rollup_indexes(db) -> None:
+    """
+    Creates the indexes used by analytics queries if they do not exist yet.
+
+    Args:
+        db: MongoDB database instance
+    """
+    db[ROLLUP_COLLECTION].create_index(
+        [("granularity", ASCENDING), ("period", ASCENDING), ("country", ASCENDING), ("category", ASCENDING)],
+        name="granularity_period"
+    )
+
+
+def _rollup_key(article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The rollups an article is counted in, as stored in ROLLUP_KEY_FIELD, or None if the
+    rollup filter does not match it.
+    """
+    published_date = article.get("msbm_published_date")
+    if (
+        article.get("msbm_caribbean_article") != "True"
+        or article.get("msbm_category") in (None, "")
+        or not isinstance(published_date, datetime)
+    ):
+        return None
+    return {
+        "country": article.get("msbm_country_full_name"),
+        "category": article["msbm_category"],
+        **{granularity: _period_start(published_date, granularity) for granularity in GRANULARITIES}
+    }
+
+
+def _rollup_updates(key: Dict[str, Any], delta: int) -> List[UpdateOne]:
+    """The rollup increments that add (delta 1) or remove (delta -1) an article with this key."""
+    updates = []
+    for granularity in GRANULARITIES:
+        rollup = {
+            "granularity": granularity,
+            "country": key["country"],
+            "category": key["category"],
+            "period": key[granularity]
+        }
+        # Same _id as the $group of the rebuild, field order included
+        updates.append(UpdateOne(
+            {"_id": rollup},
+            {"$inc": {"count": delta}, "$setOnInsert": rollup},
+            upsert=True
+        ))
+    return updates
+
+
+def merge_article_rollups(collection, article_ids: List[Any]) -> None:
+    """
+    Brings the rollups up to date with a set of articles whose enrichment fields changed.
+
+    Every article stores the rollups it is counted in under ROLLUP_KEY_FIELD. An article whose
+    current key differs from its stored one is removed from the old rollups and added to the new
+    ones, and its stored key is replaced. An article is claimed by a conditional update of its
+    stored key before the rollups change, so merging an article again, from another stage or a
+    concurrent process, changes nothing. The categoriser, the Caribbean check, the enricher and
+    the near duplicate copy can therefore merge every article they touched.
+
+    A process that dies between claiming articles and updating the rollups leaves those rollups
+    short; rebuild_article_rollups recounts them.
+
+    Args:
+        collection: The articles collection
+        article_ids: _id values of the articles to merge
+    """
+    if not article_ids:
+        return
+    db = collection.database
+    changed = 0
+    fields = ("msbm_caribbean_article", "msbm_category", "msbm_country_full_name", "msbm_published_date", ROLLUP_KEY_FIELD)
+    for start in range(0, len(article_ids), MERGE_BATCH_SIZE):
+        rollup_updates = []
+        articles = collection.find({"_id": {"$in": article_ids[start:start + MERGE_BATCH_SIZE]}}, {field: 1 for field in fields})
+        for article in articles:
+            old_key = article.get(ROLLUP_KEY_FIELD)
+            new_key = _rollup_key(article)
+            if old_key == new_key:
+                continue
+            claim = {"$set": {ROLLUP_KEY_FIELD: new_key}} if new_key else {"$unset": {ROLLUP_KEY_FIELD: ""}}
+            claimed = collection.update_one({"_id": article["_id"], ROLLUP_KEY_FIELD: old_key}, claim)
+            if not claimed.modified_count:
+                continue
+            if old_key:
+                rollup_updates += _rollup_updates(old_key, -1)
+            if new_key:
+                rollup_updates += _rollup_updates(new_key, 1)
+            changed += 1
+        if rollup_updates:
+            db[ROLLUP_COLLECTION].bulk_write(rollup_updates, ordered=False)
+    if changed:
+        db[ROLLUP_COLLECTION].delete_many({"count": {"$lte": 0}})
+    logger.info(f"Merged {changed} of {len(article_ids)} articles into {ROLLUP_COLLECTION}")
+
+
+def rebuild_article_rollups(collection) -> None:
+    """
+    Recomputes every rollup from the articles collection, replacing the existing rollups, and
+    stores the rollup key of every article for later merges.
+
+    Args:
+        collection: The articles collection
+    """
+    db = collection.database
+    logger.info(f"Rebuilding {ROLLUP_COLLECTION} from {collection.name}")
+    db[ROLLUP_COLLECTION].delete_many({})
+    for granularity in GRANULARITIES:
+        collection.aggregate(_rollup_pipeline({}, granularity, "replace"), allowDiskUse=True)
+    ensure_rollup_indexes(db)
+
+    def truncate(granularity: str) -> Dict[str, Any]:
+        period = {"date": "$msbm_published_date", "unit": granularity}
+        if granularity == "week":
+            period["startOfWeek"] = "monday"
+        return {"$dateTrunc": period}
+
+    collection.update_many({}, [{"$set": {ROLLUP_KEY_FIELD: {"$cond": [
+        {"$and": [
+            {"$eq": ["$msbm_caribbean_article", "True"]},
+            {"$not": [{"$in": [{"$ifNull": ["$msbm_category", None]}, [None, ""]]}]},
+            {"$eq": [{"$type": "$msbm_published_date"}, "date"]}
+        ]},
+        {
+            "country": {"$ifNull": ["$msbm_country_full_name", None]},
+            "category": "$msbm_category",
+            **{granularity: truncate(granularity) for granularity in GRANULARITIES}
+        },
+        "$$REMOVE"
+    ]}}}])
+    logger.info(f"Rebuilt {db[ROLLUP_COLLECTION].estimated_document_count()} rollups")
+
+
+def query_article_rollups(
+    db,
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    granularity: str = "month",
+    top_n: int = 10
+) -> Dict[str, Any]:
+    """
+    Returns a time series and top-N country and category breakdowns from the rollups.
+
+    Args:
+        db: MongoDB database instance
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start of the range
+        end_date: Optional end of the range
+        granularity: 'month' or 'week'
+        top_n: Number of countries and categories in the breakdowns
+
+    Returns:
+        dict: Contains 'series', 'top_countries', 'top_categories' and 'total'
+    """
+    match: Dict[str, Any] = {"granularity": granularity}
+    if categories:
+        match["category"] = {"$in": categories}
+    if countries:
+        match["country"] = {"$in": countries}
+    if start_date or end_date:
+        match["period"] = {}
+        if start_date:
+            # Include the period the start date falls in
+            match["period"]["$gte"] = _period_start(start_date, granularity)
+        if end_date:
+            match["period"]["$lte"] = end_date
+
+    def top(field: str) -> List[Dict[str, Any]]:
+        return [
+            {"$group": {"_id": f"${field}", "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": top_n},
+            {"$project": {"_id": 0, field: "$_id", "count": 1}}
+        ]
+
+    result = next(db[ROLLUP_COLLECTION].aggregate([
+        {"$match": match},
+        {"$facet": {
+            "series": [
+                {"$group": {"_id": "$period", "count": {"$sum": "$count"}}},
+                {"$sort": {"_id": 1}},
+                {"$project": {"_id": 0, "period": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id"}}, "count": 1}}
+            ],
+            "top_countries": top("country"),
+            "top_categories": top("category"),
+            "total": [{"$group": {"_id": None, "count": {"$sum": "$count"}}}]
+        }}
+    ]))
+
+    return {
+        "granularity": granularity,
+        "series": result["series"],
+        "top_countries": result["top_countries"],
+        "top_categories": result["top_categories"],
+        "total": result["total"][0]["count"] if result["total"] else 0
+    }
+
+
+def _period_start(date: datetime, granularity: str) -> datetime:
+    """Truncates a date to the start of its month, or the Monday of its week"""
+    day = datetime(date.year, date.month, date.day)
+    if granularity == "week":
+        return datetime.fromordinal(day.toordinal() - day.weekday())
+    return day.replace(day=1)
@@ -61,4 +61,12 @@ class AstraService:
             return retriever.invoke(query)
         except Exception as e:
             logger.error(f"Error searching documents: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def similarity_search(self, query: str, filters: Dict[str, Any] = None, k: int = 10):
+        """Search documents by similarity, best match first"""
+        try:
+            return self.vectorstore.similarity_search(query, k=k, filter=filters or None)
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}")
+            raise
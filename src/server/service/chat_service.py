@@ -2,8 +2,10 @@ from typing import Dict, List, Any
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.runnable import RunnablePassthrough
 from pydantic import BaseModel, Field
+from server.core.config import get_settings
 from server.core.logging import setup_logger
 from server.service.astra_service import AstraService
+from server.service.hybrid_retriever import HybridRetriever
 from server.service.llm_service import OpenAI
 from server.models.article_model import ArticleMetadata, Articles
 from server.models.chat_model import LLMResponse
@@ -26,6 +28,7 @@ class ChatService:
     def __init__(self):
         """Initialize chat service with required dependencies"""
         self.astra_service = AstraService()
+        self.retriever = HybridRetriever(self.astra_service)
         self.llm_service = OpenAI()
         self.llm = self.llm_service.get_model(name="gpt4o")
         self.memory = ConversationBufferMemory()
@@ -297,61 +300,19 @@ class ChatService:
         """Enhanced context retrieval using classification results."""
         logger.info(f"Retrieving context for question with topics: {classification.topics}")
         try:
-            # Build a more targeted search query
-            search_terms = []
-            
-            # Add topic-specific terms
-            for topic in classification.topics:
-                if "LGBTQ" in topic or "gay" in topic.lower():
-                    search_terms.extend(["LGBTQ", "gay", "lesbian", "transgender", "queer", "sexual orientation"])
-                elif "violence" in topic.lower():
-                    search_terms.extend(["violence", "abuse", "assault", "harassment"])
-                elif "equality" in topic.lower():
-                    search_terms.extend(["equality", "discrimination", "rights", "equity"])
-                elif "education" in topic.lower():
-                    search_terms.extend(["education", "school", "university", "student"])
-                elif "workplace" in topic.lower():
-                    search_terms.extend(["workplace", "employment", "job", "career"])
-            
-            # Combine terms into search query
-            enhanced_query = f"{question} {' '.join(search_terms)}"
-            
-            # Adjust search parameters
-            k = 5  # Increased from 3-4 to 5 documents
-            fetch_k = 50  # Increased from 30 to 50 for larger candidate pool
-            lambda_mult = 0.8  # Increased from 0.7 to 0.8 for more relevance focus
+            # Exact-term recall comes from the lexical half of the hybrid search,
+            # so the question is searched as asked
+            k = get_settings().CHAT_CONTEXT_K
             
             # Generate filters
             filters = self.generate_vectorstore_filter(question)
             
             # First try with filters
-            docs = self.astra_service.search_documents(
-                query=enhanced_query,
-                filters=filters,
-                k=k,
-                fetch_k=fetch_k,
-                lambda_mult=lambda_mult
-            )
+            docs = self.retriever.search(query=question, filters=filters, k=k)
             
             if not docs or len(docs) < 2:
-                # If no results or too few, try without filters but with enhanced query
-                docs = self.astra_service.search_documents(
-                    query=enhanced_query,
-                    filters=None,
-                    k=k,
-                    fetch_k=fetch_k,
-                    lambda_mult=lambda_mult
-                )
-            
-            # If still no results, try original query without enhancements
-            if not docs:
-                docs = self.astra_service.search_documents(
-                    query=question,
-                    filters=None,
-                    k=k,
-                    fetch_k=fetch_k,
-                    lambda_mult=0.6  # Lower lambda for more diversity in last resort
-                )
+                # If no results or too few, try without filters
+                docs = self.retriever.search(query=question, filters=None, k=k)
             
             # Process and deduplicate results
             seen_contents = set()
@@ -0,0 +1,108 @@
+"""
+Corpus Version Module
+-------------------
+This module tracks a monotonically increasing version number for the articles corpus.
+The pipeline scripts bump the version whenever they change data that the search API
+returns, and the API uses it to invalidate anything it has cached.
+
+Functions:
+    - read_corpus_version(): Reads the current version from MongoDB
+    - get_corpus_version(): Returns the version, re-reading it at most every few seconds
+    - bump_corpus_version(): Increments the version after a write to the corpus
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from server.core.logging import setup_logger
+from server.core.config import get_settings
+
+logger = setup_logger("server.service.corpus_version")
+
+settings = get_settings()
+
+CORPUS_META_COLLECTION = "corpus_meta"
+CORPUS_VERSION_ID = "articles"
+
+# In-process copy of the version so hot paths do not query MongoDB on every request
+_cached_version: Optional[int] = None
+_cached_at: float = 0.0
+_lock = threading.Lock()
+
+
+def read_corpus_version(db) -> int:
+    """
+    Reads the current corpus version from MongoDB.
+
+    Args:
+        db: MongoDB database instance
+
+    Returns:
+        int: The corpus version, 0 if it has never been bumped
+    """
+    document = db[CORPUS_META_COLLECTION].find_one({"_id": CORPUS_VERSION_ID}, {"version": 1})
+    return int(document.get("version", 0)) if document else 0
+
+
+def get_corpus_version(get_db: Callable, max_age_seconds: Optional[int] = None) -> int:
+    """
+    Returns the corpus version, only re-reading it from MongoDB once the cached value is older
+    than max_age_seconds.
+
+    Args:
+        get_db: Callable returning a MongoDB database instance, only called on refresh
+        max_age_seconds: Maximum age of the cached version, defaults to CORPUS_VERSION_TTL_SECONDS
+
+    Returns:
+        int: The corpus version
+    """
+    global _cached_version, _cached_at
+
+    if max_age_seconds is None:
+        max_age_seconds = settings.CORPUS_VERSION_TTL_SECONDS
+
+    with _lock:
+        if _cached_version is not None and time.monotonic() - _cached_at < max_age_seconds:
+            return _cached_version
+
+    try:
+        version = read_corpus_version(get_db())
+    except Exception as e:
+        # Keep serving the last known version rather than failing the request
+        if _cached_version is not None:
+            logger.warning(f"Failed to refresh corpus version, using cached value: {str(e)}")
+            return _cached_version
+        raise
+
+    with _lock:
+        if _cached_version is not None and version != _cached_version:
+            logger.info(f"Corpus version changed from {_cached_version} to {version}")
+        _cached_version = version
+        _cached_at = time.monotonic()
+    return version
+
+
+def bump_corpus_version(db, reason: str = "") -> int:
+    """
+    Increments the corpus version. Call this after any write that changes search results.
+
+    Args:
+        db: MongoDB database instance
+        reason: Short description of the write, stored for debugging
+
+    Returns:
+        int: The new corpus version
+    """
+    document = db[CORPUS_META_COLLECTION].find_one_and_update(
+        {"_id": CORPUS_VERSION_ID},
+        {
+            "$inc": {"version": 1},
+            "$set": {"updated_at": datetime.now().isoformat(), "reason": reason}
+        },
+        upsert=True,
+        return_document=True
+    )
+    logger.info(f"Bumped corpus version to {document['version']} ({reason})")
+    return int(document["version"])
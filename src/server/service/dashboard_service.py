@@ -0,0 +1,235 @@
+"""
+Dashboard Service Module
+----------------------
+This module precomputes what a saved dashboard shows when it is opened: the first page of its
+search, the country and category facets and the total count. Snapshots are stored in MongoDB
+tagged with the corpus version they were computed against. A stale snapshot is still served
+while a fresh one is built in the background, so opening a dashboard never waits on a search.
+
+Functions:
+    - build_dashboard_facets(): Counts the articles matching a query per country and category
+    - refresh_dashboard_snapshot(): Recomputes and stores the snapshot for one dashboard
+    - get_dashboard_view(): Returns a dashboard with its snapshot, building it if missing
+    - refresh_stale_snapshots(): Recomputes every snapshot older than the corpus version
+    - run_snapshot_refresher(): Background loop refreshing snapshots when the corpus version changes
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from server.core.logging import setup_logger
+from src.server.core.config import get_settings
+from src.server.service.search_service import (
+    get_mongodb_connection,
+    get_current_corpus_version,
+    build_search_query,
+    search_articles
+)
+
+logger = setup_logger("server.service.dashboard_service")
+
+settings = get_settings()
+
+SNAPSHOT_COLLECTION = "dashboard_snapshots"
+
+# Dashboards whose snapshot is being rebuilt, so concurrent requests do not rebuild it twice
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _to_object_id(dashboard_id: str) -> Optional[ObjectId]:
+    """Converts a dashboard ID to an ObjectId, None if it is not a valid ID"""
+    try:
+        return ObjectId(dashboard_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+def build_dashboard_facets(collection, query: Dict[str, Any], top_n: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Counts the articles matching a query per country and per category.
+
+    Args:
+        collection: The articles collection
+        query: MongoDB filter from build_search_query()
+        top_n: Maximum number of values returned per facet
+
+    Returns:
+        dict: Contains 'countries' and 'categories' lists of value/count pairs
+    """
+    def facet(field: str) -> List[Dict[str, Any]]:
+        return [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": top_n},
+            {"$project": {"_id": 0, "value": "$_id", "count": 1}}
+        ]
+
+    result = next(collection.aggregate([
+        {"$match": query},
+        {"$facet": {
+            "countries": facet("msbm_country_full_name"),
+            "categories": facet("msbm_category")
+        }}
+    ]))
+    return {"countries": result["countries"], "categories": result["categories"]}
+
+
+def refresh_dashboard_snapshot(dashboard_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Recomputes the snapshot for a dashboard and stores it. Does nothing if the snapshot is
+    already being rebuilt by another request.
+
+    Args:
+        dashboard_id: ID of the dashboard
+
+    Returns:
+        dict: The new snapshot, or None if the dashboard does not exist or is already being rebuilt
+    """
+    object_id = _to_object_id(dashboard_id)
+    if object_id is None:
+        return None
+
+    with _refreshing_lock:
+        if dashboard_id in _refreshing:
+            logger.info(f"Snapshot for dashboard {dashboard_id} is already being refreshed")
+            return None
+        _refreshing.add(dashboard_id)
+
+    try:
+        db = get_mongodb_connection()
+        dashboard = db['dashboards'].find_one({"_id": object_id})
+        if not dashboard:
+            logger.warning(f"No dashboard found with ID: {dashboard_id}")
+            return None
+
+        # Read the version first, so a write that lands during the rebuild leaves the snapshot stale
+        corpus_version = get_current_corpus_version()
+        categories = dashboard.get("selected_keywords") or []
+        countries = dashboard.get("selected_countries") or []
+        start_date = dashboard.get("start_date")
+        end_date = dashboard.get("end_date")
+
+        results = search_articles(
+            categories=categories,
+            countries=countries,
+            start_date=start_date,
+            end_date=end_date,
+            page=1,
+            page_size=settings.DASHBOARD_SNAPSHOT_PAGE_SIZE
+        )
+        # Facet counts scan every matching article, so they are read from a secondary
+        facets = build_dashboard_facets(
+            get_mongodb_connection("facets")[settings.MONGODB_COLLECTION_NAME],
+            build_search_query(categories, countries, start_date, end_date),
+            settings.DASHBOARD_SNAPSHOT_FACET_SIZE
+        )
+
+        snapshot = {
+            "corpus_version": corpus_version,
+            "built_at": datetime.now().isoformat(),
+            "results": results,
+            "facets": facets
+        }
+        db[SNAPSHOT_COLLECTION].replace_one({"_id": object_id}, snapshot, upsert=True)
+        logger.info(f"Refreshed snapshot for dashboard {dashboard_id} at corpus version {corpus_version}")
+        return snapshot
+
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(dashboard_id)
+
+
+def get_dashboard_view(dashboard_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns a dashboard together with its precomputed snapshot. A missing snapshot is built
+    before returning, a stale one is returned as is and flagged for a background refresh.
+
+    Args:
+        dashboard_id: ID of the dashboard
+
+    Returns:
+        dict: Contains 'dashboard', 'snapshot' and 'stale', or None if the dashboard does not exist
+    """
+    object_id = _to_object_id(dashboard_id)
+    if object_id is None:
+        return None
+
+    db = get_mongodb_connection()
+    dashboard = db['dashboards'].find_one({"_id": object_id})
+    if not dashboard:
+        return None
+    dashboard["_id"] = str(dashboard["_id"])
+
+    snapshot = db[SNAPSHOT_COLLECTION].find_one({"_id": object_id}, {"_id": 0})
+    if snapshot is None:
+        logger.info(f"No snapshot for dashboard {dashboard_id}, building it now")
+        snapshot = refresh_dashboard_snapshot(dashboard_id)
+        if snapshot is None:
+            # Another request is building it, wait for its result
+            snapshot = db[SNAPSHOT_COLLECTION].find_one({"_id": object_id}, {"_id": 0})
+        if snapshot is None:
+            raise RuntimeError(f"Snapshot for dashboard {dashboard_id} is not available yet")
+
+    return {
+        "dashboard": dashboard,
+        "snapshot": snapshot,
+        "stale": snapshot["corpus_version"] != get_current_corpus_version()
+    }
+
+
+def refresh_stale_snapshots() -> int:
+    """
+    Recomputes the snapshot of every dashboard whose snapshot is missing or older than the
+    current corpus version.
+
+    Returns:
+        int: Number of snapshots refreshed
+    """
+    db = get_mongodb_connection()
+    corpus_version = get_current_corpus_version()
+
+    fresh_ids = {
+        snapshot["_id"]
+        for snapshot in db[SNAPSHOT_COLLECTION].find({"corpus_version": corpus_version}, {"_id": 1})
+    }
+    stale_ids = [
+        str(dashboard["_id"])
+        for dashboard in db['dashboards'].find({}, {"_id": 1})
+        if dashboard["_id"] not in fresh_ids
+    ]
+    logger.info(f"Refreshing {len(stale_ids)} stale dashboard snapshots for corpus version {corpus_version}")
+
+    refreshed_count = 0
+    for dashboard_id in stale_ids:
+        try:
+            if refresh_dashboard_snapshot(dashboard_id) is not None:
+                refreshed_count += 1
+        except Exception as e:
+            logger.warning(f"Failed to refresh snapshot for dashboard {dashboard_id}: {str(e)}")
+    return refreshed_count
+
+
+async def run_snapshot_refresher(interval_seconds: int) -> None:
+    """
+    Checks the corpus version every interval_seconds and refreshes the stale snapshots
+    whenever it changes. Runs until cancelled.
+
+    Args:
+        interval_seconds: Seconds between corpus version checks
+    """
+    last_version = None
+    while True:
+        try:
+            corpus_version = await asyncio.to_thread(get_current_corpus_version)
+            if corpus_version != last_version:
+                await asyncio.to_thread(refresh_stale_snapshots)
+                last_version = corpus_version
+        except Exception as e:
+            logger.warning(f"Dashboard snapshot refresh failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,92 @@
+"""
+Export Service Module
+-------------------
+This module encodes streams of search results for bulk export. Every function takes and returns
+iterators, so an export of any size is encoded with constant memory while it is being sent.
+
+Functions:
+    - iter_ndjson(): Encodes rows as newline-delimited JSON
+    - iter_csv(): Encodes rows as CSV with a header line
+    - iter_gzip(): Gzip-compresses a stream of byte chunks
+"""
+
+import csv
+import io
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List
+
+import orjson
+
+# Rows are grouped into chunks of roughly this size before being sent
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encodes rows as newline-delimited JSON.
+
+    Args:
+        rows: Iterable of article dictionaries
+        chunk_bytes: Approximate size of each yielded chunk
+
+    Yields:
+        bytes: Chunks of NDJSON
+    """
+    buffer = bytearray()
+    for row in rows:
+        buffer += orjson.dumps(row, default=str)
+        buffer += b"\n"
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def iter_csv(
+    rows: Iterable[Dict[str, Any]],
+    fields: List[str],
+    chunk_bytes: int = EXPORT_CHUNK_BYTES
+) -> Iterator[bytes]:
+    """
+    Encodes rows as CSV, starting with a header line.
+
+    Args:
+        rows: Iterable of article dictionaries
+        fields: Column names, in order. Missing values are written as empty cells
+        chunk_bytes: Approximate size of each yielded chunk
+
+    Yields:
+        bytes: Chunks of UTF-8 encoded CSV
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip-compresses a stream of chunks without buffering the whole stream.
+
+    Args:
+        chunks: Iterable of byte chunks
+        level: Compression level from 1 to 9
+
+    Yields:
+        bytes: Chunks of the gzip stream
+    """
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,161 @@
+"""
+Hybrid Retriever Module
+---------------------
+This module retrieves chat context by combining dense and lexical search. The vector search over
+AstraDB finds articles that are semantically close to the question, while the MongoDB text index
+over titles and summaries finds articles containing its exact terms (names, places, legislation).
+Both searches run in parallel and their rankings are merged with reciprocal rank fusion, which only
+uses ranks, so the incomparable cosine and text scores never have to be normalised.
+
+Functions:
+    - reciprocal_rank_fusion(): Merges several rankings into one
+
+Classes:
+    - HybridRetriever: Runs vector and lexical search in parallel and fuses the results
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import pymongo
+from langchain_core.documents import Document
+
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.astra_service import AstraService
+
+logger = setup_logger(name=__name__)
+
+# Article fields copied into the metadata of lexical results, matching the vector store metadata
+LEXICAL_METADATA_FIELDS = (
+    "title", "link", "name_source", "published_date", "domain_url", "author",
+    "language", "msbm_country_full_name", "msbm_category"
+)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Any]],
+    key: Callable[[Any], Hashable],
+    k: int = 60
+) -> List[Any]:
+    """
+    Merges rankings with reciprocal rank fusion: each item scores the sum of 1 / (k + rank)
+    over the rankings it appears in. Items sharing a key are merged, keeping the first one seen.
+
+    Args:
+        rankings: Ranked lists of items, best first
+        key: Returns the identity of an item, used to merge it across rankings
+        k: Smoothing constant, higher values flatten the contribution of the top ranks
+
+    Returns:
+        list: The unique items, best fused score first
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, Any] = {}
+    for ranking in rankings:
+        seen = set()
+        for rank, item in enumerate(ranking, start=1):
+            item_key = key(item)
+            # Only the best rank of an item counts within one ranking
+            if item_key in seen:
+                continue
+            seen.add(item_key)
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+            items.setdefault(item_key, item)
+    return [items[item_key] for item_key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class HybridRetriever:
+    """Retrieves documents with vector and lexical search in parallel, fused with RRF"""
+
+    def __init__(self, astra_service: AstraService, mongo_client: Optional[pymongo.MongoClient] = None):
+        self.settings = get_settings()
+        self.astra_service = astra_service
+        self._mongo_client = mongo_client
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-retriever")
+
+    @property
+    def collection(self):
+        """Articles collection, connecting on first use"""
+        if self._mongo_client is None:
+            self._mongo_client = pymongo.MongoClient(self.settings.MONGODB_CONNECTION_STRING)
+        return self._mongo_client[self.settings.MONGODB_DB_NAME][self.settings.MONGODB_COLLECTION_NAME]
+
+    def lexical_search(self, query: str, filters: Optional[Dict[str, Any]] = None, k: int = 10) -> List[Document]:
+        """
+        Searches article titles and summaries with the MongoDB text index.
+
+        Args:
+            query: The question, matched on its terms
+            filters: Optional filter in the same syntax as the vector store filter
+            k: Number of documents to return
+
+        Returns:
+            list: Documents shaped like vector store results, most relevant first
+        """
+        match = {"$text": {"$search": query}, "msbm_caribbean_article": "True"}
+        if filters:
+            match = {"$and": [match, filters]}
+
+        text_score = {"$meta": "textScore"}
+        projection = {field: 1 for field in LEXICAL_METADATA_FIELDS}
+        projection.update({"_id": 0, "msbm_llm_summary": 1})
+
+        documents = []
+        for article in self.collection.find(match, projection).sort([("score", text_score)]).limit(k):
+            summary = article.pop("msbm_llm_summary", None)
+            if summary:
+                documents.append(Document(page_content=summary, metadata=article))
+        return documents
+
+    def vector_search(self, query: str, filters: Optional[Dict[str, Any]] = None, k: int = 10) -> List[Document]:
+        """
+        Searches the vector store by similarity to the question.
+
+        Args:
+            query: The question
+            filters: Optional vector store filter
+            k: Number of documents to return
+
+        Returns:
+            list: The most similar documents, best first
+        """
+        return self.astra_service.similarity_search(query=query, filters=filters, k=k)
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None, k: int = 4) -> List[Document]:
+        """
+        Runs vector and lexical search in parallel and returns the top k fused documents.
+        If one of the searches fails, the results of the other are used on their own.
+
+        Args:
+            query: The question
+            filters: Optional filter applied to both searches
+            k: Number of documents to return
+
+        Returns:
+            list: The fused documents, best first
+        """
+        searches = {
+            "vector": self._executor.submit(self.vector_search, query, filters, self.settings.HYBRID_VECTOR_K),
+            "lexical": self._executor.submit(self.lexical_search, query, filters, self.settings.HYBRID_LEXICAL_K)
+        }
+
+        rankings = []
+        for name, future in searches.items():
+            try:
+                documents = future.result()
+                logger.info(f"{name.capitalize()} search returned {len(documents)} documents")
+                rankings.append(documents)
+            except Exception as e:
+                logger.warning(f"{name.capitalize()} search failed, continuing without it: {str(e)}")
+
+        if not rankings:
+            raise RuntimeError("Both vector and lexical search failed")
+
+        # The same article can be returned by both searches, identified by its link
+        fused = reciprocal_rank_fusion(
+            rankings,
+            key=lambda doc: doc.metadata.get("link") or doc.page_content,
+            k=self.settings.HYBRID_RRF_K
+        )
+        return fused[:k]
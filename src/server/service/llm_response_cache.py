@@ -0,0 +1,304 @@
+"""
+LLM Response Cache
+
+Persistent cache of chat model responses, shared by the enrichment stages (summariser, Caribbean
+check and categoriser), so a stage that is rerun after a crash or resumed only pays for the
+prompts it has not sent before.
+
+Responses are stored in a SQLite file keyed on a hash of the model parameters (model name,
+temperature and the other settings LangChain serialises for the model) and a hash of the rendered
+prompt, i.e. the prompt template with the article filled in. A changed prompt, article, model or
+temperature is therefore a miss, while a byte-identical call is served from disk. When the stored
+responses exceed LLM_CACHE_MAX_BYTES, the least recently used ones are evicted.
+
+Each stage uses its own LLMResponseCache instance on the same file, which counts the hits and
+misses of the stage for the run and adds them to cumulative counters in the file.
+
+Classes:
+    - LLMResponseCache: LangChain cache of one stage
+
+Functions:
+    - create_stage_cache: the cache of a stage, or None when LLM_CACHE_ENABLED is off
+    - with_response_cache: a copy of a chat model that uses a cache
+"""
+
+# Python Imports
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Third Party Imports
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+# Share of LLM_CACHE_MAX_BYTES kept after an eviction, so evictions do not run on every insert
+EVICTION_TARGET = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    llm_hash TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (llm_hash, prompt_hash)
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS stage_stats (
+    stage TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    stored INTEGER NOT NULL DEFAULT 0,
+    evicted INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+STAT_NAMES = ('hits', 'misses', 'stored', 'evicted')
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class _ResponseStore:
+    """The SQLite file, shared by every stage cache of the process that uses it"""
+
+    def __init__(self, path: str, max_bytes: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self.total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, llm_hash: str, prompt_hash: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM responses WHERE llm_hash = ? AND prompt_hash = ?", (llm_hash, prompt_hash)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE llm_hash = ? AND prompt_hash = ?",
+                    (time.time(), llm_hash, prompt_hash)
+                )
+        return row[0] if row else None
+
+    def put(self, llm_hash: str, prompt_hash: str, value: str) -> int:
+        """Store a response, returning the number of responses evicted to make room."""
+        size = len(value.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size FROM responses WHERE llm_hash = ? AND prompt_hash = ?", (llm_hash, prompt_hash)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (llm_hash, prompt_hash, value, size, now, now)
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            if self.total_bytes <= self.max_bytes:
+                return 0
+            return self._evict()
+
+    def _evict(self) -> int:
+        """Delete the least recently used responses down to EVICTION_TARGET of max_bytes."""
+        # Other processes may have written to the file, so start from its real size
+        self.total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = self.max_bytes * EVICTION_TARGET
+        evicted = 0
+        while self.total_bytes > target:
+            rows = self._connection.execute(
+                "SELECT rowid, size FROM responses ORDER BY accessed_at LIMIT 500"
+            ).fetchall()
+            if not rows:
+                break
+            doomed = []
+            for rowid, size in rows:
+                if self.total_bytes <= target:
+                    break
+                doomed.append((rowid,))
+                self.total_bytes -= size
+            self._connection.executemany("DELETE FROM responses WHERE rowid = ?", doomed)
+            evicted += len(doomed)
+        logger.info(f"Evicted {evicted} cached LLM responses, {self.total_bytes / 2 ** 20:.1f} MiB left")
+        return evicted
+
+    def add_stage_stats(self, stage: str, stats: Dict[str, int]) -> None:
+        with self._lock:
+            self._connection.execute("INSERT OR IGNORE INTO stage_stats (stage) VALUES (?)", (stage,))
+            self._connection.execute(
+                "UPDATE stage_stats SET hits = hits + ?, misses = misses + ?, stored = stored + ?, evicted = evicted + ? "
+                "WHERE stage = ?",
+                (*(stats[name] for name in STAT_NAMES), stage)
+            )
+
+    def stage_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._connection.execute(f"SELECT stage, {', '.join(STAT_NAMES)} FROM stage_stats ORDER BY stage").fetchall()
+        return {row[0]: dict(zip(STAT_NAMES, row[1:])) for row in rows}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.execute("VACUUM")
+            self.total_bytes = 0
+
+    def entry_count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+_stores: Dict[str, _ResponseStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store(path: str, max_bytes: int) -> _ResponseStore:
+    path = os.path.abspath(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = _ResponseStore(path, max_bytes)
+        return _stores[path]
+
+
+class LLMResponseCache(BaseCache):
+    """LangChain cache of one enrichment stage, backed by the shared SQLite file"""
+
+    def __init__(self, stage: str, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            stage: Name of the stage, used for the hit rate statistics
+            path: The SQLite file. Defaults to LLM_CACHE_PATH
+            max_bytes: Size of the stored responses above which the least recently used are evicted.
+                Defaults to LLM_CACHE_MAX_BYTES
+        """
+        self.stage = stage
+        self.store = _get_store(path or settings.LLM_CACHE_PATH, max_bytes or settings.LLM_CACHE_MAX_BYTES)
+        self._stats = dict.fromkeys(STAT_NAMES, 0)
+        self._flushed = dict.fromkeys(STAT_NAMES, 0)
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        value = self.store.get(_hash(llm_string), _hash(prompt))
+        if value is None:
+            self._count('misses')
+            return None
+        try:
+            generations = loads(value)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached LLM response: {str(e)}")
+            self._count('misses')
+            return None
+        self._count('hits')
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        evicted = self.store.put(_hash(llm_string), _hash(prompt), dumps(list(return_val)))
+        self._count('stored')
+        if evicted:
+            self._count('evicted', evicted)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """The counts since the cache was created and their hit rate."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def log_stats(self) -> Dict[str, Any]:
+        """
+        Log the counts since the last call, e.g. of one run of the stage, and add them to the
+        cumulative counts in the file.
+
+        Returns:
+            Dict[str, Any]: The counts since the last call and their hit rate
+        """
+        with self._stats_lock:
+            stats = {name: self._stats[name] - self._flushed[name] for name in STAT_NAMES}
+            self._flushed = dict(self._stats)
+        self.store.add_stage_stats(self.stage, stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        logger.info(f"LLM cache of stage '{self.stage}': {stats['hits']} hits, {stats['misses']} misses "
+                    f"({stats['hit_rate']:.1%} hit rate), {stats['stored']} stored, {stats['evicted']} evicted")
+        return stats
+
+
+def create_stage_cache(stage: str) -> Optional[LLMResponseCache]:
+    """
+    Create the response cache of a stage.
+
+    Args:
+        stage: Name of the stage
+
+    Returns:
+        LLMResponseCache: The cache, or None when LLM_CACHE_ENABLED is off
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    return LLMResponseCache(stage)
+
+
+def with_response_cache(model, cache: Optional[LLMResponseCache]):
+    """
+    Return a copy of a chat model that uses a response cache, leaving the provider's model as it is.
+
+    Args:
+        model: The chat model
+        cache: The cache, or None to return the model unchanged
+
+    Returns:
+        The chat model to use
+    """
+    if cache is None:
+        return model
+    return model.model_copy(update={'cache': cache})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the LLM response cache")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached response")
+    args = parser.parse_args()
+
+    store = _get_store(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES)
+    if args.clear:
+        store.clear()
+        print(f"Cleared {store.path}")
+        return
+
+    print(f"{store.path}: {store.entry_count()} responses, {store.total_bytes / 2 ** 20:.1f} MiB "
+          f"of {store.max_bytes / 2 ** 20:.0f} MiB")
+    print(f"{'stage':<12} {'hits':>8} {'misses':>8} {'hit rate':>9} {'stored':>8} {'evicted':>8}")
+    for stage, stats in store.stage_stats().items():
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / lookups if lookups else 0.0
+        print(f"{stage:<12} {stats['hits']:>8} {stats['misses']:>8} {hit_rate:>9.1%} {stats['stored']:>8} {stats['evicted']:>8}")
+
+
+if __name__ == "__main__":
+    main()
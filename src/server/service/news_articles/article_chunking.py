@@ -0,0 +1,163 @@
+"""
+Article Chunking
+
+Prepares article content for the summariser's stuff chain. The chain puts every chunk of an article
+into one prompt, so splitting a short article into semantic chunks only costs an embedding of each
+sentence on the CPU without changing what the model reads. The length-aware strategy therefore:
+
+- sends articles of up to SUMMARISER_DIRECT_MAX_TOKENS as a single document (direct)
+- splits longer ones into windows of SUMMARISER_WINDOW_TOKENS on paragraph and sentence
+  boundaries, keeping windows up to SUMMARISER_MAX_PROMPT_TOKENS (windowed, or truncated when
+  windows had to be dropped)
+
+With SUMMARISER_CHUNKING=semantic every article goes through the SemanticChunker as before. Its
+embedding model is only loaded in that mode.
+
+Key components:
+- count_tokens: token count with the gpt-4o tokenizer, loaded on first use
+- chunk_article: the strategy above
+- ChunkingStats: chunking time and article count of each strategy, for the summariser's run log
+"""
+
+# Python Imports
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Third Party Imports
+import tiktoken
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+CHUNKING_MODES = ("auto", "semantic")
+
+# Tokenizer of gpt-4o, the summarisation model
+TOKEN_ENCODING = "o200k_base"
+
+# Characters per token assumed when the tokenizer cannot be loaded
+FALLBACK_CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_semantic_splitter = None
+_semantic_splitter_lock = threading.Lock()
+
+
+def get_semantic_splitter():
+    """Load the embedding model and SemanticChunker on first use, once for every thread."""
+    global _semantic_splitter
+    with _semantic_splitter_lock:
+        if _semantic_splitter is None:
+            from langchain_experimental.text_splitter import SemanticChunker
+            from langchain_huggingface import HuggingFaceEmbeddings
+
+            logger.info("Initializing HuggingFace Embeddings")
+            embeddings = HuggingFaceEmbeddings(
+                model_name="Snowflake/snowflake-arctic-embed-s",
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True}
+            )
+            logger.info("Creating SemanticChunker")
+            _semantic_splitter = SemanticChunker(embeddings)
+    return _semantic_splitter
+
+
+def get_encoding():
+    """
+    Load the gpt-4o tokenizer on first use. tiktoken downloads it once, so without network access
+    and cache it is unavailable and False is returned.
+    """
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                logger.warning(f"Could not load the {TOKEN_ENCODING} tokenizer, estimating token counts: {str(e)}")
+                _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of gpt-4o tokens in a text, estimated from its length if the tokenizer is unavailable."""
+    encoding = get_encoding()
+    if encoding is False:
+        return len(text) // FALLBACK_CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+_window_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=settings.SUMMARISER_WINDOW_TOKENS,
+    chunk_overlap=0,
+    length_function=count_tokens
+)
+
+
+class ChunkingStats:
+    """Articles and seconds spent per chunking strategy, shared by the summariser's workers"""
+
+    def __init__(self):
+        self.articles: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, strategy: str, seconds: float) -> None:
+        with self._lock:
+            self.articles[strategy] = self.articles.get(strategy, 0) + 1
+            self.seconds[strategy] = self.seconds.get(strategy, 0.0) + seconds
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(
+                f"{strategy} {count} ({self.seconds[strategy] / count * 1000:.1f} ms/article)"
+                for strategy, count in sorted(self.articles.items())
+            ) or "no articles"
+
+
+def chunk_article(content: str, mode: Optional[str] = None, stats: Optional[ChunkingStats] = None) -> List[Document]:
+    """
+    Split an article's content into the documents of the summary prompt.
+
+    Args:
+    content (str): The article content.
+    mode (str): auto or semantic. Defaults to SUMMARISER_CHUNKING.
+    stats (ChunkingStats): Optional stats the strategy and its time are added to.
+
+    Returns:
+    List[Document]: The documents to stuff into the prompt.
+    """
+    mode = (mode or settings.SUMMARISER_CHUNKING).lower()
+    if mode not in CHUNKING_MODES:
+        raise ValueError(f"Invalid SUMMARISER_CHUNKING '{mode}', expected one of {CHUNKING_MODES}")
+
+    started = time.perf_counter()
+    if mode == "semantic":
+        strategy = "semantic"
+        documents = get_semantic_splitter().create_documents([content])
+    elif count_tokens(content) <= settings.SUMMARISER_DIRECT_MAX_TOKENS:
+        strategy = "direct"
+        documents = [Document(page_content=content)]
+    else:
+        windows = _window_splitter.split_text(content)
+        kept = []
+        prompt_tokens = 0
+        for window in windows:
+            window_tokens = count_tokens(window)
+            if kept and prompt_tokens + window_tokens > settings.SUMMARISER_MAX_PROMPT_TOKENS:
+                break
+            kept.append(window)
+            prompt_tokens += window_tokens
+        strategy = "windowed" if len(kept) == len(windows) else "truncated"
+        documents = [Document(page_content=window) for window in kept]
+
+    if stats is not None:
+        stats.record(strategy, time.perf_counter() - started)
+    return documents
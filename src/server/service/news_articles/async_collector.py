@@ -0,0 +1,329 @@
+"""
+Async Newscatcher Collector
+
+This module fetches many Newscatcher searches and pages concurrently. The first page of every
+query is fetched to learn how many pages it has, then its remaining pages are fetched in parallel.
+All requests share one token bucket, so the combined request rate stays under the plan's limit,
+and a semaphore caps the number of pages in flight. A 429 response pauses the whole bucket for
+the Retry-After period before the request is retried.
+
+Pages are handed to an on_page callback as soon as they arrive, and progress is tracked per query.
+A page holds its semaphore slot until the callback returns, so a slow sink slows the fetching down
+instead of letting fetched pages pile up in memory.
+
+Key components:
+- build_search_params: the search parameters used by every collector, sync or async
+- QueryProgress: pages, articles and errors of one query
+- AsyncNewscatcherCollector: the concurrent collector
+"""
+
+# Python Imports
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+# Third Party Imports
+import httpx
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.core.rate_limiter import AsyncTokenBucket
+from server.service.news_articles.newscatcher_recorder import create_collector_transport
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+LANGUAGES = "AF,AR,BG,BN,CA,CS,CY,CN,DA,DE,EL,EN,ES,ET,FA,FI,FR,GU,HE,HI,HR,HU,ID,IT,JA,KN,KO,LT,LV,MK,ML,MR,NE,NL,NO,PA,PL,PT,RO,RU,SK,SL,SO,SQ,SV,SW,TA,TE,TH,TL,TR,TW,UK,UR,VI"
+
+COUNTRIES = "AI, AG, AW, BS, BB, BZ, BM, BQ, VG, KY, CU, CW, DM, DO, GD, GP, HT, JM, MQ, MS, PR, BL, KN, LC, MF, VC, SX, TT, TC, VI"
+
+SEARCH_PATH = "/api/search"
+
+# Status codes worth retrying, besides 429
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+# Called with (query, page, articles) for every page fetched
+PageCallback = Callable[[str, int, List[Dict[str, Any]]], Union[None, Awaitable[None]]]
+
+
+def build_search_params(query: str, from_: str, page: int = 1, page_size: int = 1000) -> Dict[str, Any]:
+    """
+    Build the Newscatcher search parameters shared by all collectors.
+
+    Args:
+    query (str): The search query.
+    from_ (str): Start of the search window, e.g. '365 days ago'.
+    page (int): Page number, starting at 1.
+    page_size (int): Number of articles per page.
+
+    Returns:
+    dict: The search parameters, named as the HTTP API expects them.
+    """
+    return {
+        'q': query,
+        'lang': LANGUAGES,
+        'search_in': 'content, summary, title',
+        'countries': COUNTRIES,
+        'sort_by': 'date',
+        'page_size': page_size,
+        'page': page,
+        'from_': from_,
+        'published_date_precision': 'full',
+        'is_paid_content': False
+    }
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+
+    Args:
+    value (str): The header value, or None if the header is missing.
+    default (float): Seconds to wait when the header is missing or invalid.
+
+    Returns:
+    float: Seconds to wait.
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class QueryProgress:
+    """Progress of one query"""
+    query: str
+    total_pages: Optional[int] = None
+    total_hits: Optional[int] = None
+    pages_fetched: int = 0
+    articles: int = 0
+    # Set when the results were truncated and the query was left to be split into smaller ones
+    deferred: bool = False
+    errors: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def complete(self) -> bool:
+        """Whether every page of the query was fetched"""
+        return (self.total_pages is not None and self.pages_fetched >= self.total_pages
+                and not self.errors and not self.deferred)
+
+    def as_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.monotonic()
+        return {
+            'query': self.query,
+            'total_pages': self.total_pages,
+            'total_hits': self.total_hits,
+            'deferred': self.deferred,
+            'pages_fetched': self.pages_fetched,
+            'articles': self.articles,
+            'errors': self.errors,
+            'complete': self.complete,
+            'seconds': round(end - self.started_at, 2)
+        }
+
+
+class AsyncNewscatcherCollector:
+    """Fetches Newscatcher searches concurrently under a shared rate limit"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        page_size: int = 1000,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeout: float = 60.0
+    ):
+        """
+        Args:
+        api_key (str): Newscatcher API key.
+        base_url (str): API base URL. Defaults to NEWSCATCHER_BASE_URL.
+        concurrency (int): Maximum requests in flight. Defaults to NEWSCATCHER_CONCURRENCY.
+        rate_per_second (float): Maximum sustained requests per second. Defaults to NEWSCATCHER_RATE_PER_SECOND.
+        max_retries (int): Retries per request after 429s and server errors. Defaults to NEWSCATCHER_MAX_RETRIES.
+        page_size (int): Number of articles per page.
+        transport: Optional httpx transport, e.g. to call a fake server in-process. Defaults to the
+            recording or replaying transport of NEWSCATCHER_RECORD_MODE, if any.
+        timeout (float): Request timeout in seconds.
+        """
+        if not api_key:
+            raise ValueError("API key is required.")
+        self.api_key = api_key
+        self.base_url = base_url or settings.NEWSCATCHER_BASE_URL
+        self.concurrency = concurrency or settings.NEWSCATCHER_CONCURRENCY
+        self.max_retries = max_retries if max_retries is not None else settings.NEWSCATCHER_MAX_RETRIES
+        self.page_size = page_size
+        self.max_results = settings.NEWSCATCHER_MAX_RESULTS
+        # Without an explicit transport, NEWSCATCHER_RECORD_MODE decides whether to record or replay
+        self.transport = transport if transport is not None else create_collector_transport()
+        self.timeout = timeout
+        self.rate_limiter = AsyncTokenBucket(rate_per_second or settings.NEWSCATCHER_RATE_PER_SECOND)
+        self.progress: Dict[str, QueryProgress] = {}
+        self.requests_made = 0
+        self.rate_limited = 0
+
+    async def _request(self, client: httpx.AsyncClient, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one search request, retrying after 429s and server errors."""
+        http_params = dict(params)
+        http_params['is_paid_content'] = str(http_params['is_paid_content']).lower()
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            self.requests_made += 1
+            try:
+                response = await client.get(SEARCH_PATH, params=http_params)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Request failed ({e}), retrying")
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = parse_retry_after(response.headers.get('Retry-After'), default=2 ** attempt)
+                logger.warning(f"Rate limited, pausing all requests for {retry_after:.1f}s")
+                self.rate_limiter.pause(retry_after)
+                continue
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                logger.warning(f"Server error {response.status_code}, retrying")
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+        raise RuntimeError(f"Gave up after {self.max_retries + 1} attempts for query '{params['q']}' page {params['page']}")
+
+    async def _deliver(self, on_page: Optional[PageCallback], query: str, page: int, articles: List[Dict[str, Any]]) -> None:
+        """Pass a page to the callback and update the query's progress."""
+        progress = self.progress[query]
+        progress.pages_fetched += 1
+        progress.articles += len(articles)
+        logger.info(f"Query '{query}': page {page}/{progress.total_pages}, {len(articles)} articles "
+                    f"({progress.articles} so far)")
+        if on_page is not None:
+            result = on_page(query, page, articles)
+            if inspect.isawaitable(result):
+                await result
+
+    async def fetch_query(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        from_: str,
+        on_page: Optional[PageCallback] = None,
+        defer_truncated: bool = False
+    ) -> QueryProgress:
+        """
+        Fetch every page of one query, the first page alone and the rest concurrently.
+
+        Args:
+        client: The HTTP client.
+        semaphore: Semaphore capping the pages in flight, from request until the callback returns.
+        query (str): The search query.
+        from_ (str): Start of the search window.
+        on_page: Optional callback receiving every page.
+        defer_truncated (bool): Whether to stop after the first page when the query has more hits
+            than the API returns, so the caller can split it. Nothing is delivered in that case.
+
+        Returns:
+        QueryProgress: The progress of the query once it has finished.
+        """
+        progress = self.progress.setdefault(query, QueryProgress(query=query))
+        try:
+            async with semaphore:
+                first_page = await self._request(client, build_search_params(query, from_, 1, self.page_size))
+                # Searches without matches have no total_pages
+                progress.total_pages = int(first_page.get('total_pages') or 0)
+                progress.total_hits = int(first_page.get('total_hits') or 0)
+                if defer_truncated and progress.total_hits > self.max_results:
+                    logger.info(f"Query '{query}' has {progress.total_hits} hits, more than the "
+                                f"{self.max_results} returned, deferring it")
+                    progress.deferred = True
+                if progress.total_pages == 0 or progress.deferred:
+                    progress.finished_at = time.monotonic()
+                    return progress
+                await self._deliver(on_page, query, 1, first_page.get('articles') or [])
+                # Do not keep the first page alive while the other pages are fetched
+                del first_page
+
+            async def fetch_page(page: int) -> None:
+                try:
+                    async with semaphore:
+                        data = await self._request(client, build_search_params(query, from_, page, self.page_size))
+                        await self._deliver(on_page, query, page, data.get('articles') or [])
+                except Exception as e:
+                    logger.error(f"Exception on page {page} for query '{query}': {e}")
+                    progress.errors.append(f"page {page}: {e}")
+
+            await asyncio.gather(*(fetch_page(page) for page in range(2, progress.total_pages + 1)))
+        except Exception as e:
+            logger.error(f"Exception for query '{query}': {e}")
+            progress.errors.append(str(e))
+        progress.finished_at = time.monotonic()
+        return progress
+
+    async def collect(
+        self,
+        queries: Iterable[str],
+        from_: Union[str, Callable[[str], str]],
+        on_page: Optional[PageCallback] = None,
+        defer_truncated: Optional[Callable[[str], bool]] = None
+    ) -> Dict[str, QueryProgress]:
+        """
+        Fetch every page of every query concurrently.
+
+        Args:
+        queries: The search queries.
+        from_: Start of the search window, or a function returning it for a query.
+        on_page: Optional callback receiving every page as (query, page, articles).
+        defer_truncated: Optional function telling whether a query with truncated results should
+            be deferred instead of fetched, see fetch_query().
+
+        Returns:
+        dict: The progress of each query.
+        """
+        queries = list(dict.fromkeys(queries))
+        logger.info(f"Collecting {len(queries)} queries with concurrency {self.concurrency}")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+
+        async with httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={'x-api-token': self.api_key},
+            timeout=self.timeout,
+            transport=self.transport
+        ) as client:
+            await asyncio.gather(*(
+                self.fetch_query(
+                    client, semaphore, query, from_(query) if callable(from_) else from_, on_page,
+                    defer_truncated is not None and defer_truncated(query)
+                )
+                for query in queries
+            ))
+
+        complete = sum(1 for query in queries if self.progress[query].complete)
+        articles = sum(self.progress[query].articles for query in queries)
+        logger.info(f"Collected {articles} articles for {complete}/{len(queries)} complete queries in "
+                    f"{time.monotonic() - started:.1f}s ({self.requests_made} requests, {self.rate_limited} rate limited)")
+        return self.progress
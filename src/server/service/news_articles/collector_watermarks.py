@@ -0,0 +1,125 @@
+"""
+Collector Watermarks
+
+This module records, for every Newscatcher query, the newest published_date collected so far, so
+later runs only ask for articles published since then instead of the whole year again. The next
+run starts from the watermark minus an overlap, to pick up articles that Newscatcher indexes late
+with an earlier published_date.
+
+A watermark only moves forward, and only after every page of its query was fetched. A query that
+fails part way is fetched again from its previous watermark on the next run.
+
+Key components:
+- WatermarkStore: reads and advances the watermarks stored in MongoDB
+- NewestDateTracker: finds the newest published_date of each query while pages stream past
+"""
+
+# Python Imports
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.news_articles.news_article_normaliser import parse_published_date
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+WATERMARK_COLLECTION = "collector_watermarks"
+
+# Format of an absolute 'from_' date in the Newscatcher search API
+FROM_DATE_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+
+class WatermarkStore:
+    """Newest published_date collected per query, stored in the collector_watermarks collection"""
+
+    def __init__(self, db, overlap_hours: Optional[float] = None):
+        """
+        Args:
+        db: MongoDB database instance.
+        overlap_hours (float): Hours fetched again before each watermark. Defaults to COLLECTOR_WATERMARK_OVERLAP_HOURS.
+        """
+        self.collection = db[WATERMARK_COLLECTION]
+        self.overlap = timedelta(hours=overlap_hours if overlap_hours is not None else settings.COLLECTOR_WATERMARK_OVERLAP_HOURS)
+
+    def load(self, queries: Iterable[str]) -> Dict[str, datetime]:
+        """
+        Read the watermarks of several queries at once.
+
+        Args:
+        queries: The search queries.
+
+        Returns:
+        dict: The watermark of each query that has one.
+        """
+        documents = self.collection.find({'_id': {'$in': list(queries)}}, {'published_date': 1})
+        return {document['_id']: document['published_date'] for document in documents}
+
+    def from_date(self, watermark: Optional[datetime], days_ago: int) -> str:
+        """
+        Start of the search window for a query.
+
+        Args:
+        watermark (datetime): The query's watermark, or None if it was never collected.
+        days_ago (int): Window used when there is no watermark.
+
+        Returns:
+        str: The 'from_' search parameter.
+        """
+        if watermark is None:
+            return f'{days_ago} days ago'
+        # Never reach further back than a full collection would
+        start = max(watermark - self.overlap, datetime.utcnow() - timedelta(days=days_ago))
+        return start.strftime(FROM_DATE_FORMAT)
+
+    def advance(self, watermarks: Dict[str, datetime]) -> int:
+        """
+        Move the watermarks of several queries forward. A watermark is never moved back.
+
+        Args:
+        watermarks: The newest published_date collected for each query.
+
+        Returns:
+        int: Number of watermarks created or moved forward.
+        """
+        now = datetime.utcnow()
+        advanced_count = 0
+        for query, published_date in watermarks.items():
+            result = self.collection.update_one(
+                {'_id': query},
+                # Articles dated in the future must not hold the watermark ahead of the clock
+                {'$max': {'published_date': min(published_date, now)}, '$set': {'updated_at': now}},
+                upsert=True
+            )
+            advanced_count += result.modified_count + (1 if result.upserted_id is not None else 0)
+        logger.info(f"Advanced {advanced_count} of {len(watermarks)} collector watermarks")
+        return advanced_count
+
+
+class NewestDateTracker:
+    """Tracks the newest published_date of each query from the pages passing through the collector"""
+
+    def __init__(self):
+        self.newest: Dict[str, datetime] = {}
+
+    def observe(self, query: str, articles: List[Dict[str, Any]]) -> None:
+        """Record the published dates of one page of a query."""
+        for article in articles:
+            published_date = parse_published_date(article.get('published_date'))
+            if published_date is not None and (query not in self.newest or published_date > self.newest[query]):
+                self.newest[query] = published_date
+
+    def completed(self, complete_queries: Iterable[str]) -> Dict[str, datetime]:
+        """
+        Newest dates of the queries whose pages were all fetched.
+
+        Args:
+        complete_queries: The queries that completed.
+
+        Returns:
+        dict: The newest published_date of each complete query that returned articles.
+        """
+        return {query: self.newest[query] for query in complete_queries if query in self.newest}
@@ -0,0 +1,128 @@
+"""
+Keyset Scan
+
+Resumable scan of the articles matching a query for the enrichment scripts. Instead of one server
+cursor that can time out while the model is called, each batch of ENRICHMENT_SCAN_BATCH_SIZE
+articles is read with its own query on _id greater than the last article read, sorted by _id, so
+no cursor is held open between batches.
+
+A named scan stores its position in the pipeline_checkpoints collection whenever the caller has
+flushed the updates of a batch, as the _id up to which every article read was handled. A run that
+dies resumes after that _id on the next run of the same query, and a completed scan removes its
+checkpoint, so the following run starts over and picks up the articles that failed.
+
+Key components:
+- KeysetScan: iterates the articles and keeps the checkpoint
+"""
+
+# Python Imports
+import hashlib
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Third Party Imports
+from bson import json_util
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.news_articles.pipeline_checkpoints import CheckpointStore
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+# Prefix of the checkpoints of scans, which share the collection with the pipeline stages
+SCAN_CHECKPOINT_PREFIX = "scan:"
+
+
+def query_fingerprint(query: Dict[str, Any]) -> str:
+    """Hash of a query, so a checkpoint is only resumed by a scan of the same query."""
+    return hashlib.sha1(json_util.dumps(query, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class KeysetScan:
+    """Articles matching a query in _id order, read in bounded batches and resumable by name"""
+
+    def __init__(self, collection, query: Dict[str, Any], name: Optional[str] = None,
+                 batch_size: Optional[int] = None, projection: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            collection: The articles collection.
+            query (dict): Filter of the articles to scan.
+            name (str): Name of the checkpoint, e.g. the script. Without a name the scan always
+                starts at the beginning and stores nothing.
+            batch_size (int): Articles read per query. Defaults to ENRICHMENT_SCAN_BATCH_SIZE.
+            projection (dict): Optional projection of the articles.
+        """
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self.batch_size = batch_size or settings.ENRICHMENT_SCAN_BATCH_SIZE
+        self.checkpoint_id = SCAN_CHECKPOINT_PREFIX + name if name else None
+        self.checkpoints = CheckpointStore(collection.database) if name else None
+        self.fingerprint = query_fingerprint(query)
+
+        self.start_id = None
+        if self.checkpoints:
+            checkpoint = self.checkpoints.get(self.checkpoint_id)
+            if checkpoint['last_id'] is not None and checkpoint.get('query') == self.fingerprint:
+                self.start_id = checkpoint['last_id']
+                logger.info(f"Resuming scan '{name}' after article {self.start_id}")
+            elif checkpoint['last_id'] is not None:
+                logger.info(f"Scan '{name}' has a checkpoint of another query, starting over")
+
+        self.saved_id = self.start_id
+        self.exhausted = False
+        # _id of every article read and not yet handled, in order, and the handled ones among them
+        self._read = deque()
+        self._handled = set()
+        self._handled_up_to = self.start_id
+
+    def remaining_query(self) -> Dict[str, Any]:
+        """The query of the articles after the resume point."""
+        if self.start_id is None:
+            return self.query
+        return {'$and': [self.query, {'_id': {'$gt': self.start_id}}]}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        position = self.start_id
+        while True:
+            query = self.query if position is None else {'$and': [self.query, {'_id': {'$gt': position}}]}
+            batch = list(self.collection.find(query, self.projection).sort('_id', 1).limit(self.batch_size))
+            if not batch:
+                break
+            for article in batch:
+                self._read.append(article['_id'])
+                yield article
+            position = batch[-1]['_id']
+            if len(batch) < self.batch_size:
+                break
+        self.exhausted = True
+
+    def done(self, ids: Iterable[Any]) -> None:
+        """
+        Mark articles as handled: updated in the database, skipped or failed. Call it for updates
+        only once they are flushed, since save() stores every handled article as done.
+        """
+        self._handled.update(ids)
+        while self._read and self._read[0] in self._handled:
+            self._handled_up_to = self._read.popleft()
+            self._handled.discard(self._handled_up_to)
+
+    def save(self) -> None:
+        """Store the _id up to which every article read was handled, if it moved."""
+        if not self.checkpoints or self._handled_up_to is None or self._handled_up_to == self.saved_id:
+            return
+        self.checkpoints.save_position(self.checkpoint_id, self._handled_up_to, query=self.fingerprint)
+        self.saved_id = self._handled_up_to
+
+    def finish(self) -> None:
+        """Remove the checkpoint once every article was read and handled, otherwise store it."""
+        if not self.checkpoints:
+            return
+        if self.exhausted and not self._read:
+            if self.saved_id is not None:
+                self.checkpoints.reset(self.checkpoint_id)
+        else:
+            self.save()
@@ -0,0 +1,195 @@
+"""
+Link Deduplicator
+
+Overlapping keywords return the same article many times in one collection run, and most of what a
+run fetches is already stored. Upserting all of it costs one unique index lookup per article. This
+module drops those duplicates before they reach MongoDB.
+
+Links already seen in the run are kept in an exact set. Links stored by earlier runs are loaded
+into a Bloom filter from the link index when the run starts. A Bloom filter has no false
+negatives, so a link it does not contain is new and goes straight to the upsert. A link it does
+contain is checked against MongoDB in one batched $in query per page, which rules out the false
+positives.
+
+Duplicates are counted per query, so keywords that only ever return articles found by other
+keywords can be spotted and pruned.
+
+Key components:
+- BloomFilter: a fixed size Bloom filter over strings
+- QueryDuplicateStats: duplicate counts of one query
+- LinkDeduplicator: the run-scoped deduplication layer
+"""
+
+# Python Imports
+import hashlib
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+
+class BloomFilter:
+    """Bloom filter sized for an expected number of items and false positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+        capacity (int): Expected number of items.
+        error_rate (float): False positive rate at that number of items.
+        """
+        capacity = max(1, capacity)
+        self.bit_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: two 64 bit halves of one digest give every position
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.bit_count
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+@dataclass
+class QueryDuplicateStats:
+    """Duplicate counts of one query"""
+    received: int = 0
+    run_duplicates: int = 0
+    stored_duplicates: int = 0
+    new: int = 0
+
+    @property
+    def duplicate_ratio(self) -> float:
+        """Share of the query's articles that were already seen or stored"""
+        if not self.received:
+            return 0.0
+        return (self.run_duplicates + self.stored_duplicates) / self.received
+
+
+class LinkDeduplicator:
+    """Drops the articles already seen in the run or already stored, before they are upserted"""
+
+    def __init__(self, collection, use_bloom_filter: Optional[bool] = None, error_rate: Optional[float] = None):
+        """
+        Args:
+        collection: The articles collection, with its unique link index.
+        use_bloom_filter (bool): Whether to preload the stored links into a Bloom filter. Defaults to COLLECTOR_BLOOM_FILTER.
+        error_rate (float): False positive rate of the Bloom filter. Defaults to COLLECTOR_BLOOM_ERROR_RATE.
+        """
+        self.collection = collection
+        self.use_bloom_filter = settings.COLLECTOR_BLOOM_FILTER if use_bloom_filter is None else use_bloom_filter
+        self.error_rate = error_rate or settings.COLLECTOR_BLOOM_ERROR_RATE
+        self.seen = set()
+        self.bloom_filter: Optional[BloomFilter] = None
+        self.stats: Dict[str, QueryDuplicateStats] = {}
+        self.false_positives = 0
+        # Pages of different queries are deduplicated from several threads
+        self._lock = threading.Lock()
+
+    def preload(self) -> int:
+        """
+        Load every stored link into the Bloom filter. Only the link index is read.
+
+        Returns:
+        int: Number of links loaded.
+        """
+        if not self.use_bloom_filter:
+            return 0
+        stored_count = self.collection.estimated_document_count()
+        # Leave room for the links added during the run
+        self.bloom_filter = BloomFilter(int(stored_count * 1.2) + 100_000, self.error_rate)
+        cursor = self.collection.find({'link': {'$exists': True}}, {'link': 1, '_id': 0}).hint([('link', 1)])
+        for document in cursor.batch_size(10_000):
+            self.bloom_filter.add(document['link'])
+        logger.info(f"Loaded {self.bloom_filter.count} stored links into a Bloom filter "
+                    f"of {len(self.bloom_filter.bits) / 2 ** 20:.1f} MiB")
+        return self.bloom_filter.count
+
+    def filter(self, query: str, articles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop the articles of a page that were already seen in the run or are already stored.
+
+        Args:
+        query (str): The query that returned the page.
+        articles: The articles of the page.
+
+        Returns:
+        list: The new articles, in their original order.
+        """
+        articles = list(articles)
+        candidates = []
+        maybe_stored = []
+        with self._lock:
+            stats = self.stats.setdefault(query, QueryDuplicateStats())
+            stats.received += len(articles)
+            for article in articles:
+                link = article.get('link')
+                if not link or link in self.seen:
+                    stats.run_duplicates += 1
+                    continue
+                self.seen.add(link)
+                candidates.append(article)
+                if self.bloom_filter is not None and link in self.bloom_filter:
+                    maybe_stored.append(link)
+
+        stored_links = set()
+        if maybe_stored:
+            stored_links = {
+                document['link']
+                for document in self.collection.find({'link': {'$in': maybe_stored}}, {'link': 1, '_id': 0})
+            }
+
+        new_articles = [article for article in candidates if article['link'] not in stored_links]
+        with self._lock:
+            stats.stored_duplicates += len(stored_links)
+            stats.new += len(new_articles)
+            self.false_positives += len(maybe_stored) - len(stored_links)
+            if self.bloom_filter is not None:
+                for article in new_articles:
+                    self.bloom_filter.add(article['link'])
+        return new_articles
+
+    def report(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Log and return the queries with the highest duplicate ratio.
+
+        Args:
+        limit (int): Number of queries logged.
+
+        Returns:
+        list: Every query with its counts and duplicate ratio, highest ratio first.
+        """
+        rows = sorted(
+            (
+                {'query': query, 'received': stats.received, 'new': stats.new,
+                 'duplicate_ratio': round(stats.duplicate_ratio, 3)}
+                for query, stats in self.stats.items()
+            ),
+            key=lambda row: (-row['duplicate_ratio'], -row['received'])
+        )
+        received = sum(stats.received for stats in self.stats.values())
+        new = sum(stats.new for stats in self.stats.values())
+        logger.info(f"Deduplication: {received - new} of {received} articles dropped before MongoDB, "
+                    f"{self.false_positives} Bloom filter false positives")
+        for row in rows[:limit]:
+            logger.info(f"  {row['query']}: {row['duplicate_ratio']:.1%} duplicates "
+                        f"({row['new']} new of {row['received']})")
+        return rows
@@ -0,0 +1,366 @@
+"""
+Near Duplicates
+
+Syndicated wire stories are published under many links with the same or nearly the same content,
+and each copy used to get its own LLM summary, Caribbean check and category. This module groups
+such copies into clusters, so enrichment only runs on the oldest article of a cluster, its
+representative, and the results are copied to the other members.
+
+A MinHash signature of the article's word shingles is computed at ingest and stored with the
+article, together with its LSH band keys. Two articles with a similar enough content share at
+least one band key with a high probability, so the candidates of an article are found through an
+index on the band keys instead of comparing it with every stored article. Candidates are then
+kept only if their estimated Jaccard similarity reaches NEAR_DUPLICATE_THRESHOLD.
+
+Key components:
+- MinHasher: signatures and band keys
+- LSHIndex: in-memory band index, used for the articles of a batch and by the benchmark
+- near_duplicate_fields: the fields stored with an article at ingest
+- assign_duplicate_clusters: sets dup_cluster_id and msbm_is_duplicate on the articles of a query
+- copy_to_duplicates: copies a representative's enrichment fields to its cluster members
+"""
+
+# Python Imports
+import argparse
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Third Party Imports
+import numpy as np
+from bson import Binary
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.analytics_service import merge_article_rollups
+from server.service.corpus_version import bump_corpus_version
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+SIGNATURE_FIELD = 'msbm_minhash'
+BANDS_FIELD = 'msbm_lsh_bands'
+CLUSTER_FIELD = 'dup_cluster_id'
+DUPLICATE_FIELD = 'msbm_is_duplicate'
+
+# Fields written by the LLM stages, copied from a representative to its members
+ENRICHMENT_FIELDS = ('msbm_llm_summary', 'msbm_caribbean_article', 'msbm_category')
+
+# Fields the analytics rollups are filtered on, see merge_article_rollups
+ROLLUP_FIELDS = ('msbm_caribbean_article', 'msbm_category')
+
+# Articles not yet assigned to a cluster
+CLUSTER_PENDING_QUERY = {CLUSTER_FIELD: {'$exists': False}}
+
+# Largest prime below 2 ** 32, so signature values fit in 32 bits
+MERSENNE_PRIME = 4294967291
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class MinHasher:
+    """MinHash signatures of word shingles and their LSH band keys"""
+
+    def __init__(
+        self,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+        shingle_size: Optional[int] = None,
+        seed: int = 1
+    ):
+        """
+        Args:
+        num_perm (int): Length of a signature. Defaults to NEAR_DUPLICATE_NUM_PERM.
+        bands (int): Number of LSH bands, which must divide num_perm. Defaults to NEAR_DUPLICATE_BANDS.
+        shingle_size (int): Words per shingle. Defaults to NEAR_DUPLICATE_SHINGLE_SIZE.
+        seed (int): Seed of the hash permutations. Stored signatures are only comparable with the same seed.
+        """
+        self.num_perm = num_perm or settings.NEAR_DUPLICATE_NUM_PERM
+        self.bands = bands or settings.NEAR_DUPLICATE_BANDS
+        self.shingle_size = shingle_size or settings.NEAR_DUPLICATE_SHINGLE_SIZE
+        if self.num_perm % self.bands:
+            raise ValueError(f"{self.bands} bands do not divide a signature of {self.num_perm}")
+        self.rows = self.num_perm // self.bands
+
+        # a * x + b stays below 2 ** 63 for 32-bit hashes, so uint64 arithmetic cannot overflow
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 2 ** 31, size=self.num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 2 ** 31, size=self.num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        """The lowercased word shingles of a text. A text shorter than a shingle is one shingle."""
+        words = WORD_PATTERN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[index:index + self.shingle_size]) for index in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text.
+
+        Returns:
+        np.ndarray: The signature as uint32 values, or None for a text without words.
+        """
+        shingles = self.shingles(text or "")
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little') for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        """The LSH key of each band of a signature, prefixed with the band number."""
+        return [
+            f"{band:02d}" + hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the texts of two signatures."""
+        return float(np.mean(first == second))
+
+    @staticmethod
+    def to_binary(signature: np.ndarray) -> Binary:
+        return Binary(signature.astype('<u4').tobytes())
+
+    @staticmethod
+    def from_binary(value: bytes) -> np.ndarray:
+        return np.frombuffer(bytes(value), dtype='<u4')
+
+
+_default_hasher = None
+
+
+def get_hasher() -> MinHasher:
+    """The MinHasher configured in the settings, shared by ingest and clustering."""
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = MinHasher()
+    return _default_hasher
+
+
+class LSHIndex:
+    """In-memory index of signatures by band key"""
+
+    def __init__(self, hasher: MinHasher):
+        self.hasher = hasher
+        self.buckets: Dict[str, List[Any]] = {}
+        self.entries: Dict[Any, Dict[str, Any]] = {}
+
+    def add(self, key: Any, signature: np.ndarray, bands: List[str], cluster: Any) -> None:
+        self.entries[key] = {'signature': signature, 'cluster': cluster}
+        for band in bands:
+            self.buckets.setdefault(band, []).append(key)
+
+    def candidates(self, bands: Iterable[str]) -> Set[Any]:
+        """Keys sharing at least one band with the given bands."""
+        return {key for band in bands for key in self.buckets.get(band, ())}
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.entries.clear()
+
+
+def near_duplicate_fields(article: Dict[str, Any], hasher: Optional[MinHasher] = None) -> Dict[str, Any]:
+    """
+    Compute the signature fields stored with an article at ingest.
+
+    Args:
+    article (dict): The article, with its 'content'.
+    hasher (MinHasher): Defaults to the configured one.
+
+    Returns:
+    dict: msbm_minhash and msbm_lsh_bands, or nothing for an article without content.
+    """
+    hasher = hasher or get_hasher()
+    signature = hasher.signature(article.get('content'))
+    if signature is None:
+        return {}
+    return {SIGNATURE_FIELD: hasher.to_binary(signature), BANDS_FIELD: hasher.band_keys(signature)}
+
+
+def ensure_duplicate_indexes(collection) -> None:
+    """Create the indexes of the band lookup and of the cluster members."""
+    collection.create_index([(BANDS_FIELD, ASCENDING)], name=BANDS_FIELD)
+    collection.create_index([(CLUSTER_FIELD, ASCENDING)], name=CLUSTER_FIELD)
+
+
+def _best_match(hasher: MinHasher, signature: np.ndarray, candidates: Iterable[Dict[str, Any]], threshold: float) -> Optional[Any]:
+    """The cluster of the most similar candidate at or above the threshold."""
+    best_cluster, best_similarity = None, threshold
+    for candidate in candidates:
+        similarity = hasher.similarity(signature, candidate['signature'])
+        if similarity >= best_similarity:
+            best_cluster, best_similarity = candidate['cluster'], similarity
+    return best_cluster
+
+
+def assign_duplicate_clusters(
+    collection,
+    query: Dict[str, Any],
+    threshold: Optional[float] = None,
+    batch_size: int = 500,
+    hasher: Optional[MinHasher] = None
+) -> Dict[str, Any]:
+    """
+    Assign the articles matching a query to clusters, in _id order. An article joins the cluster
+    of its most similar older article if they are near duplicates, and otherwise starts a cluster
+    of its own. A new member immediately gets the enrichment its representative already has.
+    Articles collected before signatures were stored get one computed from their content.
+
+    Args:
+    collection: The articles collection.
+    query (dict): Filter of the articles to assign, e.g. CLUSTER_PENDING_QUERY.
+    threshold (float): Minimum estimated Jaccard similarity. Defaults to NEAR_DUPLICATE_THRESHOLD.
+    batch_size (int): Number of updates sent per bulk write.
+    hasher (MinHasher): Defaults to the configured one.
+
+    Returns:
+    dict: 'processed', 'duplicates' and 'llm_calls_saved' counts, 'succeeded_ids' and 'failed_ids'.
+    """
+    hasher = hasher or get_hasher()
+    threshold = settings.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+    batch_index = LSHIndex(hasher)
+    bulk_updates = []
+    representatives = set()
+    processed_count = 0
+    duplicate_count = 0
+
+    def flush():
+        if not bulk_updates:
+            return
+        try:
+            collection.bulk_write(bulk_updates, ordered=False)
+        except BulkWriteError as bwe:
+            logger.error(f"Bulk write error: {bwe.details}")
+        bulk_updates.clear()
+        batch_index.clear()
+
+    projection = {'content': 1, SIGNATURE_FIELD: 1, BANDS_FIELD: 1}
+    for article in collection.find(query, projection).sort('_id', 1):
+        processed_count += 1
+        fields = {}
+        if article.get(SIGNATURE_FIELD) is not None:
+            signature = hasher.from_binary(article[SIGNATURE_FIELD])
+            bands = article.get(BANDS_FIELD) or hasher.band_keys(signature)
+        else:
+            fields = near_duplicate_fields(article, hasher)
+            signature = hasher.from_binary(fields[SIGNATURE_FIELD]) if fields else None
+            bands = fields.get(BANDS_FIELD, [])
+
+        cluster = None
+        if signature is not None:
+            stored = collection.find(
+                {BANDS_FIELD: {'$in': bands}, CLUSTER_FIELD: {'$exists': True}, '_id': {'$lt': article['_id']}},
+                {SIGNATURE_FIELD: 1, CLUSTER_FIELD: 1}
+            )
+            candidates = [
+                {'signature': hasher.from_binary(candidate[SIGNATURE_FIELD]), 'cluster': candidate[CLUSTER_FIELD]}
+                for candidate in stored if candidate.get(SIGNATURE_FIELD) is not None
+            ]
+            candidates.extend(batch_index.entries[key] for key in batch_index.candidates(bands))
+            cluster = _best_match(hasher, signature, candidates, threshold)
+
+        is_duplicate = cluster is not None
+        if is_duplicate:
+            duplicate_count += 1
+            representatives.add(cluster)
+        else:
+            cluster = article['_id']
+        if signature is not None:
+            batch_index.add(article['_id'], signature, bands, cluster)
+
+        fields.update({CLUSTER_FIELD: cluster, DUPLICATE_FIELD: is_duplicate})
+        bulk_updates.append(UpdateOne({'_id': article['_id']}, {'$set': fields}))
+        if len(bulk_updates) >= batch_size:
+            flush()
+            logger.info(f"Clustered {processed_count} articles, {duplicate_count} near duplicates")
+
+    flush()
+    copied = copy_to_duplicates(collection, list(representatives))
+    logger.info(f"Clustered {processed_count} articles: {duplicate_count} near duplicates of "
+                f"{len(representatives)} representatives, {copied} got their enrichment copied")
+    return {
+        'processed': processed_count,
+        'duplicates': duplicate_count,
+        'llm_calls_saved': copied,
+        'succeeded_ids': [],
+        'failed_ids': []
+    }
+
+
+def copy_to_duplicates(collection, representative_ids: List[Any], fields: Iterable[str] = ENRICHMENT_FIELDS) -> int:
+    """
+    Copy the enrichment fields of representatives to the members of their clusters that do not
+    have the same value yet. Members whose rollup fields change are merged into the rollups.
+
+    Args:
+    collection: The articles collection.
+    representative_ids: _id values of the representatives.
+    fields: The fields to copy.
+
+    Returns:
+    int: The number of near duplicates updated, i.e. the LLM calls saved. A duplicate counts once
+    however many fields it gets, since one call produces all the fields of a stage.
+    """
+    fields = list(fields)
+    copied = 0
+    updated_ids = set()
+    rollup_ids = set()
+    for start in range(0, len(representative_ids), 500):
+        chunk = representative_ids[start:start + 500]
+        for representative in collection.find({'_id': {'$in': chunk}}, {field: 1 for field in fields}):
+            for field in fields:
+                value = representative.get(field)
+                if value is None or value == "":
+                    continue
+                member_ids = [
+                    member['_id'] for member in collection.find(
+                        {CLUSTER_FIELD: representative['_id'], DUPLICATE_FIELD: True, field: {'$ne': value}}, {'_id': 1}
+                    )
+                ]
+                if not member_ids:
+                    continue
+                collection.update_many({'_id': {'$in': member_ids}}, {'$set': {field: value}})
+                copied += len(member_ids)
+                updated_ids.update(member_ids)
+                if field in ROLLUP_FIELDS:
+                    rollup_ids.update(member_ids)
+
+    if copied:
+        logger.info(f"Copied {copied} enrichment fields to {len(updated_ids)} near duplicates")
+        bump_corpus_version(collection.database, "near duplicate enrichment copy")
+    try:
+        merge_article_rollups(collection, list(rollup_ids))
+    except PyMongoError as e:
+        # The fields are already copied, a failed merge only leaves the rollups short until they are rebuilt
+        logger.error(f"Failed to merge near duplicates into the rollups: {str(e)}")
+    return len(updated_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign near duplicate clusters to the articles that have none")
+    parser.add_argument("--all", action="store_true", help="Recompute the clusters of every article")
+    args = parser.parse_args()
+
+    from server.service.news_articles.news_article_collector import connect_to_mongodb
+    client, collection = connect_to_mongodb()
+    try:
+        ensure_duplicate_indexes(collection)
+        if args.all:
+            collection.update_many({}, {'$unset': {CLUSTER_FIELD: "", DUPLICATE_FIELD: ""}})
+        assign_duplicate_clusters(collection, CLUSTER_PENDING_QUERY)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
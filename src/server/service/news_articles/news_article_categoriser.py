@@ -12,11 +12,22 @@ from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field, field_validator
 from pydantic_core import PydanticCustomError
 from pymongo import MongoClient, UpdateOne
-from pymongo.errors import BulkWriteError, CursorNotFound
+from pymongo.errors import BulkWriteError, PyMongoError
 
 # Local Imports
-from server.core.config import logger, MongoDBConnections
+from server.core.config import get_settings
+from server.core.logging import setup_logger
 from server.service.llm_service import OpenAI
+from server.service.llm_response_cache import create_stage_cache, with_response_cache
+from server.service.corpus_version import bump_corpus_version
+from server.service.analytics_service import merge_article_rollups
+from server.service.news_articles.near_duplicates import DUPLICATE_FIELD, copy_to_duplicates
+from server.service.news_articles.keyset_scan import KeysetScan
+from server.service.news_articles.news_article_collector import find_data_dir
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
 
 logger.info("Starting news article categorization process")
 
@@ -76,12 +87,6 @@ def advanced_retry_with_exponential_backoff(
         return wrapper
     return decorator
 
-def find_data_dir():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    parent_dir = os.path.dirname(current_dir)
-    data_dir = os.path.join(parent_dir, 'data')
-    return data_dir
-
 def load_research_topics():
     data_dir = find_data_dir()
     file_path = os.path.join(data_dir, 'topics_singleword_keywords.json')
@@ -169,7 +174,8 @@ prompt = ChatPromptTemplate.from_template(
 
 # Create the LCEL chain using OpenAI model
 openai = OpenAI()
-model = openai.get_model("gpt4o")
+response_cache = create_stage_cache("categoriser")
+model = with_response_cache(openai.get_model("gpt4o"), response_cache)
 chain = prompt | model | parser
 logger.info("Created LCEL chain with OpenAI GPT-4 model")
 
@@ -195,78 +201,125 @@ def categorize_article(article, chain, categories, format_instructions):
         return None, None
 
 def perform_bulk_update(collection, bulk_updates):
+    """
+    Write the categories, unordered so one failed update does not stop the others, and merge the
+    written articles into the analytics rollups.
+
+    Returns:
+        list: _id of the articles whose update failed to write.
+    """
     if not bulk_updates:
-        return
+        return []
     logger.info(f"Performing bulk update for {len(bulk_updates)} documents")
     try:
-        result = collection.bulk_write([UpdateOne({'_id': update[0]}, {'$set': {'msbm_category': update[1]}}) for update in bulk_updates])
-        logger.info(f"Bulk updated {result.modified_count} documents")
+        result = collection.bulk_write(
+            [UpdateOne({'_id': update[0]}, {'$set': {'msbm_category': update[1]}}) for update in bulk_updates],
+            ordered=False
+        )
+        modified_count = result.modified_count
+        failed_ids = []
     except BulkWriteError as bwe:
         logger.error(f"Bulk write error: {bwe.details}")
+        modified_count = bwe.details.get('nModified', 0)
+        failed_ids = [bulk_updates[error['index']][0] for error in bwe.details['writeErrors']]
+    logger.info(f"Bulk updated {modified_count} documents, {len(failed_ids)} failed")
+    if modified_count:
+        bump_corpus_version(collection.database, "categoriser bulk update")
+    try:
+        merge_article_rollups(collection, [update[0] for update in bulk_updates if update[0] not in failed_ids])
+    except PyMongoError as e:
+        # The articles are already written, a failed merge only leaves the rollups short until they are rebuilt
+        logger.error(f"Failed to merge articles into the rollups: {str(e)}")
+    return failed_ids
+
+# Articles still waiting for a category. Near duplicates get their representative's category.
+CATEGORY_PENDING_QUERY = {
+    "$or": [
+        {"msbm_category": {"$exists": False}},
+        {"msbm_category": ""}
+    ],
+    DUPLICATE_FIELD: {"$ne": True}
+}
+
+def categorize_matching_articles(collection, query, scan_name=None):
+    """
+    Categorizes the articles matching a query, in _id order, updating the database every 50
+    articles. Articles are read in batches of ENRICHMENT_SCAN_BATCH_SIZE without a long-lived cursor.
+
+    Args:
+        collection: The articles collection.
+        query (dict): Filter of the articles to categorize, e.g. CATEGORY_PENDING_QUERY.
+        scan_name (str): Name of the scan's checkpoint, saved after every bulk update so an
+            interrupted run resumes where it stopped. None for no checkpoint.
+
+    Returns:
+        dict: 'processed', 'errors', 'llm_calls_saved' and 'cache_hits' counts, 'succeeded_ids' and 'failed_ids'.
+    """
+    scan = KeysetScan(collection, query, name=scan_name)
+
+    total_count = collection.count_documents(scan.remaining_query())
+    logger.info(f"Found {total_count} articles to categorize")
+
+    bulk_updates = []
+    succeeded_ids = []
+    failed_ids = []
+
+    def flush():
+        """
+        Write the queued categories and move the scan's checkpoint past them. Articles whose
+        update failed count as failed and keep the checkpoint before them, so the next run reads them again.
+        """
+        flushed_ids = [update[0] for update in bulk_updates]
+        unwritten_ids = set(perform_bulk_update(collection, bulk_updates))
+        bulk_updates.clear()
+        if unwritten_ids:
+            failed_ids.extend(article_id for article_id in flushed_ids if article_id in unwritten_ids)
+            succeeded_ids[:] = [article_id for article_id in succeeded_ids if article_id not in unwritten_ids]
+        scan.done(article_id for article_id in flushed_ids if article_id not in unwritten_ids)
+        scan.save()
+
+    for article in scan:
+        try:
+            article_id, category = categorize_article(article, chain, categories, format_instructions)
+            if article_id and category:
+                bulk_updates.append((article_id, category))
+                succeeded_ids.append(article_id)
+
+                if len(bulk_updates) >= 50:
+                    flush()
+                    logger.info(f"Categorized {len(succeeded_ids)} out of {total_count} articles")
+            else:
+                scan.done([article['_id']])
+        except Exception as exc:
+            failed_ids.append(article['_id'])
+            scan.done([article['_id']])
+            logger.warning(f'Article generated an exception: {exc}')
+
+    if bulk_updates:
+        flush()
+    scan.finish()
+    copied_count = copy_to_duplicates(collection, succeeded_ids, ['msbm_category'])
+    cache_stats = response_cache.log_stats() if response_cache else {}
+
+    logger.info(f"Categorization complete. Successful: {len(succeeded_ids)}, Errors: {len(failed_ids)}, "
+                f"Copied to near duplicates: {copied_count}")
+    return {
+        'processed': len(succeeded_ids),
+        'errors': len(failed_ids),
+        'llm_calls_saved': copied_count,
+        'cache_hits': cache_stats.get('hits', 0),
+        'succeeded_ids': succeeded_ids,
+        'failed_ids': failed_ids
+    }
 
 def categorize_articles():
     logger.info("Starting article categorization")
     try:
-        client = MongoClient(MongoDBConnections.MONGODB_CONNECTION_STRING)
-        db = client[MongoDBConnections.MONGODB_DB_NAME]
+        client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+        db = client[settings.MONGODB_DB_NAME]
         collection = db['articles']
 
-        cursor = collection.find({
-            "$or": [
-                {"msbm_category": {"$exists": False}},
-                {"msbm_category": ""}
-            ]
-        }).batch_size(100).max_time_ms(1800000)  # 30 minutes timeout
-
-        total_count = collection.count_documents({
-            "$or": [
-                {"msbm_category": {"$exists": False}},
-                {"msbm_category": ""}
-            ]
-        })
-        logger.info(f"Found {total_count} articles to categorize")
-
-        categorized_count = 0
-        error_count = 0
-        bulk_updates = []
-
-        while True:
-            try:
-                for article in cursor:
-                    try:
-                        article_id, category = categorize_article(article, chain, categories, format_instructions)
-                        if article_id and category:
-                            bulk_updates.append((article_id, category))
-                            categorized_count += 1
-
-                            if len(bulk_updates) >= 50:
-                                perform_bulk_update(collection, bulk_updates)
-                                bulk_updates = []
-                                logger.info(f"Categorized {categorized_count} out of {total_count} articles")
-                    except Exception as exc:
-                        error_count += 1
-                        logger.warning(f'Article generated an exception: {exc}')
-
-                break  # Exit the while loop if we've processed all documents without a CursorNotFound error
-            except CursorNotFound:
-                last_id = article['_id'] if 'article' in locals() else None
-                if last_id:
-                    cursor = collection.find({
-                        "$or": [
-                            {"msbm_category": {"$exists": False}},
-                            {"msbm_category": ""}
-                        ],
-                        "_id": {"$gt": last_id}
-                    }).batch_size(100).max_time_ms(1800000)
-                    logger.info(f"Cursor timed out. Resuming from article {last_id}")
-                else:
-                    logger.warning("Cursor timed out and unable to resume. Exiting.")
-                    break
-
-        if bulk_updates:
-            perform_bulk_update(collection, bulk_updates)
-
-        logger.info(f"Categorization complete. Successful: {categorized_count}, Errors: {error_count}")
+        categorize_matching_articles(collection, CATEGORY_PENDING_QUERY, scan_name="categoriser")
 
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
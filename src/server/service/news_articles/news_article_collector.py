@@ -1,10 +1,11 @@
 # Python Imports
+import asyncio
 import json
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 # Third Party Imports
-from newscatcherapi_client import ApiException, Newscatcher
+import httpx
 import pymongo
 from pymongo import MongoClient
 from pymongo.errors import BulkWriteError, ConnectionFailure
@@ -12,13 +13,15 @@ from pymongo.errors import BulkWriteError, ConnectionFailure
 # Local Imports
 from server.core.config import get_settings
 from server.core.logging import setup_logger
+from server.service.news_articles.news_article_normaliser import ensure_article_indexes, normalise_article
+from server.service.news_articles.collector_watermarks import NewestDateTracker, WatermarkStore
+from server.service.news_articles.link_deduplicator import LinkDeduplicator
+from server.service.news_articles.near_duplicates import near_duplicate_fields
+from server.service.news_articles.query_planner import QueryPlanner, build_or_query
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
 
 logger = setup_logger(name=__name__)
 
-LANGUAGES = "AF,AR,BG,BN,CA,CS,CY,CN,DA,DE,EL,EN,ES,ET,FA,FI,FR,GU,HE,HI,HR,HU,ID,IT,JA,KN,KO,LT,LV,MK,ML,MR,NE,NL,NO,PA,PL,PT,RO,RU,SK,SL,SO,SQ,SV,SW,TA,TE,TH,TL,TR,TW,UK,UR,VI"
-
-COUNTRIES = "AI, AG, AW, BS, BB, BZ, BM, BQ, VG, KY, CU, CW, DM, DO, GD, GP, HT, JM, MQ, MS, PR, BL, KN, LC, MF, VC, SX, TT, TC, VI"
-
 settings = get_settings()
 NEWS_API_KEY = settings.NEWS_API_KEY
 MONGODB_CONNECTION_STRING = settings.MONGODB_CONNECTION_STRING
@@ -65,111 +68,6 @@ def load_research_topics() -> List[str]:
         logger.error(f"Error decoding topics.json at {json_file_path}")
         raise
 
-def fetch_newscatcher_articles(
-    api_key: str,
-    query: str,
-    days_ago: int = 365,
-    page_size: int = 1000
-) -> List[Dict[Any, Any]]:
-    """
-    Generic function to fetch news articles using the Newscatcher API.
-
-    Args:
-        api_key (str): Newscatcher API key.
-        query (str): The search query.
-        days_ago (int): Number of days in the past to search for articles. Defaults to 365.
-        page_size (int): Number of articles to retrieve per page. Defaults to 1000.
-
-    Returns:
-        List[Dict[Any, Any]]: A list of dictionaries, where each dictionary represents an article.
-
-    Raises:
-        ValueError: If no API key is provided.
-        ApiException: If there's an error in making the API request.
-    """
-    logger.info(f"Starting to fetch news articles for query: {query}")
-
-    if not api_key:
-        logger.error("No API key provided")
-        raise ValueError("API key is required.")
-
-    newscatcher = Newscatcher(api_key=api_key)
-    logger.debug("Newscatcher API client initialized")
-
-    # Define search parameters
-    languages = LANGUAGES
-    search_in = 'content, summary, title'
-    countries = COUNTRIES
-
-    articles_list = []
-    page = 1
-    while True:
-            try:
-                logger.info(f"Fetching page {page} of news articles for query: {query}")
-                get_news = newscatcher.search.get(
-                    q=query,
-                    lang=languages,
-                    search_in=search_in,
-                    countries=countries,
-                    sort_by='date',
-                    page_size=page_size,
-                    page=page,
-                    from_=f'{days_ago} days ago',
-                    published_date_precision='full',
-                    is_paid_content=False
-                )
-
-                articles_list.extend(get_news.articles)
-                logger.info(f"Added {len(get_news.articles)} articles from page {page}")
-
-                if page >= get_news.total_pages:
-                    logger.info(f"Reached the last page of results for query: {query}")
-                    break
-                
-                page += 1
-            except ApiException as e:
-                logger.error(f"Exception on page {page} for query '{query}': {e}")
-                break
-    logger.info(f"Finished fetching news articles. Total articles retrieved: {len(articles_list)}")
-    return articles_list
-
-def get_gender_news_articles(
-    api_key: str,
-    days_ago: int = 365,
-    page_size: int = 1000
-) -> List[Dict[Any, Any]]:
-    """
-    Fetches news articles related to gender topics using the Newscatcher API.
-
-    Args:
-        api_key (str): Newscatcher API key.
-        days_ago (int): Number of days in the past to search for articles. Defaults to 365.
-        page_size (int): Number of articles to retrieve per page. Defaults to 1000.
-
-    Returns:
-        List[Dict[Any, Any]]: A list of dictionaries, where each dictionary represents an article.
-
-    Raises:
-        ValueError: If no API key is provided.
-        ApiException: If there's an error in making the API request.
-    """
-    logger.info(f"Starting to fetch gender news articles for the past {days_ago} days")
-
-    # Load research topics
-    topics = load_research_topics()
-
-    gender_news_articles_list = []
-
-    for topic in topics:
-        try:
-            articles = fetch_newscatcher_articles(api_key, topic, days_ago, page_size)
-            gender_news_articles_list.extend(articles)
-        except Exception as e:
-            logger.error(f"Error fetching articles for topic '{topic}': {e}")
-
-    logger.info(f"Finished fetching gender news articles. Total articles retrieved: {len(gender_news_articles_list)}")
-    return gender_news_articles_list
-
 def find_data_dir():
     """Find the data directory of the project."""
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -224,67 +122,200 @@ def load_keywords() -> List[str]:
         logger.error(f"Error decoding topics_singleword_keywords.json at {json_file_path}")
         raise
 
-def search_newscatcher_by_keywords(
+def load_keywords_by_language() -> Dict[str, List[str]]:
+    """
+    Load the keywords of the topics_singleword_keywords.json file grouped by language.
+
+    Returns:
+        Dict[str, List[str]]: The sorted unique keywords of each language.
+    """
+    json_file_path = os.path.join(find_data_dir(), 'topics_singleword_keywords.json')
+    with open(json_file_path, 'r') as file:
+        keywords_data = json.load(file)
+
+    keywords_by_language = {}
+    for item in keywords_data:
+        for language, language_keywords in item.get('keywords', {}).items():
+            keywords_by_language.setdefault(language, set()).update(language_keywords)
+
+    logger.info(f"Loaded keywords for {len(keywords_by_language)} languages")
+    return {language: sorted(keywords) for language, keywords in keywords_by_language.items()}
+
+def collect_news_articles(
     api_key: str,
+    queries: Union[List[str], Dict[str, List[str]]],
+    collection,
     days_ago: int = 365,
-    page_size: int = 1000
-) -> List[Dict[Any, Any]]:
+    page_size: int = 1000,
+    concurrency: Optional[int] = None,
+    use_watermarks: bool = True,
+    collector: Optional[AsyncNewscatcherCollector] = None
+) -> Dict[str, int]:
     """
-    Searches for news articles using all keywords across all languages using the Newscatcher API.
+    Fetches every page of every query concurrently under the shared Newscatcher rate limit and
+    upserts each page into MongoDB as soon as it arrives, so no more than a few pages are held in
+    memory at a time. Queries collected before are only fetched from their watermark onwards, and
+    articles already seen in the run or already stored are dropped before the upsert.
 
     Args:
         api_key (str): Newscatcher API key.
-        days_ago (int): Number of days in the past to search for articles. Defaults to 365.
+        queries: The search queries, e.g. research topics, or the keywords of each language, which
+            the QueryPlanner packs into OR-combined queries.
+        collection: MongoDB collection object.
+        days_ago (int): Number of days in the past to search for articles without a watermark. Defaults to 365.
         page_size (int): Number of articles to retrieve per page. Defaults to 1000.
+        concurrency (int): Maximum pages in flight. Defaults to NEWSCATCHER_CONCURRENCY.
+        use_watermarks (bool): Whether to start from the watermarks, False to fetch the full window.
+            Watermarks are advanced either way.
+        collector (AsyncNewscatcherCollector): Optional preconfigured collector, e.g. one calling a fake server.
 
     Returns:
-        List[Dict[Any, Any]]: A list of dictionaries, where each dictionary represents an article.
-
-    Raises:
-        ValueError: If no API key is provided.
-        ApiException: If there's an error in making the API request.
+        Dict[str, int]: The upload counts, summed over every page.
     """
-    logger.info(f"Starting to search news articles by keywords for the past {days_ago} days")
-
-    # Load keywords
-    keywords = load_keywords()
+    planner = None
+    if isinstance(queries, dict):
+        planner = QueryPlanner()
+        batches = planner.plan(queries)
+        queries = [build_or_query(batch) for batch in batches]
+
+    totals = new_upload_stats()
+    watermark_store = WatermarkStore(collection.database)
+    watermarks = watermark_store.load(queries) if use_watermarks else {}
+    logger.info(f"{len(watermarks)} of {len(queries)} queries resume from their watermark")
+
+    def from_date(query: str) -> str:
+        # Batches split during the run were not loaded up front
+        if use_watermarks and query not in watermarks:
+            watermarks.update(watermark_store.load([query]))
+        return watermark_store.from_date(watermarks.get(query), days_ago)
+
+    deduplicator = LinkDeduplicator(collection)
+    deduplicator.preload()
+    tracker = NewestDateTracker()
+    upload = make_upload_sink(collection, totals, deduplicator)
+
+    async def on_page(query: str, page: int, articles: List[Dict[Any, Any]]) -> None:
+        await upload(query, page, articles)
+        tracker.observe(query, articles)
+
+    collector = collector or AsyncNewscatcherCollector(api_key, concurrency=concurrency, page_size=page_size)
+    if planner is not None:
+        progress = asyncio.run(planner.collect(collector, batches, from_date, on_page))
+    else:
+        progress = asyncio.run(collector.collect(queries, from_date, on_page))
+
+    complete = [query for query, query_progress in progress.items() if query_progress.complete]
+    # Deferred batches were split and searched again, they did not fail
+    incomplete = [query for query, query_progress in progress.items()
+                  if not query_progress.complete and not query_progress.deferred]
+    if incomplete:
+        logger.warning(f"{len(incomplete)} queries did not complete and keep their watermark: {incomplete}")
+    watermark_store.advance(tracker.completed(complete))
+    deduplicator.report()
+    logger.info(f"Finished collecting news articles with {collector.requests_made} requests: {totals}")
+    return totals
+
+def new_upload_stats() -> Dict[str, int]:
+    """Returns zeroed upload counts."""
+    return {'received': 0, 'duplicates': 0, 'upserted': 0, 'errors': 0}
+
+def add_upload_stats(totals: Dict[str, int], stats: Dict[str, int]) -> None:
+    """Adds the counts of one upload to the running totals."""
+    for key, value in stats.items():
+        totals[key] += value
+
+def make_upload_sink(collection, totals: Dict[str, int], deduplicator: Optional[LinkDeduplicator] = None):
+    """
+    Builds an on_page callback for AsyncNewscatcherCollector that upserts each page and adds its
+    counts to totals.
 
-    news_articles_list = []
+    Args:
+        collection: MongoDB collection object.
+        totals (Dict[str, int]): Running upload counts, from new_upload_stats().
+        deduplicator (LinkDeduplicator): Optional run-scoped deduplicator, dropping the articles
+            already seen or stored before they are upserted.
 
-    for keyword in keywords:
-        try:
-            articles = fetch_newscatcher_articles(api_key, keyword, days_ago, page_size)
-            news_articles_list.extend(articles)
-        except ApiException as e:
-            logger.error(f"Error fetching articles for keyword '{keyword}': {e}")
+    Returns:
+        The async callback.
+    """
+    def write_page(query: str, articles: List[Dict[Any, Any]]) -> Dict[str, int]:
+        if deduplicator is None:
+            return upload_articles_to_mongodb(collection, articles)
+        new_articles = deduplicator.filter(query, articles)
+        stats = upload_articles_to_mongodb(collection, new_articles)
+        stats['duplicates'] += len(articles) - len(new_articles)
+        stats['received'] = len(articles)
+        return stats
+
+    async def on_page(query: str, page: int, articles: List[Dict[Any, Any]]) -> None:
+        # pymongo is blocking, so the write runs in a thread while other pages are fetched
+        stats = await asyncio.to_thread(write_page, query, articles)
+        add_upload_stats(totals, stats)
+
+    return on_page
+
+def dedupe_articles(articles: Iterable[Dict]) -> List[Dict]:
+    """
+    Drops the articles without a link and the repeated links of a page, keeping the first.
 
-    logger.info(f"Finished fetching news articles by keywords. Total articles retrieved: {len(news_articles_list)}")
-    return news_articles_list
+    Args:
+        articles (Iterable[Dict]): The articles of a page.
 
-def upload_articles_to_mongodb(collection, articles: List[Dict]) -> None:
+    Returns:
+        List[Dict]: The articles with distinct links, in their original order.
     """
-    Uploads articles to MongoDB using bulk operations, checking for pre-existing articles.
+    unique_articles = {}
+    for article in articles:
+        link = article.get('link')
+        if link and link not in unique_articles:
+            unique_articles[link] = article
+    return list(unique_articles.values())
+
+def upload_articles_to_mongodb(collection, articles: List[Dict], chunk_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Uploads articles to MongoDB using unordered bulk upserts of at most chunk_size articles,
+    skipping pre-existing articles. A failing write does not stop the rest of its chunk, nor the
+    chunks after it.
 
     Args:
         collection: MongoDB collection object.
-        articles (List[Dict]): List of articles to upload.
+        articles (List[Dict]): List of articles to upload, usually one page.
+        chunk_size (int): Maximum articles per bulk write. Defaults to COLLECTOR_BULK_CHUNK_SIZE.
+
+    Returns:
+        Dict[str, int]: Articles received, duplicates dropped, articles upserted and write errors.
     """
-    if not articles:
+    stats = new_upload_stats()
+    stats['received'] = len(articles)
+    unique_articles = dedupe_articles(articles)
+    stats['duplicates'] = len(articles) - len(unique_articles)
+    if not unique_articles:
         logger.info("No articles to upload.")
-        return
-
-    # Use bulk write operations for better performance
-    bulk_operations = [
-        pymongo.UpdateOne({'link': article['link']}, {'$setOnInsert': article}, upsert=True)
-        for article in articles
-    ]
-
-    try:
-        result = collection.bulk_write(bulk_operations)
-        logger.info(f"Bulk upserted {result.upserted_count} articles, "
-                    f"modified {result.modified_count} articles")
-    except BulkWriteError as e:
-        logger.error(f"Bulk write error: {str(e)}")
+        return stats
+
+    chunk_size = chunk_size or settings.COLLECTOR_BULK_CHUNK_SIZE
+    for start in range(0, len(unique_articles), chunk_size):
+        # Use bulk write operations for better performance, normalising and signing each article on insert
+        bulk_operations = [
+            pymongo.UpdateOne(
+                {'link': article['link']},
+                {'$setOnInsert': {**normalise_article(article), **near_duplicate_fields(article)}},
+                upsert=True
+            )
+            for article in unique_articles[start:start + chunk_size]
+        ]
+        try:
+            result = collection.bulk_write(bulk_operations, ordered=False)
+            stats['upserted'] += result.upserted_count
+        except BulkWriteError as e:
+            # Unordered writes carry on past errors, so the chunk is partially applied
+            stats['upserted'] += e.details.get('nUpserted', 0)
+            stats['errors'] += len(e.details.get('writeErrors', []))
+            logger.error(f"Bulk write error: {str(e)}")
+
+    logger.info(f"Bulk upserted {stats['upserted']} of {len(unique_articles)} articles "
+                f"({stats['duplicates']} duplicates dropped, {stats['errors']} errors)")
+    return stats
 
 def connect_to_mongodb():
     """
@@ -308,6 +339,8 @@ def connect_to_mongodb():
             collection.create_index([("link", 1)], unique=True)
             logger.info("Created index on 'link' field")
 
+        ensure_article_indexes(collection)
+
         return client, collection
     except ConnectionFailure as e:
         logger.error(f"Failed to connect to MongoDB: {str(e)}", exc_info=True)
@@ -337,18 +370,18 @@ def main():
             if choice == '1':
                 logger.info("Fetching and uploading news...")
                 try:
-                    articles = get_gender_news_articles(api_key=NEWS_API_KEY)
-                    upload_articles_to_mongodb(collection, articles)
-                    logger.info(f"Operation completed. Processed {len(articles)} articles.")
-                except (ApiException, ValueError) as e:
+                    stats = collect_news_articles(NEWS_API_KEY, load_research_topics(), collection)
+                    logger.info(f"Operation completed. Processed {stats['received']} articles, "
+                                f"{stats['upserted']} new.")
+                except (httpx.HTTPStatusError, ValueError) as e:
                     logger.error(f"Error fetching or uploading articles: {str(e)}")
             elif choice == '2':
                 logger.info("Searching and uploading news by keywords...")
                 try:
-                    articles = search_newscatcher_by_keywords(api_key=NEWS_API_KEY)
-                    upload_articles_to_mongodb(collection, articles)
-                    logger.info(f"Operation completed. Processed {len(articles)} articles.")
-                except (ApiException, ValueError) as e:
+                    stats = collect_news_articles(NEWS_API_KEY, load_keywords_by_language(), collection)
+                    logger.info(f"Operation completed. Processed {stats['received']} articles, "
+                                f"{stats['upserted']} new.")
+                except (httpx.HTTPStatusError, ValueError) as e:
                     logger.error(f"Error searching or uploading articles: {str(e)}")
             elif choice == '3':
                 logger.info("Exiting the program.")
@@ -0,0 +1,425 @@
+"""
+News Article Enricher
+
+Fused enrichment of news articles: one structured-output call per article returns the summary,
+the research topic and the Caribbean flag, instead of three passes over the collection with a
+GPT-4o call each (the summariser, the Caribbean check and the categoriser). The later two calls
+only read the summary, so the fused call sends the article once and saves their prompts, including
+the category definitions and format instructions, and their round trips.
+
+The category is validated against the research topics the categoriser uses. An article whose category is
+not one of them still gets its summary and Caribbean flag, and is left to the categoriser. The
+Caribbean flag is stored as the same 'True' or 'False' string as the Caribbean check stores. The
+three fields of an article are written with one bulk update, merged into the analytics rollups
+once and copied to the article's near duplicates together.
+
+The compatibility mode (--field) runs the original stage of a single field instead, e.g. to
+categorise articles that were summarised before the fused stage existed.
+
+Key components:
+- load_research_topics: the categories and their definitions
+- ArticleEnrichment: structured output of the fused call
+- create_enrichment_chain: the prompt and model of the fused call
+- enrich_article: enriches one article, returning its fields and token usage
+- enrich_articles: the fused stage on the articles matching a query, with a bounded worker pool
+- run_single_field: the compatibility mode
+
+Usage:
+    python -m server.service.news_articles.news_article_enricher
+    python -m server.service.news_articles.news_article_enricher --field category
+"""
+
+# Python Imports
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+# Third Party Imports
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.core.rate_limiter import TokenBucket
+from server.service.llm_service import OpenAI
+from server.service.llm_response_cache import create_stage_cache, with_response_cache
+from server.service.corpus_version import bump_corpus_version
+from server.service.analytics_service import merge_article_rollups
+from server.service.news_articles.article_chunking import ChunkingStats, chunk_article
+from server.service.news_articles.async_collector import COUNTRIES
+from server.service.news_articles.keyset_scan import KeysetScan
+from server.service.news_articles.near_duplicates import ENRICHMENT_FIELDS, copy_to_duplicates
+from server.service.news_articles.news_article_collector import find_data_dir
+from server.service.news_articles.news_article_summariser import (
+    SUMMARY_PENDING_QUERY,
+    advanced_retry_with_exponential_backoff
+)
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+# The fused stage takes the articles without a summary, as the summariser did, and sets all three fields
+ENRICHMENT_PENDING_QUERY = SUMMARY_PENDING_QUERY
+
+
+def load_research_topics() -> Dict[str, str]:
+    """
+    Load the research topics and their definitions, named as the categoriser names them so both
+    stages store the same categories.
+
+    Returns:
+        Dict[str, str]: The definition of each research topic.
+    """
+    with open(os.path.join(find_data_dir(), 'topics_singleword_keywords.json'), 'r') as file:
+        data = json.load(file)
+
+    research_topics = {}
+    for item in data:
+        topic = item.get('research_topic')
+        definition = item.get('definition', '')
+        if isinstance(topic, list):
+            # Combine nested arrays
+            combined_topic = ' & '.join(word.split()[-1] for word in topic)
+            research_topics[f"{topic[0].split()[0]} {combined_topic}"] = definition
+        elif isinstance(topic, str):
+            research_topics[topic] = definition
+    logger.info(f"Loaded {len(research_topics)} research topics")
+    return research_topics
+
+
+research_topics = load_research_topics()
+
+# The categories with their definitions for the prompt
+categories = "; ".join([f"{topic}: {definition}" for topic, definition in research_topics.items()])
+
+ENRICHMENT_PROMPT = """
+<background_information>
+You are an expert at summarising and categorising article text.
+You will be given articles primarily focused on topics related to gender within the Caribbean.
+The list of Caribbean countries is: {countries}
+</background_information>
+
+<objective>
+1. summary: Craft a summary that is detailed, thorough, in-depth, and complex, while maintaining clarity and conciseness.
+2. category: Categorize the article into one of these categories. Each category is followed by its definition which should be used to guide your categorization:
+{categories}
+3. is_caribbean: Determine if the article is ONLY about news from a Caribbean country listed above.
+</objective>
+
+<constraints>
+Summary Word Count: 75
+Tone: Professional
+Style: Gender Expert
+Audience: Journalists, Researchers, Lecturers, Gender Activists
+ONLY rely on the provided text, without including external information.
+ONLY use the categories provided and output the category name exactly as written.
+</constraints>
+
+<article_context>
+{context}
+</article_context>
+"""
+
+
+class ArticleEnrichment(BaseModel):
+    """Summary, category and Caribbean flag of an article"""
+    summary: str = Field(description="Paragraph summarising the article, with no other prose than the summary")
+    category: str = Field(description="The one category of the article, exactly as written in the list of categories")
+    is_caribbean: Literal['True', 'False'] = Field(description="Whether the article is ONLY about news from a Caribbean country")
+
+
+def create_enrichment_chain(model):
+    """
+    Create the chain of the fused call. It returns the parsed ArticleEnrichment along with the raw
+    message, whose usage metadata holds the tokens of the call.
+
+    Args:
+        model: The chat model.
+
+    Returns:
+        Runnable: The chain, invoked with the article's 'context'.
+    """
+    prompt = ChatPromptTemplate.from_messages([("human", ENRICHMENT_PROMPT)]).partial(
+        countries=COUNTRIES,
+        categories=categories
+    )
+    return prompt | model.with_structured_output(ArticleEnrichment, include_raw=True)
+
+
+llm_provider = OpenAI()
+response_cache = create_stage_cache("enricher")
+enrichment_chain = create_enrichment_chain(
+    with_response_cache(llm_provider.get_model("gpt4o"), response_cache)
+)
+
+# Shared by every worker, so the workers together stay under SUMMARISER_RATE_PER_SECOND
+rate_limiter = TokenBucket(settings.SUMMARISER_RATE_PER_SECOND)
+
+
+@advanced_retry_with_exponential_backoff(
+    max_retries=settings.SUMMARISER_MAX_RETRIES,
+    base_delay=7,
+    transient_factor=1.5,
+    rate_limit_factor=2,
+    exceptions_to_check=(Exception,),
+    rate_limiter=rate_limiter
+)
+def invoke_enrichment_chain(context: str) -> Dict[str, Any]:
+    """Call the model once the shared rate limiter allows it, retrying on errors."""
+    rate_limiter.acquire()
+    return enrichment_chain.invoke({"context": context})
+
+
+def enrich_article(document: Dict[str, Any], chunking_stats: Optional[ChunkingStats] = None) -> Optional[Tuple[Dict[str, str], Dict[str, int]]]:
+    """
+    Enrich a single article. Runs in a worker thread, so it only calls the model and leaves the
+    database update to the caller.
+
+    Args:
+        document (dict): The article.
+        chunking_stats (ChunkingStats): Optional stats of the chunking strategies used.
+
+    Returns:
+        tuple: The fields to set and the token usage of the call, or None if the article has no content.
+    """
+    if not document.get('content'):
+        logger.warning(f"Document {document['_id']} has no or empty content. Skipping.")
+        return None
+
+    context = "\n\n".join(chunk.page_content for chunk in chunk_article(document['content'], stats=chunking_stats))
+    result = invoke_enrichment_chain(context)
+    if result['parsing_error'] is not None:
+        raise ValueError(f"Invalid enrichment of document {document['_id']}: {result['parsing_error']}")
+
+    enrichment = result['parsed']
+    fields = {
+        'msbm_llm_summary': enrichment.summary,
+        'msbm_caribbean_article': enrichment.is_caribbean
+    }
+    if enrichment.category in research_topics:
+        fields['msbm_category'] = enrichment.category
+    else:
+        logger.warning(f"Document {document['_id']} got the unknown category '{enrichment.category}', "
+                       f"leaving it to the categoriser")
+
+    usage = getattr(result['raw'], 'usage_metadata', None) or {}
+    return fields, {'input_tokens': usage.get('input_tokens', 0), 'output_tokens': usage.get('output_tokens', 0)}
+
+
+def perform_bulk_update(collection, bulk_updates) -> List[Any]:
+    """
+    Write the fields of the enriched articles, unordered so one failed update does not stop the
+    others, and merge the written articles into the analytics rollups.
+
+    Returns:
+        list: _id of the articles whose update failed to write.
+    """
+    if not bulk_updates:
+        return []
+    logger.info(f"Performing bulk update for {len(bulk_updates)} documents")
+    try:
+        result = collection.bulk_write(
+            [UpdateOne({'_id': article_id}, {'$set': fields}) for article_id, fields in bulk_updates],
+            ordered=False
+        )
+        modified_count = result.modified_count
+        failed_ids = []
+    except BulkWriteError as bwe:
+        logger.error(f"Bulk write error: {bwe.details}")
+        modified_count = bwe.details.get('nModified', 0)
+        failed_ids = [bulk_updates[error['index']][0] for error in bwe.details['writeErrors']]
+    logger.info(f"Bulk updated {modified_count} documents, {len(failed_ids)} failed")
+    if modified_count:
+        bump_corpus_version(collection.database, "enricher bulk update")
+    try:
+        merge_article_rollups(collection, [article_id for article_id, fields in bulk_updates if article_id not in failed_ids])
+    except PyMongoError as e:
+        # The articles are already written, a failed merge only leaves the rollups short until they are rebuilt
+        logger.error(f"Failed to merge articles into the rollups: {str(e)}")
+    return failed_ids
+
+
+def enrich_articles(collection, query, workers=None, scan_name=None):
+    """
+    Enrich the articles matching a query with a pool of worker threads, updating the database
+    every 50 articles. Articles are read in _id order in batches of ENRICHMENT_SCAN_BATCH_SIZE,
+    only as fast as the workers take them, with at most two articles per worker waiting.
+
+    Args:
+        collection: The articles collection.
+        query (dict): Filter of the articles to enrich, e.g. ENRICHMENT_PENDING_QUERY.
+        workers (int): Number of worker threads. Defaults to SUMMARISER_WORKERS.
+        scan_name (str): Name of the scan's checkpoint, saved after every bulk update so an
+            interrupted run resumes where it stopped. None for no checkpoint.
+
+    Returns:
+        dict: 'processed', 'skipped', 'uncategorized', 'input_tokens', 'output_tokens',
+        'llm_calls_saved' and 'cache_hits' counts, 'succeeded_ids' and 'failed_ids'.
+    """
+    workers = workers or settings.SUMMARISER_WORKERS
+
+    scan = KeysetScan(collection, query, name=scan_name)
+
+    bulk_updates = []
+    succeeded_ids = []
+    failed_ids = []
+    skipped_ids = []
+    uncategorized_ids = []
+    tokens = {'input_tokens': 0, 'output_tokens': 0}
+    in_flight = {}
+    chunking_stats = ChunkingStats()
+    total_count = collection.count_documents(scan.remaining_query())
+    logger.info(f"Found {total_count} articles to enrich with {workers} workers")
+    started = time.monotonic()
+
+    def flush():
+        """
+        Write the queued fields and move the scan's checkpoint past them. Articles whose update
+        failed count as failed and keep the checkpoint before them, so the next run reads them again.
+        """
+        flushed_ids = [article_id for article_id, fields in bulk_updates]
+        unwritten_ids = set(perform_bulk_update(collection, bulk_updates))
+        bulk_updates.clear()
+        if unwritten_ids:
+            failed_ids.extend(article_id for article_id in flushed_ids if article_id in unwritten_ids)
+            succeeded_ids[:] = [article_id for article_id in succeeded_ids if article_id not in unwritten_ids]
+            uncategorized_ids[:] = [article_id for article_id in uncategorized_ids if article_id not in unwritten_ids]
+        scan.done(article_id for article_id in flushed_ids if article_id not in unwritten_ids)
+        scan.save()
+
+    def collect_finished(block):
+        """Queue the fields of the finished workers for the bulk update."""
+        if not in_flight:
+            return
+        done, _ = wait(list(in_flight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            article_id = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error enriching article {article_id}: {str(e)}")
+                failed_ids.append(article_id)
+                scan.done([article_id])
+                continue
+            if result is None:
+                skipped_ids.append(article_id)
+                scan.done([article_id])
+                continue
+
+            fields, usage = result
+            for key in tokens:
+                tokens[key] += usage[key]
+            if 'msbm_category' not in fields:
+                uncategorized_ids.append(article_id)
+            bulk_updates.append((article_id, fields))
+            succeeded_ids.append(article_id)
+            if len(bulk_updates) >= 50:
+                flush()
+                logger.info(f"Enriched {len(succeeded_ids)} out of {total_count} articles "
+                            f"({len(succeeded_ids) / (time.monotonic() - started):.2f} articles/s)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enricher") as executor:
+        for document in scan:
+            # Backpressure: wait for a worker before reading further
+            while len(in_flight) >= workers * 2:
+                collect_finished(block=True)
+            in_flight[executor.submit(enrich_article, document, chunking_stats)] = document['_id']
+            collect_finished(block=False)
+
+        while in_flight:
+            collect_finished(block=True)
+
+    flush()
+    scan.finish()
+    copied_count = copy_to_duplicates(collection, succeeded_ids, ENRICHMENT_FIELDS)
+    cache_stats = response_cache.log_stats() if response_cache else {}
+
+    processed_count = len(succeeded_ids)
+    elapsed = max(time.monotonic() - started, 1e-9)
+    logger.info(f"Enrichment complete. Enriched: {processed_count}, Skipped: {len(skipped_ids)}, "
+                f"Failed: {len(failed_ids)}, Left to the categoriser: {len(uncategorized_ids)}")
+    logger.info(f"Chunking: {chunking_stats.summary()}")
+    if processed_count:
+        logger.info(f"Tokens per article: {tokens['input_tokens'] / processed_count:.0f} in, "
+                    f"{tokens['output_tokens'] / processed_count:.0f} out; {processed_count / elapsed:.2f} articles/s")
+    logger.info(f"Near duplicates given the enrichment of their representative: {copied_count}")
+    return {
+        'processed': processed_count,
+        'skipped': len(skipped_ids) + len(failed_ids),
+        'uncategorized': len(uncategorized_ids),
+        'input_tokens': tokens['input_tokens'],
+        'output_tokens': tokens['output_tokens'],
+        'llm_calls_saved': copied_count,
+        'cache_hits': cache_stats.get('hits', 0),
+        'succeeded_ids': succeeded_ids,
+        'failed_ids': failed_ids
+    }
+
+
+def _summary_stage():
+    from server.service.news_articles.news_article_summariser import SUMMARY_PENDING_QUERY, summarise_documents
+    return SUMMARY_PENDING_QUERY, summarise_documents
+
+
+def _caribbean_stage():
+    from server.service.news_articles.news_article_updater import ARTICLE_TYPE_PENDING_QUERY, classify_caribbean_articles
+    return ARTICLE_TYPE_PENDING_QUERY, classify_caribbean_articles
+
+
+def _category_stage():
+    from server.service.news_articles.news_article_categoriser import CATEGORY_PENDING_QUERY, categorize_matching_articles
+    return CATEGORY_PENDING_QUERY, categorize_matching_articles
+
+
+# The original stage of each field, with the name of its scan, for the compatibility mode
+FIELD_STAGES = {
+    'summary': ("summariser", _summary_stage),
+    'caribbean': ("caribbean", _caribbean_stage),
+    'category': ("categoriser", _category_stage)
+}
+
+
+def run_single_field(collection, field: str) -> Dict[str, Any]:
+    """
+    Compatibility mode: enrich a single field with its original stage and prompt.
+
+    Args:
+        collection: The articles collection.
+        field (str): summary, caribbean or category.
+
+    Returns:
+        dict: The result of the stage.
+    """
+    if field not in FIELD_STAGES:
+        raise ValueError(f"Unknown field '{field}', expected one of {', '.join(FIELD_STAGES)}")
+    scan_name, load_stage = FIELD_STAGES[field]
+    query, process = load_stage()
+    return process(collection, query, scan_name=scan_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich articles with their summary, category and Caribbean flag in one call")
+    parser.add_argument("--field", choices=list(FIELD_STAGES), help="Only enrich this field, with its original stage")
+    args = parser.parse_args()
+
+    from server.service.news_articles.news_article_collector import connect_to_mongodb
+    client, collection = connect_to_mongodb()
+    try:
+        if args.field:
+            result = run_single_field(collection, args.field)
+        else:
+            result = enrich_articles(collection, ENRICHMENT_PENDING_QUERY, scan_name="enricher")
+        logger.info(f"Enrichment finished: {result['processed']} articles processed")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+News Article Normaliser
+
+This script normalises fields of news articles that the search API would otherwise have to clean up
+on every request. It is applied to every article at ingest time by the collector, and can be run
+directly as a backfill migration for articles that were collected before it existed.
+
+Key components:
+- msbm_published_date: the article's published_date parsed into a real BSON date
+- msbm_media_source: the article's domain_url with the scheme, www. and trailing slash removed
+- Indexes that let the search API run date range queries on msbm_published_date
+- A text index on titles and summaries for the search API's q= parameter
+- A rebuild of the analytics rollups, which are bucketed by msbm_published_date
+"""
+
+# Python Imports
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Third Party Imports
+from dateutil import parser as date_parser
+from pymongo import ASCENDING, DESCENDING, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.corpus_version import bump_corpus_version
+from server.service.analytics_service import rebuild_article_rollups
+from server.service.news_articles.near_duplicates import ensure_duplicate_indexes
+from server.service.text_search import ensure_text_index
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+# Formats returned by Newscatcher, tried before falling back to dateutil
+PUBLISHED_DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+
+def parse_published_date(value: Any) -> Optional[datetime]:
+    """
+    Parse a published_date value into a datetime.
+
+    Args:
+    value: The raw published_date, usually a string such as '2024-05-01 12:00:00'.
+
+    Returns:
+    datetime: The parsed date, or None if it cannot be parsed.
+    """
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    for date_format in PUBLISHED_DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format)
+        except ValueError:
+            continue
+
+    try:
+        # Store naive UTC datetimes, like the formats above
+        parsed = date_parser.parse(value)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    except (ValueError, OverflowError):
+        return None
+
+
+def derive_media_source(domain_url: Any) -> Optional[str]:
+    """
+    Derive the media source shown in search results from an article's domain_url.
+
+    Args:
+    domain_url: The raw domain_url, e.g. 'https://www.jamaica-gleaner.com/'.
+
+    Returns:
+    str: The bare domain, e.g. 'jamaica-gleaner.com', or None if there is no domain_url.
+    """
+    if not isinstance(domain_url, str) or not domain_url.strip():
+        return None
+    source = domain_url.strip()
+    source = source.replace('http://', '').replace('https://', '').replace('www.', '')
+    return source.rstrip('/')
+
+
+def normalised_fields(article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the normalised fields for an article.
+
+    Args:
+    article (dict): The article document.
+
+    Returns:
+    dict: The msbm_published_date and msbm_media_source fields.
+    """
+    return {
+        'msbm_published_date': parse_published_date(article.get('published_date')),
+        'msbm_media_source': derive_media_source(article.get('domain_url'))
+    }
+
+
+def normalise_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a copy of an article with the normalised fields added.
+
+    Args:
+    article (dict): The article as returned by Newscatcher.
+
+    Returns:
+    dict: The article including msbm_published_date and msbm_media_source.
+    """
+    return {**article, **normalised_fields(article)}
+
+
+def ensure_article_indexes(collection) -> None:
+    """
+    Create the indexes used by the search API's filters if they do not exist yet.
+
+    Args:
+    collection (Collection): The articles collection.
+    """
+    collection.create_index(
+        [
+            ('msbm_caribbean_article', ASCENDING),
+            ('msbm_country_full_name', ASCENDING),
+            ('msbm_category', ASCENDING),
+            ('msbm_published_date', DESCENDING)
+        ],
+        name='search_filters'
+    )
+    collection.create_index([('msbm_published_date', DESCENDING)], name='msbm_published_date')
+    ensure_text_index(collection)
+    ensure_duplicate_indexes(collection)
+    logger.info("Ensured search indexes on articles collection")
+
+
+def backfill_normalised_fields(collection, batch_size: int = 1000) -> int:
+    """
+    Add the normalised fields to every article that does not have them yet.
+
+    Args:
+    collection (Collection): The articles collection.
+    batch_size (int): Number of updates sent per bulk write.
+
+    Returns:
+    int: The number of documents modified.
+    """
+    query = {
+        "$or": [
+            {"msbm_published_date": {"$exists": False}},
+            {"msbm_media_source": {"$exists": False}}
+        ]
+    }
+    total_count = collection.count_documents(query)
+    logger.info(f"Found {total_count} articles to normalise")
+
+    cursor = collection.find(query, {'published_date': 1, 'domain_url': 1}).batch_size(batch_size)
+
+    bulk_updates = []
+    modified_count = 0
+    unparsed_dates = 0
+    for article in cursor:
+        fields = normalised_fields(article)
+        if fields['msbm_published_date'] is None:
+            unparsed_dates += 1
+        bulk_updates.append(UpdateOne({'_id': article['_id']}, {'$set': fields}))
+
+        if len(bulk_updates) >= batch_size:
+            modified_count += perform_bulk_update(collection, bulk_updates)
+            bulk_updates = []
+            logger.info(f"Normalised {modified_count} out of {total_count} articles")
+
+    modified_count += perform_bulk_update(collection, bulk_updates)
+
+    if unparsed_dates:
+        logger.warning(f"{unparsed_dates} articles have a published_date that could not be parsed")
+    logger.info(f"Normalisation complete. Modified {modified_count} articles")
+    return modified_count
+
+
+def perform_bulk_update(collection, bulk_updates) -> int:
+    """
+    Perform an unordered bulk update on the MongoDB collection.
+
+    Args:
+    collection (Collection): MongoDB collection to update.
+    bulk_updates (list): List of UpdateOne operations to perform.
+
+    Returns:
+    int: The number of documents modified.
+    """
+    if not bulk_updates:
+        return 0
+    try:
+        result = collection.bulk_write(bulk_updates, ordered=False)
+        return result.modified_count
+    except BulkWriteError as bwe:
+        logger.error(f"Bulk write error: {bwe.details}")
+        return bwe.details.get('nModified', 0)
+
+
+def main():
+    """
+    Run the backfill migration: normalise existing articles, create the search indexes
+    and rebuild the analytics rollups.
+    """
+    logger.info("Starting article normalisation backfill")
+    client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+    try:
+        db = client[settings.MONGODB_DB_NAME]
+        collection = db['articles']
+
+        modified_count = backfill_normalised_fields(collection)
+        ensure_article_indexes(collection)
+        rebuild_article_rollups(collection)
+
+        if modified_count:
+            bump_corpus_version(db, "normalisation backfill")
+    except Exception as e:
+        logger.error(f"An error occurred: {str(e)}", exc_info=True)
+    finally:
+        client.close()
+        logger.info("Article normalisation backfill completed")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,27 @@ It implements an advanced retry mechanism with exponential backoff for error han
 Key components:
 - MongoDB connection and document processing
 - Language model integration for text summarization
+- Length-aware chunking of the content, see article_chunking
+- Persistent cache of the model's responses, see llm_response_cache
+- A bounded pool of SUMMARISER_WORKERS threads fed from a resumable keyset scan, see keyset_scan,
+  sharing one rate limiter
 - Advanced retry mechanism with error categorization
 - Bulk update operations for efficient database updates
 """
 
 # Local Imports
-from backend.core.config import MongoDBConnections
-from backend.core.config import logger
-from backend.service.llm_service import OpenAI
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.core.rate_limiter import TokenBucket
+from server.service.llm_service import OpenAI
+from server.service.llm_response_cache import create_stage_cache, with_response_cache
+from server.service.corpus_version import bump_corpus_version
+from server.service.news_articles.article_chunking import ChunkingStats, chunk_article
+from server.service.news_articles.keyset_scan import KeysetScan
+from server.service.news_articles.near_duplicates import DUPLICATE_FIELD, copy_to_duplicates
 
 # Python Imports
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
 from functools import wraps
 import random
@@ -25,14 +36,17 @@ import time
 # Third Party Imports
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain_huggingface import HuggingFaceEmbeddings
 from pymongo import MongoClient, UpdateOne
-from pymongo.errors import BulkWriteError, CursorNotFound
+from pymongo.errors import BulkWriteError
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
 
 # Setup of the LLM
 llm_provider = OpenAI()
-llm = llm_provider.get_model("gpt4o")
+response_cache = create_stage_cache("summariser")
+llm = with_response_cache(llm_provider.get_model("gpt4o"), response_cache)
 
 class ErrorCategory(Enum):
     """Enum for categorizing different types of errors."""
@@ -63,7 +77,8 @@ def advanced_retry_with_exponential_backoff(
     max_delay=300,
     transient_factor=1.5,
     rate_limit_factor=2,
-    exceptions_to_check=(Exception,)
+    exceptions_to_check=(Exception,),
+    rate_limiter=None
 ):
     """
     Decorator that implements an advanced retry mechanism with exponential backoff.
@@ -75,6 +90,7 @@ def advanced_retry_with_exponential_backoff(
     transient_factor (float): Multiplier for delay on transient errors.
     rate_limit_factor (float): Multiplier for delay on rate limit errors.
     exceptions_to_check (tuple): Exceptions to catch and retry on.
+    rate_limiter (TokenBucket): Optional shared limiter, paused on rate limit errors so every worker backs off.
     
     Returns:
     function: Decorated function with retry logic.
@@ -110,21 +126,13 @@ def advanced_retry_with_exponential_backoff(
                     logger.info(f"Retry {retries}/{max_retries}. "
                                 f"Error category: {error_category.name}. "
                                 f"Sleeping for {total_delay:.2f} seconds")
+                    if rate_limiter is not None and error_category == ErrorCategory.RATE_LIMIT:
+                        rate_limiter.pause(total_delay)
                     time.sleep(total_delay)
             return func(*args, **kwargs)
         return wrapper
     return decorator
 
-logger.info("Initializing HuggingFace Embeddings")
-embeddings = HuggingFaceEmbeddings(
-    model_name="Snowflake/snowflake-arctic-embed-s",
-    model_kwargs={'device': 'cpu'},
-    encode_kwargs={'normalize_embeddings': True}
-)
-
-logger.info("Creating SemanticChunker")
-text_splitter = SemanticChunker(embeddings)
-
 logger.info("Setting up prompts")
 summary_prompt = """
 <background_information>
@@ -156,61 +164,200 @@ stuff_prompt = ChatPromptTemplate.from_messages(
 logger.info("Setting up the stuff documents chain")
 stuff_chain = create_stuff_documents_chain(llm=llm, prompt=stuff_prompt)
 
+# Shared by every worker, so the workers together stay under SUMMARISER_RATE_PER_SECOND
+rate_limiter = TokenBucket(settings.SUMMARISER_RATE_PER_SECOND)
+
 @advanced_retry_with_exponential_backoff(
-    max_retries=10,
+    max_retries=settings.SUMMARISER_MAX_RETRIES,
     base_delay=7,
     transient_factor=1.5,
     rate_limit_factor=2,
-    exceptions_to_check=(Exception,)
+    exceptions_to_check=(Exception,),
+    rate_limiter=rate_limiter
 )
-def process_single_document(document, stuff_chain, collection, bulk_updates):
+def invoke_summary_chain(docs, stuff_chain):
     """
-    Process a single document, generate a summary, and prepare for bulk update.
+    Call the language model once the shared rate limiter allows it, retrying on errors.
+    
+    Args:
+    docs (list): The chunks of the article.
+    stuff_chain (Chain): The language model chain for summarization.
+    
+    Returns:
+    str: The summary.
+    """
+    rate_limiter.acquire()
+    return stuff_chain.invoke({"context": docs})
+
+def summarise_document(document, stuff_chain, chunking_stats=None):
+    """
+    Generate the summary of a single document. Runs in a worker thread, so it only calls the
+    language model and leaves the database update to the caller.
     
     Args:
     document (dict): The document to process.
     stuff_chain (Chain): The language model chain for summarization.
-    collection (Collection): MongoDB collection.
-    bulk_updates (list): List to store bulk update operations.
+    chunking_stats (ChunkingStats): Optional stats of the chunking strategies used.
     
     Returns:
-    bool: True if document was processed successfully, False otherwise.
+    str: The summary, or None if the document has no content.
     """
     logger.info(f"Processing document {document['_id']}")
 
     if 'content' not in document or not document['content']:
         logger.warning(f"Document {document['_id']} has no or empty content. Skipping.")
-        return False
+        return None
 
     content = document['content']
-    docs = text_splitter.create_documents([content])
+    docs = chunk_article(content, stats=chunking_stats)
 
-    summary = stuff_chain.invoke({"context": docs})
+    summary = invoke_summary_chain(docs, stuff_chain)
     logger.info(f"Article processed for document: {document['_id']}")
-    
-    bulk_updates.append({
-        'filter': {'_id': document['_id']},
-        'update': {'$set': {'msbm_llm_summary': summary}}
-    })
-    return True
+    return summary
 
 def perform_bulk_update(collection, bulk_updates):
     """
-    Perform bulk update operation on the MongoDB collection.
+    Perform bulk update operation on the MongoDB collection. The updates are unordered, so one
+    that fails does not stop the others.
     
     Args:
     collection (Collection): MongoDB collection to update.
     bulk_updates (list): List of update operations to perform.
+    
+    Returns:
+    list: _id of the documents whose update failed to write.
     """
     if not bulk_updates:
-        return
+        return []
     logger.info(f"Performing bulk update for {len(bulk_updates)} documents")
     try:
-        result = collection.bulk_write([UpdateOne(update['filter'], update['update']) for update in bulk_updates])
-        logger.info(f"Bulk updated {result.modified_count} documents")
-        bulk_updates.clear()
+        result = collection.bulk_write([UpdateOne(update['filter'], update['update']) for update in bulk_updates], ordered=False)
+        modified_count = result.modified_count
+        failed_ids = []
     except BulkWriteError as bwe:
         logger.error(f"Bulk write error: {bwe.details}")
+        modified_count = bwe.details.get('nModified', 0)
+        failed_ids = [bulk_updates[error['index']]['filter']['_id'] for error in bwe.details['writeErrors']]
+    logger.info(f"Bulk updated {modified_count} documents, {len(failed_ids)} failed")
+    if modified_count:
+        bump_corpus_version(collection.database, "summariser bulk update")
+    return failed_ids
+
+# Documents still waiting for a summary. Near duplicates get their representative's summary.
+SUMMARY_PENDING_QUERY = {
+    "$or": [
+        {"msbm_llm_summary": {"$exists": False}},
+        {"msbm_llm_summary": ""}
+    ],
+    DUPLICATE_FIELD: {"$ne": True}
+}
+
+def summarise_documents(collection, query, workers=None, scan_name=None):
+    """
+    Summarise the documents matching a query with a pool of worker threads, updating the database
+    every 50 documents. Documents are read in _id order in batches of ENRICHMENT_SCAN_BATCH_SIZE,
+    only as fast as the workers take them, with at most two documents per worker waiting.
+
+    Args:
+    collection (Collection): MongoDB collection.
+    query (dict): Filter of the documents to summarise, e.g. SUMMARY_PENDING_QUERY.
+    workers (int): Number of worker threads. Defaults to SUMMARISER_WORKERS.
+    scan_name (str): Name of the scan's checkpoint, saved after every bulk update so an
+        interrupted run resumes where it stopped. None for no checkpoint.
+
+    Returns:
+    dict: 'processed', 'skipped', 'llm_calls_saved' and 'cache_hits' counts, 'succeeded_ids' and 'failed_ids'.
+    """
+    workers = workers or settings.SUMMARISER_WORKERS
+
+    scan = KeysetScan(collection, query, name=scan_name)
+
+    bulk_updates = []
+    succeeded_ids = []
+    failed_ids = []
+    skipped_ids = []
+    in_flight = {}
+    chunking_stats = ChunkingStats()
+    total_count = collection.count_documents(scan.remaining_query())
+    logger.info(f"Found {total_count} documents to process with {workers} workers")
+    started = time.monotonic()
+
+    def flush():
+        """
+        Write the queued summaries and move the scan's checkpoint past them. Documents whose
+        update failed count as failed and keep the checkpoint before them, so the next run
+        reads them again.
+        """
+        flushed_ids = [update['filter']['_id'] for update in bulk_updates]
+        unwritten_ids = set(perform_bulk_update(collection, bulk_updates))
+        bulk_updates.clear()
+        if unwritten_ids:
+            failed_ids.extend(document_id for document_id in flushed_ids if document_id in unwritten_ids)
+            succeeded_ids[:] = [document_id for document_id in succeeded_ids if document_id not in unwritten_ids]
+        scan.done(document_id for document_id in flushed_ids if document_id not in unwritten_ids)
+        scan.save()
+
+    def collect_finished(block):
+        """Queue the summaries of the finished workers for the bulk update."""
+        if not in_flight:
+            return
+        done, _ = wait(list(in_flight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            document_id = in_flight.pop(future)
+            try:
+                summary = future.result()
+            except Exception as e:
+                logger.error(f"Error processing document {document_id}: {str(e)}")
+                failed_ids.append(document_id)
+                scan.done([document_id])
+                continue
+            if summary is None:
+                skipped_ids.append(document_id)
+                scan.done([document_id])
+                continue
+
+            bulk_updates.append({
+                'filter': {'_id': document_id},
+                'update': {'$set': {'msbm_llm_summary': summary}}
+            })
+            succeeded_ids.append(document_id)
+            if len(bulk_updates) >= 50:  # Perform bulk update every 50 documents
+                flush()
+                logger.info(f"Processed {len(succeeded_ids)} out of {total_count} documents "
+                            f"({len(succeeded_ids) / (time.monotonic() - started):.2f} documents/s)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summariser") as executor:
+        for document in scan:
+            # Backpressure: wait for a worker before reading further
+            while len(in_flight) >= workers * 2:
+                collect_finished(block=True)
+            in_flight[executor.submit(summarise_document, document, stuff_chain, chunking_stats)] = document['_id']
+            collect_finished(block=False)
+
+        while in_flight:
+            collect_finished(block=True)
+
+    flush()
+    scan.finish()
+    processed_count = len(succeeded_ids)
+    skipped_count = len(skipped_ids) + len(failed_ids)
+    copied_count = copy_to_duplicates(collection, succeeded_ids, ['msbm_llm_summary'])
+    cache_stats = response_cache.log_stats() if response_cache else {}
+
+    logger.info(f"Total documents: {total_count}")
+    logger.info(f"Processed documents: {processed_count}")
+    logger.info(f"Skipped documents: {skipped_count}")
+    logger.info(f"Chunking: {chunking_stats.summary()}")
+    logger.info(f"Documents per second: {processed_count / max(time.monotonic() - started, 1e-9):.2f}")
+    logger.info(f"Summaries copied to near duplicates: {copied_count}")
+    return {
+        'processed': processed_count,
+        'skipped': skipped_count,
+        'llm_calls_saved': copied_count,
+        'cache_hits': cache_stats.get('hits', 0),
+        'succeeded_ids': succeeded_ids,
+        'failed_ids': failed_ids
+    }
 
 def process_documents():
     """
@@ -218,69 +365,11 @@ def process_documents():
     """
     logger.info("Starting document processing")
     try:
-        client = MongoClient(MongoDBConnections.MONGODB_CONNECTION_STRING)
-        db = client[MongoDBConnections.MONGODB_DB_NAME]
+        client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+        db = client[settings.MONGODB_DB_NAME]
         collection = db['articles']
 
-        # Increase the cursor timeout and use batch processing
-        cursor = collection.find({
-            "$or": [
-                {"msbm_llm_summary": {"$exists": False}},
-                {"msbm_llm_summary": ""}
-            ]
-        }).batch_size(100).max_time_ms(1800000)  # 30 minutes timeout
-        
-        bulk_updates = []
-        processed_count = 0
-        skipped_count = 0
-        total_count = collection.count_documents({
-            "$or": [
-                {"msbm_llm_summary": {"$exists": False}},
-                {"msbm_llm_summary": ""}
-            ]
-        })
-        logger.info(f"Found {total_count} documents to process")
-
-        while True:
-            try:
-                for document in cursor:
-                    try:
-                        if process_single_document(document, stuff_chain, collection, bulk_updates):
-                            processed_count += 1
-                        else:
-                            skipped_count += 1
-                        
-                        if len(bulk_updates) >= 50:  # Perform bulk update every 50 documents
-                            perform_bulk_update(collection, bulk_updates)
-                            bulk_updates = []
-                            logger.info(f"Processed {processed_count} out of {total_count} documents")
-                    except Exception as e:
-                        logger.error(f"Error processing document {document['_id']}: {str(e)}")
-                        skipped_count += 1
-
-                break  # Exit the while loop if we've processed all documents without a CursorNotFound error
-            except CursorNotFound:
-                # If cursor times out, create a new one starting from the last processed document
-                last_id = document['_id'] if 'document' in locals() else None
-                if last_id:
-                    cursor = collection.find({
-                        "$or": [
-                            {"msbm_llm_summary": {"$exists": False}},
-                            {"msbm_llm_summary": ""}
-                        ],
-                        "_id": {"$gt": last_id}
-                    }).batch_size(50).max_time_ms(1800000)
-                    logger.info(f"Cursor timed out. Resuming from document {last_id}")
-                else:
-                    logger.warning("Cursor timed out and unable to resume. Exiting.")
-                    break
-
-        if bulk_updates:
-            perform_bulk_update(collection, bulk_updates)
-
-        logger.info(f"Total documents: {total_count}")
-        logger.info(f"Processed documents: {processed_count}")
-        logger.info(f"Skipped documents: {skipped_count}")
+        summarise_documents(collection, SUMMARY_PENDING_QUERY, scan_name="summariser")
 
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 
 # Third-party imports
 from pymongo import MongoClient, UpdateOne
-from pymongo.errors import BulkWriteError
+from pymongo.errors import BulkWriteError, PyMongoError
 from pydantic import BaseModel, Field, model_validator
 
 # Project-specific imports
@@ -14,10 +14,35 @@ from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.messages.ai import AIMessage
-from news_articles.news_article_collector import COUNTRIES
-from backend.core.config import MongoDBConnections, logger, NEWS_API_KEY
-from backend.service.llm_service import Groq, OpenAI
-from newscatcherapi_client import Newscatcher, ApiException
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.llm_service import Groq, OpenAI
+from server.service.news_articles.async_collector import COUNTRIES
+from server.service.llm_response_cache import create_stage_cache, with_response_cache
+from server.service.corpus_version import bump_corpus_version
+from server.service.analytics_service import merge_article_rollups
+from server.service.news_articles.newscatcher_recorder import create_newscatcher_client
+from server.service.news_articles.near_duplicates import DUPLICATE_FIELD, copy_to_duplicates
+from server.service.news_articles.keyset_scan import KeysetScan
+from newscatcherapi_client import ApiException
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+# Full name of each country code returned by Newscatcher
+COUNTRY_FULL_NAMES = {
+    'AG': 'Antigua and Barbuda', 'AI': 'Anguilla', 'AW': 'Aruba',
+    'BB': 'Barbados', 'BM': 'Bermuda', 'BQ': 'Bonaire',
+    'BS': 'Bahamas', 'BZ': 'Belize', 'CU': 'Cuba',
+    'CW': 'Curaçao', 'DM': 'Dominica', 'DO': 'Dominican Republic',
+    'GD': 'Grenada', 'GP': 'Guadeloupe', 'HT': 'Haiti',
+    'JM': 'Jamaica', 'KN': 'Saint Kitts and Nevis', 'KY': 'Cayman Islands',
+    'LC': 'Saint Lucia', 'PR': 'Puerto Rico', 'SX': 'Sint Maarten',
+    'TC': 'Turks and Caicos Islands', 'TT': 'Trinidad and Tobago',
+    'VC': 'Saint Vincent and the Grenadines', 'VG': 'British Virgin Islands',
+    'VI': 'U.S. Virgin Islands'
+}
 
 def update_country_full_names():
     """
@@ -26,63 +51,63 @@ def update_country_full_names():
     """
     try:
         # Initialize MongoDB connection
-        mongodb = MongoDBConnections()
-        client = MongoClient(mongodb.MONGODB_CONNECTION_STRING)
-        db = client[mongodb.MONGODB_DB_NAME]
+        client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+        db = client[settings.MONGODB_DB_NAME]
         
         # Use the MongoDB client
         collection = db['articles']
 
-        # Define a dictionary mapping country codes to full names
-        country_map = {
-            'AG': 'Antigua and Barbuda', 'AI': 'Anguilla', 'AW': 'Aruba',
-            'BB': 'Barbados', 'BM': 'Bermuda', 'BQ': 'Bonaire',
-            'BS': 'Bahamas', 'BZ': 'Belize', 'CU': 'Cuba',
-            'CW': 'Curaçao', 'DM': 'Dominica', 'DO': 'Dominican Republic',
-            'GD': 'Grenada', 'GP': 'Guadeloupe', 'HT': 'Haiti',
-            'JM': 'Jamaica', 'KN': 'Saint Kitts and Nevis', 'KY': 'Cayman Islands',
-            'LC': 'Saint Lucia', 'PR': 'Puerto Rico', 'SX': 'Sint Maarten',
-            'TC': 'Turks and Caicos Islands', 'TT': 'Trinidad and Tobago',
-            'VC': 'Saint Vincent and the Grenadines', 'VG': 'British Virgin Islands',
-            'VI': 'U.S. Virgin Islands'
-        }
-
         # Update all documents in the collection
-        result = collection.update_many(
-            {},
-            [
-                {
-                    "$set": {
-                        "msbm_country_full_name": {
-                            "$switch": {
-                                "branches": [
-                                    {"case": {"$eq": ["$country", code]}, "then": name}
-                                    for code, name in country_map.items()
-                                ],
-                                "default": "Unknown"
-                            }
-                        }
-                    }
-                }
-            ]
-        )
-
-        logger.info(f"Modified {result.modified_count} documents")
+        set_country_full_names(collection, {})
 
     except Exception as e:
         logger.error(f"An error occurred in update_country_full_names: {e}")
     finally:
         client.close()
 
+def set_country_full_names(collection, query):
+    """
+    Sets 'msbm_country_full_name' from the 'country' code on the articles matching a query.
+
+    Args:
+        collection: The articles collection.
+        query (dict): Filter of the articles to update, {} for all of them.
+
+    Returns:
+        int: Number of documents modified.
+    """
+    result = collection.update_many(
+        query,
+        [
+            {
+                "$set": {
+                    "msbm_country_full_name": {
+                        "$switch": {
+                            "branches": [
+                                {"case": {"$eq": ["$country", code]}, "then": name}
+                                for code, name in COUNTRY_FULL_NAMES.items()
+                            ],
+                            "default": "Unknown"
+                        }
+                    }
+                }
+            }
+        ]
+    )
+
+    logger.info(f"Modified {result.modified_count} documents")
+    if result.modified_count:
+        bump_corpus_version(collection.database, "country full names update")
+    return result.modified_count
+
 def update_summaries_and_categorize():
     """
     Main function to update summaries with categories and categorize uncategorized summaries.
     """
     try:
         # Initialize MongoDB connection
-        mongo_conn = MongoDBConnections()
-        client = MongoClient(mongo_conn.MONGODB_CONNECTION_STRING)
-        db = client[mongo_conn.MONGODB_DB_NAME]
+        client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+        db = client[settings.MONGODB_DB_NAME]
         
         articles_collection = db['articles']
         summaries_collection = db['summaries']
@@ -162,9 +187,8 @@ def update_uncategorized_categories():
     """
     try:
         # Initialize MongoDB connection
-        mongo_conn = MongoDBConnections()
-        client = MongoClient(mongo_conn.MONGODB_CONNECTION_STRING)
-        db = client[mongo_conn.MONGODB_DB_NAME]
+        client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+        db = client[settings.MONGODB_DB_NAME]
         summaries_collection = db['summaries']
 
         # Load topics from JSON file
@@ -254,36 +278,35 @@ class CaribbeanArticle(BaseModel):
             raise ValueError("is_caribbean must be a string value (True or False)")
         return self
 
+# Articles still waiting for the Caribbean check. Near duplicates get their representative's result.
+ARTICLE_TYPE_PENDING_QUERY = {
+    'msbm_caribbean_article': {'$exists': False},
+    'msbm_llm_summary': {'$exists': True, '$ne': None},
+    DUPLICATE_FIELD: {'$ne': True}
+}
+
 def update_article_type():
     logger.info("Starting update_article_type process")
     
     # Connect to MongoDB
-    client = MongoClient(MongoDBConnections.MONGODB_CONNECTION_STRING)
-    db = client[MongoDBConnections.MONGODB_DB_NAME]
+    client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+    db = client[settings.MONGODB_DB_NAME]
     collection = db['articles']  # New collection name
     logger.info("Connected to MongoDB")
 
-    # Get articles that haven't been processed yet
-    unprocessed_articles = collection.find({
-        'msbm_caribbean_article': {'$exists': False},
-        'msbm_llm_summary': {'$exists': True, '$ne': None}
-    })
-    total_articles = collection.count_documents({
-        'msbm_caribbean_article': {'$exists': False},
-        'msbm_llm_summary': {'$exists': True, '$ne': None}
-    })
-    logger.info(f"Fetched {total_articles} unprocessed articles from the database")
+    result = classify_caribbean_articles(collection, ARTICLE_TYPE_PENDING_QUERY, scan_name="caribbean")
 
-    # Initialize GPT-4 model
-    openai = OpenAI()
-    gpt4 = openai.get_model("gpt4o")
-    logger.info("Initialized GPT-4 model")
+    client.close()
+    logger.info(f"Article type update process completed. Total articles processed: {result['processed']}")
 
-    # Set up the parser
-    parser = PydanticOutputParser(pydantic_object=CaribbeanArticle)
-    logger.info("Set up PydanticOutputParser")
+def create_caribbean_prompt():
+    """
+    Create the output parser and prompt template of the Caribbean check.
 
-    # Create the prompt template
+    Returns:
+        tuple: The PydanticOutputParser of CaribbeanArticle and the PromptTemplate.
+    """
+    parser = PydanticOutputParser(pydantic_object=CaribbeanArticle)
     prompt = PromptTemplate(
         template="""
         <background_information>
@@ -306,35 +329,108 @@ def update_article_type():
         input_variables=["countries", "article_summary"],
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
+    return parser, prompt
+
+def classify_caribbean_articles(collection, query, scan_name=None):
+    """
+    Runs the Caribbean check on the articles matching a query, in _id order, and stores the
+    result in 'msbm_caribbean_article'. An article that fails is skipped and reported. Articles
+    are read in batches of ENRICHMENT_SCAN_BATCH_SIZE without a long-lived cursor.
+
+    Args:
+        collection: The articles collection.
+        query (dict): Filter of the articles to check, e.g. ARTICLE_TYPE_PENDING_QUERY.
+        scan_name (str): Name of the scan's checkpoint, saved after every bulk update so an
+            interrupted run resumes where it stopped. None for no checkpoint.
+
+    Returns:
+        dict: 'processed', 'llm_calls_saved' and 'cache_hits' counts, 'succeeded_ids' and 'failed_ids'.
+    """
+    db = collection.database
+
+    # Get articles that haven't been processed yet
+    unprocessed_articles = KeysetScan(collection, query, name=scan_name)
+    total_articles = collection.count_documents(unprocessed_articles.remaining_query())
+    logger.info(f"Fetched {total_articles} unprocessed articles from the database")
+
+    # Initialize GPT-4 model
+    openai = OpenAI()
+    response_cache = create_stage_cache("caribbean")
+    gpt4 = with_response_cache(openai.get_model("gpt4o"), response_cache)
+    logger.info("Initialized GPT-4 model")
+
+    # Set up the parser and prompt template
+    parser, prompt = create_caribbean_prompt()
     logger.info("Created prompt template")
 
     bulk_operations = []
+    bulk_article_ids = []
+    succeeded_ids = []
     processed_count = 0
+    failed_ids = []
+
+    def flush():
+        """
+        Write the queued results, unordered so one failed update does not stop the others, and
+        move the scan's checkpoint past them. Articles whose update failed count as failed and keep
+        the checkpoint before them, so the next run reads them again.
+        """
+        try:
+            result = collection.bulk_write(bulk_operations, ordered=False)
+            modified_count = result.modified_count
+            unwritten_ids = set()
+        except BulkWriteError as bwe:
+            logger.error(f"Bulk write error: {bwe.details}")
+            modified_count = bwe.details.get('nModified', 0)
+            unwritten_ids = {bulk_article_ids[error['index']] for error in bwe.details['writeErrors']}
+        logger.info(f"Bulk update: updated {modified_count} articles, {len(unwritten_ids)} failed")
+        if modified_count:
+            bump_corpus_version(db, "article type update")
+        written_ids = [article_id for article_id in bulk_article_ids if article_id not in unwritten_ids]
+        try:
+            merge_article_rollups(collection, written_ids)
+        except PyMongoError as e:
+            # The articles are already written, a failed merge only leaves the rollups short until they are rebuilt
+            logger.error(f"Failed to merge articles into the rollups: {str(e)}")
+        if unwritten_ids:
+            failed_ids.extend(article_id for article_id in bulk_article_ids if article_id in unwritten_ids)
+            succeeded_ids[:] = [article_id for article_id in succeeded_ids if article_id not in unwritten_ids]
+        unprocessed_articles.done(written_ids)
+        unprocessed_articles.save()
+        bulk_operations.clear()
+        bulk_article_ids.clear()
+
     for article in unprocessed_articles:
         processed_count += 1
         logger.info(f"Processing article {processed_count}/{total_articles} (ID: {article['_id']})")
         
-        # Prepare the prompt
-        formatted_prompt = prompt.format(
-            countries=COUNTRIES,
-            article_summary=article['msbm_llm_summary']
-        )
-        logger.debug("Formatted prompt for article")
+        try:
+            # Prepare the prompt
+            formatted_prompt = prompt.format(
+                countries=COUNTRIES,
+                article_summary=article['msbm_llm_summary']
+            )
+            logger.debug("Formatted prompt for article")
 
-        # Get the response from the model
-        response = gpt4.invoke(formatted_prompt)
-        logger.debug("Received response from GPT-4 model")
+            # Get the response from the model
+            response = gpt4.invoke(formatted_prompt)
+            logger.debug("Received response from GPT-4 model")
 
-        # Extract the content from AIMessage if necessary
-        if isinstance(response, AIMessage):
-            response_content = response.content
-        else:
-            response_content = response
-        logger.debug("Extracted response content")
+            # Extract the content from AIMessage if necessary
+            if isinstance(response, AIMessage):
+                response_content = response.content
+            else:
+                response_content = response
+            logger.debug("Extracted response content")
 
-        # Parse the response
-        parsed_response = parser.parse(response_content)
-        logger.debug(f"Parsed response: {parsed_response.is_caribbean}")
+            # Parse the response
+            parsed_response = parser.parse(response_content)
+            logger.debug(f"Parsed response: {parsed_response.is_caribbean}")
+        except Exception as e:
+            logger.error(f"Error checking article {article['_id']}: {str(e)}")
+            failed_ids.append(article['_id'])
+            unprocessed_articles.done([article['_id']])
+            continue
 
         bulk_operations.append(
             UpdateOne(
@@ -342,15 +438,12 @@ def update_article_type():
                 {'$set': {'msbm_caribbean_article': parsed_response.is_caribbean}}
             )
         )
+        bulk_article_ids.append(article['_id'])
+        succeeded_ids.append(article['_id'])
 
-        # Perform bulk update in batches of 1000
-        if len(bulk_operations) >= 1000:
-            try:
-                result = collection.bulk_write(bulk_operations)
-                logger.info(f"Bulk update: processed and updated {result.modified_count} articles")
-            except BulkWriteError as bwe:
-                logger.error(f"Bulk write error: {bwe.details}")
-            bulk_operations = []
+        # Perform bulk update and save the scan's checkpoint in batches of 100
+        if len(bulk_operations) >= 100:
+            flush()
 
         # Log progress every 100 articles
         if processed_count % 100 == 0:
@@ -358,14 +451,19 @@ def update_article_type():
 
     # Process any remaining operations
     if bulk_operations:
-        try:
-            result = collection.bulk_write(bulk_operations)
-            logger.info(f"Final bulk update: processed and updated {result.modified_count} articles")
-        except BulkWriteError as bwe:
-            logger.error(f"Bulk write error: {bwe.details}")
-
-    client.close()
-    logger.info(f"Article type update process completed. Total articles processed: {processed_count}")
+        flush()
+    unprocessed_articles.finish()
+
+    copied_count = copy_to_duplicates(collection, succeeded_ids, ['msbm_caribbean_article'])
+    logger.info(f"Caribbean check copied to {copied_count} near duplicates")
+    cache_stats = response_cache.log_stats() if response_cache else {}
+    return {
+        'processed': processed_count,
+        'llm_calls_saved': copied_count,
+        'cache_hits': cache_stats.get('hits', 0),
+        'succeeded_ids': succeeded_ids,
+        'failed_ids': failed_ids
+    }
 
 def update_article_source():
     """
@@ -378,13 +476,13 @@ def update_article_source():
     logger.info("Starting update_article_source process")
 
     # Connect to MongoDB
-    client = MongoClient(MongoDBConnections.MONGODB_CONNECTION_STRING)
-    db = client[MongoDBConnections.MONGODB_DB_NAME]
+    client = MongoClient(settings.MONGODB_CONNECTION_STRING)
+    db = client[settings.MONGODB_DB_NAME]
     collection = db['articles']
     logger.info("Connected to MongoDB")
 
-    # Initialize Newscatcher client
-    newscatcher = Newscatcher(api_key=NEWS_API_KEY)
+    # Initialize Newscatcher client, recording or replaying responses when NEWSCATCHER_RECORD_MODE asks for it
+    newscatcher = create_newscatcher_client(settings.NEWS_API_KEY)
 
     # Calculate date range
     today = datetime.now().strftime('%Y-%m-%d')
@@ -0,0 +1,349 @@
+"""
+Newscatcher Recorder
+
+Record and replay of Newscatcher responses, so collector and updater changes can be exercised and
+benchmarked offline instead of against the paid API.
+
+Responses are stored on disk as gzipped JSON, one file per request, keyed by a hash of the
+endpoint and its canonical parameters. SDK and HTTP calls share the same keys, so a recording made
+by the Newscatcher SDK can be replayed to the async httpx collector and the other way round.
+
+The mode is chosen with NEWSCATCHER_RECORD_MODE:
+- off: calls go to the API
+- record: calls go to the API and every successful response is stored
+- replay: responses are served from the store, with NEWSCATCHER_REPLAY_LATENCY seconds added to
+  each and a 429 injected every NEWSCATCHER_REPLAY_RATE_LIMIT_EVERY requests. A request that was
+  never recorded raises ReplayMissError.
+
+Key components:
+- ResponseStore: the on-disk store
+- RecordingTransport / ReplayTransport: httpx transports for the async collector
+- RecordingNewscatcher / ReplayNewscatcher: stand-ins for the Newscatcher SDK client
+- create_newscatcher_client / create_collector_transport: pick the implementation for the mode
+"""
+
+# Python Imports
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Third Party Imports
+import httpx
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+RECORD_MODES = ("off", "record", "replay")
+
+# HTTP path of each SDK endpoint, so SDK and HTTP recordings share their keys
+SDK_ENDPOINTS = {
+    ('search', 'get'): "/api/search",
+    ('search_link', 'post'): "/api/search_by_link"
+}
+
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def canonical_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Normalise request parameters so equal requests get equal keys, whether they come from the SDK
+    or from httpx.
+
+    Args:
+    params: The request parameters.
+
+    Returns:
+    dict: The parameters with string values, without the unset ones. The SDK and the HTTP API
+    share parameter names, 'from_' and 'to_' included.
+    """
+    canonical = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = str(value).lower()
+        elif isinstance(value, (list, tuple)):
+            value = ",".join(str(item) for item in value)
+        canonical[name] = str(value)
+    return canonical
+
+
+def to_plain(value: Any) -> Any:
+    """Convert an SDK response into plain JSON types."""
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    for method in ('model_dump', 'to_dict'):
+        if hasattr(value, method):
+            return to_plain(getattr(value, method)())
+    if hasattr(value, '__dict__'):
+        return {key: to_plain(item) for key, item in vars(value).items() if not key.startswith('_')}
+    return str(value)
+
+
+class RecordedResponse(dict):
+    """A replayed JSON object, readable both as a dict and through attributes like SDK responses"""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return _wrap(self[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key: Any) -> Any:
+        return _wrap(super().__getitem__(key))
+
+
+def _wrap(value: Any) -> Any:
+    if isinstance(value, dict) and not isinstance(value, RecordedResponse):
+        return RecordedResponse(value)
+    if isinstance(value, list):
+        return [_wrap(item) for item in value]
+    return value
+
+
+class ResponseStore:
+    """Gzipped JSON responses on disk, keyed by endpoint and parameters"""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+        directory (str): Directory of the recordings. Defaults to NEWSCATCHER_RECORDINGS_DIR.
+        """
+        self.directory = directory or settings.NEWSCATCHER_RECORDINGS_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({'endpoint': endpoint, 'params': canonical_params(params)}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def save(self, endpoint: str, params: Dict[str, Any], body: Any, status_code: int = 200) -> str:
+        """
+        Store a response, replacing any earlier recording of the same request.
+
+        Returns:
+        str: The key of the recording.
+        """
+        key = self.key(endpoint, params)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            'endpoint': endpoint,
+            'params': canonical_params(params),
+            'status_code': status_code,
+            'recorded_at': datetime.now().isoformat(),
+            'body': to_plain(body)
+        }
+        # Write then rename, so a concurrent reader never sees a partial file
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temporary_path, 'wt', encoding='utf-8') as file:
+            json.dump(record, file)
+        os.replace(temporary_path, path)
+        return key
+
+    def load(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Read a recorded response.
+
+        Returns:
+        dict: The record, with 'status_code' and 'body'.
+
+        Raises:
+        ReplayMissError: If the request was never recorded.
+        """
+        path = self._path(self.key(endpoint, params))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise ReplayMissError(f"No recording for {endpoint} with {canonical_params(params)}") from None
+
+
+class FaultInjector:
+    """Latency and 429 responses added to replayed requests"""
+
+    def __init__(self, latency: Optional[float] = None, rate_limit_every: Optional[int] = None, retry_after: int = 1):
+        """
+        Args:
+        latency (float): Seconds added to every response. Defaults to NEWSCATCHER_REPLAY_LATENCY.
+        rate_limit_every (int): Answer every Nth request with a 429, 0 for never. Defaults to NEWSCATCHER_REPLAY_RATE_LIMIT_EVERY.
+        retry_after (int): Retry-After of the injected 429s, in seconds.
+        """
+        self.latency = settings.NEWSCATCHER_REPLAY_LATENCY if latency is None else latency
+        self.rate_limit_every = settings.NEWSCATCHER_REPLAY_RATE_LIMIT_EVERY if rate_limit_every is None else rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def next_request(self) -> bool:
+        """Count a request and tell whether it should be answered with a 429."""
+        with self._lock:
+            self.requests += 1
+            limited = bool(self.rate_limit_every) and self.requests % self.rate_limit_every == 0
+            if limited:
+                self.rate_limited += 1
+            return limited
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that forwards requests and stores every successful response"""
+
+    def __init__(self, store: ResponseStore, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.store = store
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        if response.status_code != 200:
+            return response
+        content = await response.aread()
+        await asyncio.to_thread(
+            self.store.save, request.url.path, dict(request.url.params), json.loads(content), response.status_code
+        )
+        return httpx.Response(response.status_code, headers=response.headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves recorded responses"""
+
+    def __init__(self, store: ResponseStore, faults: Optional[FaultInjector] = None):
+        self.store = store
+        self.faults = faults or FaultInjector()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.faults.latency:
+            await asyncio.sleep(self.faults.latency)
+        if self.faults.next_request():
+            return httpx.Response(
+                429, json={'message': 'Too many requests'},
+                headers={'Retry-After': str(self.faults.retry_after)}, request=request
+            )
+        record = await asyncio.to_thread(self.store.load, request.url.path, dict(request.url.params))
+        return httpx.Response(record['status_code'], json=record['body'], request=request)
+
+
+class _Endpoint:
+    """One SDK endpoint group, e.g. client.search, recording or replaying its calls"""
+
+    def __init__(self, name: str, call):
+        self._name = name
+        self._call = call
+
+    def __getattr__(self, method: str):
+        if (self._name, method) not in SDK_ENDPOINTS:
+            raise AttributeError(f"{self._name}.{method} is not supported by the recorder")
+        endpoint = SDK_ENDPOINTS[(self._name, method)]
+        return lambda **params: self._call(self._name, method, endpoint, params)
+
+
+class RecordingNewscatcher:
+    """Newscatcher SDK client that stores every response it receives"""
+
+    def __init__(self, client, store: ResponseStore):
+        """
+        Args:
+        client: The Newscatcher SDK client making the calls.
+        store: Where responses are stored.
+        """
+        self.client = client
+        self.store = store
+        self.search = _Endpoint('search', self._call)
+        self.search_link = _Endpoint('search_link', self._call)
+
+    def _call(self, name: str, method: str, endpoint: str, params: Dict[str, Any]):
+        response = getattr(getattr(self.client, name), method)(**params)
+        self.store.save(endpoint, params, response)
+        return response
+
+
+class ReplayNewscatcher:
+    """Newscatcher SDK stand-in that serves recorded responses"""
+
+    def __init__(self, store: ResponseStore, faults: Optional[FaultInjector] = None):
+        self.store = store
+        self.faults = faults or FaultInjector()
+        self.search = _Endpoint('search', self._call)
+        self.search_link = _Endpoint('search_link', self._call)
+
+    def _call(self, name: str, method: str, endpoint: str, params: Dict[str, Any]):
+        if self.faults.latency:
+            time.sleep(self.faults.latency)
+        if self.faults.next_request():
+            from newscatcherapi_client import ApiException
+            raise ApiException(status=429, reason="Too Many Requests")
+        return RecordedResponse(self.store.load(endpoint, params)['body'])
+
+
+def _record_mode(mode: Optional[str]) -> Tuple[str, Optional[ResponseStore]]:
+    mode = (mode or settings.NEWSCATCHER_RECORD_MODE).lower()
+    if mode not in RECORD_MODES:
+        raise ValueError(f"Invalid NEWSCATCHER_RECORD_MODE '{mode}', expected one of {RECORD_MODES}")
+    return mode, (ResponseStore() if mode != "off" else None)
+
+
+def create_newscatcher_client(api_key: str, mode: Optional[str] = None):
+    """
+    Create the Newscatcher SDK client for the record mode.
+
+    Args:
+    api_key (str): Newscatcher API key, unused in replay mode.
+    mode (str): off, record or replay. Defaults to NEWSCATCHER_RECORD_MODE.
+
+    Returns:
+    The SDK client, or a recording or replaying stand-in exposing the same endpoints.
+    """
+    mode, store = _record_mode(mode)
+    if mode == "replay":
+        logger.info(f"Replaying Newscatcher responses from {store.directory}")
+        return ReplayNewscatcher(store)
+
+    from newscatcherapi_client import Newscatcher
+    client = Newscatcher(api_key=api_key)
+    if mode == "record":
+        logger.info(f"Recording Newscatcher responses to {store.directory}")
+        return RecordingNewscatcher(client, store)
+    return client
+
+
+def create_collector_transport(mode: Optional[str] = None) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Create the httpx transport of the async collector for the record mode.
+
+    Args:
+    mode (str): off, record or replay. Defaults to NEWSCATCHER_RECORD_MODE.
+
+    Returns:
+    The recording or replaying transport, or None to call the API directly.
+    """
+    mode, store = _record_mode(mode)
+    if mode == "replay":
+        return ReplayTransport(store)
+    if mode == "record":
+        return RecordingTransport(store)
+    return None
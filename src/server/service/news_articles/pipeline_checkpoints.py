@@ -0,0 +1,97 @@
+"""
+Pipeline Checkpoints
+
+Durable progress of each pipeline stage, stored in the pipeline_checkpoints collection. A
+checkpoint is the _id up to which a stage has handled every article, so its next run only looks at
+articles added since. Articles that failed are kept in the checkpoint's retry list and tried again
+on a later run, without holding the checkpoint back. The resumable scans of the enrichment scripts
+keep their position in the same collection, see keyset_scan.
+
+Key components:
+- CheckpointStore: reads, advances and resets the checkpoints
+"""
+
+# Python Imports
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+# Local Imports
+from server.core.logging import setup_logger
+
+logger = setup_logger(name=__name__)
+
+CHECKPOINT_COLLECTION = "pipeline_checkpoints"
+
+
+class CheckpointStore:
+    """Checkpoints of the pipeline stages, one document per stage"""
+
+    def __init__(self, db):
+        """
+        Args:
+        db: MongoDB database instance.
+        """
+        self.collection = db[CHECKPOINT_COLLECTION]
+
+    def get(self, stage: str) -> Dict[str, Any]:
+        """
+        Read the checkpoint of a stage.
+
+        Returns:
+        dict: The checkpoint, with 'last_id' None and no 'retry_ids' if the stage never ran.
+        """
+        checkpoint = self.collection.find_one({'_id': stage}) or {'_id': stage}
+        checkpoint.setdefault('last_id', None)
+        checkpoint.setdefault('retry_ids', [])
+        return checkpoint
+
+    def advance(self, stage: str, last_id: Any, failed_ids: Iterable[Any] = (), stats: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Move a stage's checkpoint forward to last_id, never back, and queue its failed articles
+        for a retry.
+
+        Args:
+        stage (str): Name of the stage.
+        last_id: The _id up to which the stage handled every article.
+        failed_ids: The articles that failed and should be retried.
+        stats (dict): Counts of the run, kept for monitoring.
+        """
+        update = {
+            '$max': {'last_id': last_id},
+            '$set': {'updated_at': datetime.now(), 'last_stats': stats or {}},
+            '$addToSet': {'retry_ids': {'$each': list(failed_ids)}}
+        }
+        self.collection.update_one({'_id': stage}, update, upsert=True)
+
+    def save_position(self, name: str, last_id: Any, **fields: Any) -> None:
+        """
+        Store the position of a resumable scan. Unlike advance it may move back, since a scan that
+        started over stores its new position.
+
+        Args:
+        name (str): Name of the checkpoint.
+        last_id: The _id up to which the scan handled every article.
+        fields: Other fields to store, e.g. the query of the scan.
+        """
+        self.collection.update_one(
+            {'_id': name},
+            {'$set': {'last_id': last_id, 'updated_at': datetime.now(), **fields}},
+            upsert=True
+        )
+
+    def add_retries(self, stage: str, ids: Iterable[Any]) -> None:
+        """Queue articles for a stage to process again, e.g. once an upstream retry succeeded."""
+        ids = list(ids)
+        if ids:
+            self.collection.update_one({'_id': stage}, {'$addToSet': {'retry_ids': {'$each': ids}}}, upsert=True)
+
+    def resolve_retries(self, stage: str, ids: Iterable[Any]) -> None:
+        """Remove articles from a stage's retry list."""
+        ids = list(ids)
+        if ids:
+            self.collection.update_one({'_id': stage}, {'$pull': {'retry_ids': {'$in': ids}}})
+
+    def reset(self, stage: str) -> None:
+        """Forget a stage's checkpoint, so its next run looks at every article again."""
+        self.collection.delete_one({'_id': stage})
+        logger.info(f"Reset checkpoint of stage '{stage}'")
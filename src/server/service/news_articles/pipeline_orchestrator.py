@@ -0,0 +1,396 @@
+"""
+Pipeline Orchestrator
+
+Headless runner of the news article pipeline, replacing the interactive menus of the stage
+scripts. The stages form a chain:
+
+    collect -> duplicates -> countries -> summarise -> caribbean -> categorise -> vectors
+
+Each stage runs in its own thread and keeps a durable checkpoint in MongoDB (see
+pipeline_checkpoints). A stage only looks at articles whose _id is past its checkpoint and up to
+its upstream stage's frontier, the _id below which the upstream stage has finished. While
+collection runs, its frontier trails the clock by PIPELINE_SETTLE_SECONDS, so summarisation and the
+later stages start on the first collected pages instead of waiting for the whole collection. A
+stage finishes once its upstream stage has finished and it has caught up.
+
+Within its range a stage still only takes the articles that are pending for it, so nothing is
+processed twice. Articles that fail are retried on the stage's next run, and an upstream retry that
+succeeds is handed to the downstream stage. Near duplicates are clustered before any LLM stage, so
+those stages only run on cluster representatives, and the LLM calls saved are reported at the end.
+
+With ENRICHMENT_FUSED on, the summarise stage runs the fused enricher, which also sets the category
+and the Caribbean flag in the same call. The caribbean and categorise stages then only pick up the
+articles the enricher left to them, such as those with an unknown category.
+
+Key components:
+- Stage / STAGES: the stages and how to load them
+- StageState: progress of a stage shared with its downstream stage
+- PipelineOrchestrator: runs the selected stages
+- main: command line interface
+
+Usage:
+    python -m server.service.news_articles.pipeline_orchestrator
+    python -m server.service.news_articles.pipeline_orchestrator --stages summarise,caribbean,categorise
+    python -m server.service.news_articles.pipeline_orchestrator --status
+    python -m server.service.news_articles.pipeline_orchestrator --reset summarise
+"""
+
+# Python Imports
+import argparse
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Third Party Imports
+from bson import ObjectId
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.news_articles.pipeline_checkpoints import CheckpointStore
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+# A stage's process function runs the stage on the articles matching a query and returns a dict
+# with 'succeeded_ids' and 'failed_ids', plus counts
+ProcessFunction = Callable[[Any, Dict[str, Any]], Dict[str, Any]]
+
+
+def object_id_at(moment: datetime) -> ObjectId:
+    """The smallest ObjectId generated at a moment, used as the bound of an _id range."""
+    return ObjectId.from_datetime(moment)
+
+
+def load_duplicates(collection, args) -> Tuple[Dict[str, Any], ProcessFunction]:
+    from server.service.news_articles.near_duplicates import CLUSTER_PENDING_QUERY, assign_duplicate_clusters
+    return CLUSTER_PENDING_QUERY, assign_duplicate_clusters
+
+
+def load_countries(collection, args) -> Tuple[Dict[str, Any], ProcessFunction]:
+    from server.service.news_articles.news_article_updater import set_country_full_names
+
+    def process(collection, query):
+        return {'processed': set_country_full_names(collection, query), 'succeeded_ids': [], 'failed_ids': []}
+
+    return {'msbm_country_full_name': {'$exists': False}}, process
+
+
+def load_summarise(collection, args) -> Tuple[Dict[str, Any], ProcessFunction]:
+    if settings.ENRICHMENT_FUSED:
+        from server.service.news_articles.news_article_enricher import ENRICHMENT_PENDING_QUERY, enrich_articles
+        return ENRICHMENT_PENDING_QUERY, enrich_articles
+    from server.service.news_articles.news_article_summariser import SUMMARY_PENDING_QUERY, summarise_documents
+    return SUMMARY_PENDING_QUERY, summarise_documents
+
+
+def load_caribbean(collection, args) -> Tuple[Dict[str, Any], ProcessFunction]:
+    from server.service.news_articles.news_article_updater import ARTICLE_TYPE_PENDING_QUERY, classify_caribbean_articles
+    return ARTICLE_TYPE_PENDING_QUERY, classify_caribbean_articles
+
+
+def load_categorise(collection, args) -> Tuple[Dict[str, Any], ProcessFunction]:
+    from server.service.news_articles.news_article_categoriser import CATEGORY_PENDING_QUERY, categorize_matching_articles
+    return CATEGORY_PENDING_QUERY, categorize_matching_articles
+
+
+def load_vectors(collection, args) -> Tuple[Dict[str, Any], ProcessFunction]:
+    from server.service.vectorstore.vector_store_updater import (
+        DatabaseConnectionInit,
+        VECTOR_SYNC_PENDING_QUERY,
+        sync_articles_to_astra
+    )
+    connection = DatabaseConnectionInit()
+    return VECTOR_SYNC_PENDING_QUERY, lambda collection, query: sync_articles_to_astra(connection, query)
+
+
+def run_collect(collection, args) -> Dict[str, int]:
+    """Collect the research topics, then the keywords of every language."""
+    from server.service.news_articles.news_article_collector import (
+        NEWS_API_KEY,
+        collect_news_articles,
+        load_keywords_by_language,
+        load_research_topics
+    )
+    totals = {}
+    for queries in (load_research_topics(), load_keywords_by_language()):
+        stats = collect_news_articles(NEWS_API_KEY, queries, collection, days_ago=args.days_ago)
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline stage. The source stage has a run function, the others a load function."""
+    name: str
+    upstream: Optional[str] = None
+    load: Optional[Callable[[Any, argparse.Namespace], Tuple[Dict[str, Any], ProcessFunction]]] = None
+    run: Optional[Callable[[Any, argparse.Namespace], Dict[str, int]]] = None
+
+
+STAGES = [
+    Stage('collect', run=run_collect),
+    Stage('duplicates', upstream='collect', load=load_duplicates),
+    Stage('countries', upstream='duplicates', load=load_countries),
+    Stage('summarise', upstream='countries', load=load_summarise),
+    Stage('caribbean', upstream='summarise', load=load_caribbean),
+    Stage('categorise', upstream='caribbean', load=load_categorise),
+    Stage('vectors', upstream='categorise', load=load_vectors)
+]
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+class StageState:
+    """Progress of a stage in this run, read by its downstream stage"""
+
+    def __init__(self, frontier: Optional[ObjectId] = None, live: bool = False, settle_seconds: float = 0):
+        """
+        Args:
+        frontier: The _id below which the stage has finished.
+        live (bool): Whether the frontier follows the clock until the stage finishes, as for collection.
+        settle_seconds (float): How far a live frontier trails the clock.
+        """
+        self.finished = threading.Event()
+        self.failed = False
+        self.totals: Dict[str, int] = {}
+        self.live = live
+        self.settle_seconds = settle_seconds
+        self._frontier = frontier
+        self._lock = threading.Lock()
+
+    @property
+    def frontier(self) -> Optional[ObjectId]:
+        if self.live and not self.finished.is_set():
+            return object_id_at(datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds))
+        with self._lock:
+            return self._frontier
+
+    def advance(self, frontier: ObjectId) -> None:
+        with self._lock:
+            self._frontier = frontier
+
+    def add_stats(self, stats: Dict[str, Any]) -> None:
+        """Add the counts of a pass to the totals of the run."""
+        for key, value in stats.items():
+            if isinstance(value, int):
+                self.totals[key] = self.totals.get(key, 0) + value
+
+    def finish(self, failed: bool = False) -> None:
+        if failed and self.live:
+            # Keep what a failed live stage completed
+            self.advance(self.frontier)
+        self.failed = failed
+        self.live = False
+        self.finished.set()
+
+
+class PipelineOrchestrator:
+    """Runs the selected pipeline stages, each in its own thread"""
+
+    def __init__(self, collection, args: argparse.Namespace):
+        """
+        Args:
+        collection: The articles collection.
+        args: The parsed command line arguments.
+        """
+        self.collection = collection
+        self.args = args
+        self.checkpoints = CheckpointStore(collection.database)
+        self.selected = set(args.stages)
+        self.stop = threading.Event()
+        self.states = {stage.name: self._initial_state(stage) for stage in STAGES}
+
+    def _initial_state(self, stage: Stage) -> StageState:
+        """
+        The state of a stage before the run. A stage that is not run has finished: collection up
+        to now, since articles may have been collected by other means, and the others up to their
+        checkpoint, or up to now if the orchestrator never ran them.
+        """
+        settle = self.args.settle_seconds
+        if stage.run is not None:
+            state = StageState(live=stage.name in self.selected, settle_seconds=settle)
+            if stage.name not in self.selected:
+                state.advance(object_id_at(datetime.now(timezone.utc) - timedelta(seconds=settle)))
+        else:
+            last_id = self.checkpoints.get(stage.name)['last_id']
+            if last_id is None and stage.name not in self.selected:
+                last_id = object_id_at(datetime.now(timezone.utc) - timedelta(seconds=settle))
+            state = StageState(frontier=last_id)
+        if stage.name not in self.selected:
+            state.finish()
+        return state
+
+    def _downstream(self, stage: Stage) -> List[str]:
+        return [other.name for other in STAGES if other.upstream == stage.name]
+
+    def run_source(self, stage: Stage) -> None:
+        """Run the collection, then move its frontier and checkpoint to the end of the run."""
+        state = self.states[stage.name]
+        try:
+            logger.info(f"Stage '{stage.name}' started")
+            stats = stage.run(self.collection, self.args)
+            # Every collected article is stored now, so the newest _id covers them all
+            newest = self.collection.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+            frontier = newest['_id'] if newest else object_id_at(datetime.now(timezone.utc))
+            self.checkpoints.advance(stage.name, frontier, stats=stats)
+            state.advance(frontier)
+            logger.info(f"Stage '{stage.name}' finished: {stats}")
+            state.finish()
+        except Exception as e:
+            logger.exception(f"Stage '{stage.name}' failed: {e}")
+            state.finish(failed=True)
+
+    def _retry(self, stage: Stage, pending_query: Dict[str, Any], process: ProcessFunction, attempted: set) -> None:
+        """Process the stage's retry list once per run, and hand the successes downstream."""
+        retry_ids = [article_id for article_id in self.checkpoints.get(stage.name)['retry_ids'] if article_id not in attempted]
+        if not retry_ids:
+            return
+        attempted.update(retry_ids)
+        logger.info(f"Stage '{stage.name}' retrying {len(retry_ids)} articles")
+        result = process(self.collection, {'$and': [pending_query, {'_id': {'$in': retry_ids}}]})
+        self.states[stage.name].add_stats({key: value for key, value in result.items() if not key.endswith('_ids')})
+        failed_ids = set(result['failed_ids'])
+        self.checkpoints.resolve_retries(stage.name, [article_id for article_id in retry_ids if article_id not in failed_ids])
+        for downstream in self._downstream(stage):
+            self.checkpoints.add_retries(downstream, result['succeeded_ids'])
+
+    def run_stage(self, stage: Stage) -> None:
+        """Process the stage's range until its upstream stage has finished and it has caught up."""
+        state = self.states[stage.name]
+        upstream = self.states[stage.upstream]
+        try:
+            pending_query, process = stage.load(self.collection, self.args)
+            logger.info(f"Stage '{stage.name}' started")
+            attempted = set()
+            while not self.stop.is_set():
+                # Read before the frontier, so the last pass covers the final frontier
+                upstream_finished = upstream.finished.is_set()
+                frontier = upstream.frontier
+                self._retry(stage, pending_query, process, attempted)
+
+                checkpoint = state.frontier
+                if frontier is not None and (checkpoint is None or frontier > checkpoint):
+                    id_range = {'$lte': frontier}
+                    if checkpoint is not None:
+                        id_range['$gt'] = checkpoint
+                    result = process(self.collection, {'$and': [pending_query, {'_id': id_range}]})
+                    stats = {key: value for key, value in result.items() if not key.endswith('_ids')}
+                    self.checkpoints.advance(stage.name, frontier, result['failed_ids'], stats)
+                    state.add_stats(stats)
+                    state.advance(frontier)
+                    logger.info(f"Stage '{stage.name}' advanced to {frontier.generation_time}: {stats}, "
+                                f"{len(result['failed_ids'])} failed")
+
+                if upstream_finished:
+                    break
+                self.stop.wait(self.args.poll_seconds)
+
+            if upstream.failed:
+                logger.warning(f"Stage '{stage.name}' stopped at {state.frontier} because stage '{stage.upstream}' failed")
+            state.finish(failed=upstream.failed)
+        except Exception as e:
+            logger.exception(f"Stage '{stage.name}' failed: {e}")
+            state.finish(failed=True)
+
+    def run(self) -> bool:
+        """
+        Run the selected stages until they have all finished.
+
+        Returns:
+        bool: True if every selected stage succeeded.
+        """
+        threads = []
+        for stage in STAGES:
+            if stage.name not in self.selected:
+                continue
+            target = self.run_source if stage.run is not None else self.run_stage
+            thread = threading.Thread(target=target, args=(stage,), name=f"pipeline-{stage.name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.warning("Interrupted, stopping once the running batches are done")
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        saved = {name: self.states[name].totals.get('llm_calls_saved', 0) for name in STAGE_NAMES if name in self.selected}
+        if any(saved.values()):
+            logger.info(f"LLM calls saved by near duplicate clusters: {sum(saved.values())} "
+                        f"({', '.join(f'{name} {count}' for name, count in saved.items() if count)})")
+        cache_hits = {name: self.states[name].totals.get('cache_hits', 0) for name in STAGE_NAMES if name in self.selected}
+        if any(cache_hits.values()):
+            logger.info(f"LLM calls served from the response cache: {sum(cache_hits.values())} "
+                        f"({', '.join(f'{name} {count}' for name, count in cache_hits.items() if count)})")
+
+        failed = [name for name in STAGE_NAMES if name in self.selected and self.states[name].failed]
+        if failed:
+            logger.error(f"Pipeline finished with failed stages: {', '.join(failed)}")
+        else:
+            logger.info("Pipeline finished")
+        return not failed
+
+
+def print_status(checkpoints: CheckpointStore) -> None:
+    """Print the checkpoint of every stage."""
+    print(f"{'stage':<12} {'checkpoint':<26} {'updated':<20} {'retries':>7}  last run")
+    for name in STAGE_NAMES:
+        checkpoint = checkpoints.get(name)
+        last_id = checkpoint['last_id']
+        position = last_id.generation_time.strftime("%Y-%m-%d %H:%M:%S UTC") if last_id else "never run"
+        updated = checkpoint['updated_at'].strftime("%Y-%m-%d %H:%M:%S") if checkpoint.get('updated_at') else "-"
+        print(f"{name:<12} {position:<26} {updated:<20} {len(checkpoint['retry_ids']):>7}  {checkpoint.get('last_stats', {})}")
+
+
+def parse_stage_names(value: str) -> List[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in STAGE_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown stages {unknown}, expected some of {STAGE_NAMES}")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the news article pipeline stages with checkpoints")
+    parser.add_argument("--stages", type=parse_stage_names, default=STAGE_NAMES,
+                        help=f"Comma separated stages to run, of {','.join(STAGE_NAMES)}. Defaults to all.")
+    parser.add_argument("--skip", type=parse_stage_names, default=[], help="Comma separated stages not to run")
+    parser.add_argument("--days-ago", type=int, default=365, help="Search window of queries collected for the first time")
+    parser.add_argument("--poll-seconds", type=float, default=settings.PIPELINE_POLL_SECONDS,
+                        help="How often a stage checks for new articles while its upstream stage runs")
+    parser.add_argument("--settle-seconds", type=float, default=settings.PIPELINE_SETTLE_SECONDS,
+                        help="How far behind the clock downstream stages stay while collection runs")
+    parser.add_argument("--reset", type=parse_stage_names, default=[],
+                        help="Comma separated stages whose checkpoint is cleared before the run")
+    parser.add_argument("--status", action="store_true", help="Print the checkpoints and exit")
+    args = parser.parse_args()
+    args.stages = [name for name in args.stages if name not in args.skip]
+
+    from server.service.news_articles.news_article_collector import connect_to_mongodb
+    client, collection = connect_to_mongodb()
+    try:
+        checkpoints = CheckpointStore(collection.database)
+        for name in args.reset:
+            checkpoints.reset(name)
+        if args.status:
+            print_status(checkpoints)
+            return
+        if not args.stages:
+            logger.warning("No stages selected")
+            return
+        succeeded = PipelineOrchestrator(collection, args).run()
+    finally:
+        client.close()
+    sys.exit(0 if succeeded else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Query Planner
+
+Searching every keyword on its own costs at least one Newscatcher call per keyword, even for the
+many keywords that only return a handful of articles. This module packs the keywords of each
+language into OR-combined queries, as long as the query stays under the API's length limit, so
+one call covers many keywords.
+
+An OR query returns the union of its keywords' results, except when the union has more hits than
+the API returns for one search. Such a batch is split in half and each half is searched again,
+down to single keywords, which are then fetched like in the per-keyword mode. The collected
+articles are therefore the same as when every keyword is searched on its own.
+
+Key components:
+- quote_keyword / build_or_query: query syntax
+- pack_keywords: greedy packing of keywords under the length limit
+- QueryPlanner: plans the batches and collects them, splitting truncated ones
+"""
+
+# Python Imports
+from typing import Callable, Dict, List, Optional, Union
+
+# Local Imports
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector, PageCallback, QueryProgress
+
+logger = setup_logger(name=__name__)
+
+settings = get_settings()
+
+OR_SEPARATOR = " OR "
+
+
+def quote_keyword(keyword: str) -> str:
+    """
+    Quote a multi-word keyword so it is searched as an exact phrase. A single word stays bare, so
+    it matches the same articles in an OR query as when it is searched on its own.
+    """
+    keyword = " ".join(keyword.replace('"', ' ').split())
+    if len(keyword.split()) > 1:
+        return '"' + keyword + '"'
+    return keyword
+
+
+def build_or_query(keywords: List[str]) -> str:
+    """Combine keywords into one OR query, or return the bare keyword for a batch of one."""
+    if len(keywords) == 1:
+        return keywords[0]
+    return OR_SEPARATOR.join(quote_keyword(keyword) for keyword in keywords)
+
+
+def pack_keywords(keywords: List[str], max_length: int) -> List[List[str]]:
+    """
+    Pack keywords into batches whose OR query stays within max_length characters. A keyword that
+    does not fit on its own, or that has several words, gets a batch of its own: a bare multi-word
+    keyword matches its words anywhere in the article, which a quoted phrase would not.
+
+    Args:
+    keywords (List[str]): The keywords, packed in this order.
+    max_length (int): Maximum length of a query.
+
+    Returns:
+    List[List[str]]: The batches.
+    """
+    batches = []
+    batch = []
+    length = 0
+    for keyword in keywords:
+        if len(keyword.split()) > 1:
+            batches.append([keyword])
+            continue
+        keyword_length = len(quote_keyword(keyword))
+        if batch and length + len(OR_SEPARATOR) + keyword_length > max_length:
+            batches.append(batch)
+            batch, length = [], 0
+        length += keyword_length + (len(OR_SEPARATOR) if batch else 0)
+        batch.append(keyword)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class QueryPlanner:
+    """Collects keywords through OR-combined queries, splitting those with truncated results"""
+
+    def __init__(self, max_length: Optional[int] = None):
+        """
+        Args:
+        max_length (int): Maximum length of a query. Defaults to NEWSCATCHER_MAX_QUERY_LENGTH.
+        """
+        self.max_length = max_length or settings.NEWSCATCHER_MAX_QUERY_LENGTH
+        self.keyword_count = 0
+        self.queries_planned = 0
+        self.queries_searched = 0
+        self.splits = 0
+
+    def plan(self, keywords_by_language: Dict[str, List[str]]) -> List[List[str]]:
+        """
+        Pack the keywords of each language into batches. A keyword listed for several languages
+        is only searched once.
+
+        Args:
+        keywords_by_language: The keywords of each language.
+
+        Returns:
+        List[List[str]]: The batches, language after language.
+        """
+        seen = set()
+        batches = []
+        for language in sorted(keywords_by_language):
+            keywords = []
+            for keyword in sorted(set(keywords_by_language[language])):
+                if keyword.strip() and keyword not in seen:
+                    seen.add(keyword)
+                    keywords.append(keyword)
+            language_batches = pack_keywords(keywords, self.max_length)
+            logger.info(f"Packed {len(keywords)} {language} keywords into {len(language_batches)} queries")
+            batches.extend(language_batches)
+        self.keyword_count = len(seen)
+        self.queries_planned = len(batches)
+        return batches
+
+    async def collect(
+        self,
+        collector: AsyncNewscatcherCollector,
+        batches: List[List[str]],
+        from_: Union[str, Callable[[str], str]],
+        on_page: Optional[PageCallback] = None
+    ) -> Dict[str, QueryProgress]:
+        """
+        Collect every keyword through the batches from plan(). Batches with truncated results are
+        split in half and collected again until every keyword is covered.
+
+        Args:
+        collector: The collector making the calls.
+        batches: The planned batches.
+        from_: Start of the search window, or a function returning it for a query.
+        on_page: Optional callback receiving every page as (query, page, articles).
+
+        Returns:
+        dict: The progress of each query searched, deferred batches included.
+        """
+        pending = batches
+        while pending:
+            batches = {build_or_query(batch): batch for batch in pending}
+            self.queries_searched += len(batches)
+            progress = await collector.collect(
+                list(batches),
+                from_,
+                on_page,
+                defer_truncated=lambda query: len(batches[query]) > 1
+            )
+            pending = []
+            for query, batch in batches.items():
+                if progress[query].deferred:
+                    middle = len(batch) // 2
+                    pending.extend([batch[:middle], batch[middle:]])
+                    self.splits += 1
+
+        logger.info(f"Searched {self.keyword_count} keywords with {self.queries_searched} queries "
+                    f"({self.queries_planned} planned, {self.splits} split) and {collector.requests_made} requests, "
+                    f"instead of at least {self.keyword_count} per-keyword searches")
+        return collector.progress
@@ -0,0 +1,79 @@
+"""
+Read Routing Module
+-----------------
+This module decides which replica set members serve each kind of read. Interactive reads (search
+pages, country lists, dashboards) stay on the primary so users always see the latest data. Heavy
+reads (analytics, exports, facets and index builds) go to secondaries, where they do not compete
+with the pipeline's bulk writes. maxStalenessSeconds stops them from reading from a secondary
+that has fallen too far behind.
+
+secondaryPreferred falls back to the primary when no secondary is available, so the same
+configuration works on a single-host replica set or a standalone server.
+
+Functions:
+    - analytics_read_preference(): Returns the read preference for heavy reads
+    - read_preference_for(): Returns the read preference for an operation
+"""
+
+from typing import Optional, Union
+
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred
+)
+
+from server.core.config import get_settings
+
+settings = get_settings()
+
+# Operations whose reads may be served by secondaries
+ANALYTICS_OPERATIONS = ("analytics", "export", "facets", "suggest")
+
+_READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+# Any of the read preferences above
+ReadPreference = Union[Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest]
+
+
+def analytics_read_preference() -> ReadPreference:
+    """
+    Returns the read preference for heavy reads, from MONGODB_ANALYTICS_READ_PREFERENCE and
+    MONGODB_MAX_STALENESS_SECONDS.
+
+    Raises:
+        ValueError: If the configured read preference is not a MongoDB read preference mode
+    """
+    mode_name = settings.MONGODB_ANALYTICS_READ_PREFERENCE
+    mode = _READ_PREFERENCE_MODES.get(mode_name)
+    if mode is None:
+        raise ValueError(
+            f"Unknown read preference {mode_name}, expected one of {', '.join(_READ_PREFERENCE_MODES)}"
+        )
+    if mode is Primary:
+        return Primary()
+    # MongoDB requires maxStalenessSeconds to be at least 90 seconds
+    return mode(max_staleness=max(settings.MONGODB_MAX_STALENESS_SECONDS, 90))
+
+
+def read_preference_for(operation: Optional[str]) -> ReadPreference:
+    """
+    Returns the read preference for an operation.
+
+    Args:
+        operation: Name of the operation, e.g. 'search' or 'export'. None for the primary
+
+    Returns:
+        The read preference to pass to MongoClient.get_database()
+    """
+    if operation in ANALYTICS_OPERATIONS:
+        return analytics_read_preference()
+    return Primary()
@@ -0,0 +1,155 @@
+"""
+Related Articles Service Module
+-----------------------------
+This module finds the articles most similar to a given article. The article's summary embedding
+is read back from the AstraDB collection and used directly as the query vector, so no text is
+embedded and the embedding model is never loaded. The collection is accessed with astrapy rather
+than through the LangChain vector store, which would load the query encoder on construction.
+
+Functions:
+    - get_astra_collection(): Returns the shared astrapy handle on the vector store collection
+    - build_related_filter(): Builds the AstraDB filter equivalent to the search filters
+    - get_related_articles(): Returns the k nearest articles to an article
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from astrapy import DataAPIClient
+
+from server.core.config import get_settings
+from server.core.logging import setup_logger
+from server.service.news_articles.news_article_normaliser import derive_media_source
+
+logger = setup_logger("server.service.related_articles_service")
+
+settings = get_settings()
+
+# Fields of the vector store documents, as written by the LangChain AstraDB vector store
+METADATA_FIELD = "metadata"
+CONTENT_FIELD = "content"
+VECTOR_FIELD = "$vector"
+
+
+@lru_cache()
+def get_astra_collection():
+    """Returns the astrapy collection backing the vector store, created once per process"""
+    client = DataAPIClient(settings.ASTRA_DB_APPLICATION_TOKEN)
+    database = client.get_database(
+        settings.ASTRA_DB_API_ENDPOINT,
+        keyspace=settings.ASTRA_DB_NAMESPACE or None
+    )
+    return database.get_collection(settings.COLLECTION_NAME)
+
+
+def build_related_filter(
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Builds an AstraDB filter on the article metadata matching the search_articles() filters.
+    Dates are compared as 'YYYY-MM-DD HH:MM:SS' strings, the format of published_date.
+
+    Args:
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start date in ISO format
+        end_date: Optional end date in ISO format, inclusive of the whole day
+
+    Returns:
+        dict: The AstraDB filter
+    """
+    conditions = []
+    if categories:
+        conditions.append({f"{METADATA_FIELD}.msbm_category": {"$in": categories}})
+    if countries:
+        conditions.append({f"{METADATA_FIELD}.msbm_country_full_name": {"$in": countries}})
+    if start_date:
+        start_of_range = datetime.fromisoformat(start_date.replace('Z', '')).strftime("%Y-%m-%d")
+        conditions.append({f"{METADATA_FIELD}.published_date": {"$gte": start_of_range}})
+    if end_date:
+        end_of_range = datetime.fromisoformat(end_date.replace('Z', '')).date() + timedelta(days=1)
+        conditions.append({f"{METADATA_FIELD}.published_date": {"$lt": end_of_range.strftime("%Y-%m-%d")}})
+
+    if len(conditions) > 1:
+        return {"$and": conditions}
+    return conditions[0] if conditions else {}
+
+
+def _to_result(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts a vector store document to the shape of a search result"""
+    metadata = document.get(METADATA_FIELD) or {}
+    published_date = metadata.get("published_date")
+    return {
+        "title": metadata.get("title"),
+        "link": metadata.get("link"),
+        "domain_url": metadata.get("domain_url"),
+        "published_date": published_date[:10] if isinstance(published_date, str) else "Date not available",
+        "msbm_country_full_name": metadata.get("msbm_country_full_name"),
+        "msbm_category": metadata.get("msbm_category"),
+        "msbm_llm_summary": document.get(CONTENT_FIELD),
+        "media_source": derive_media_source(metadata.get("domain_url")) or "Source not available",
+        "similarity": document.get("$similarity")
+    }
+
+
+def get_related_articles(
+    link_or_id: str,
+    k: int = 5,
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the k articles nearest to an article in the vector store, using its stored embedding.
+
+    Args:
+        link_or_id: The article's link, or the ID of its vector store document
+        k: Number of related articles to return
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start date in ISO format
+        end_date: Optional end date in ISO format
+
+    Returns:
+        dict: Contains the 'article' and its 'related' articles, or None if the article is not found
+    """
+    collection = get_astra_collection()
+    lookup = {f"{METADATA_FIELD}.link": link_or_id} if link_or_id.startswith("http") else {"_id": link_or_id}
+    article = collection.find_one(
+        lookup,
+        projection={VECTOR_FIELD: True, METADATA_FIELD: True, CONTENT_FIELD: True}
+    )
+    if not article or not article.get(VECTOR_FIELD):
+        logger.warning(f"No vector store document found for {link_or_id}")
+        return None
+
+    link = (article.get(METADATA_FIELD) or {}).get("link")
+    related_filter = build_related_filter(categories, countries, start_date, end_date)
+
+    # Fetch extra neighbours, since the article itself and copies of it are skipped
+    cursor = collection.find(
+        related_filter,
+        sort={VECTOR_FIELD: article[VECTOR_FIELD]},
+        limit=k + 5,
+        projection={METADATA_FIELD: True, CONTENT_FIELD: True},
+        include_similarity=True
+    )
+
+    related = []
+    seen_links = {link}
+    for document in cursor:
+        document_link = (document.get(METADATA_FIELD) or {}).get("link")
+        if document["_id"] == article["_id"] or document_link in seen_links:
+            continue
+        seen_links.add(document_link)
+        related.append(_to_result(document))
+        if len(related) >= k:
+            break
+
+    logger.info(f"Found {len(related)} articles related to {link_or_id}")
+    return {"article": _to_result(article), "related": related}
@@ -0,0 +1,264 @@
+"""
+Search Cache Module
+-----------------
+This module provides an in-process LRU/TTL cache for search results. Saved dashboards replay
+the same searches every time they are opened, so results are cached by their normalised query
+parameters and page. The cache is bounded by total size in bytes as well as entry count, and is
+cleared whenever the corpus version changes.
+
+Functions:
+    - normalise_search_params(): Builds a canonical representation of the search parameters
+    - make_cache_key(): Builds a cache key from the normalised search parameters
+    - make_etag(): Builds a weak HTTP ETag from the corpus version and normalised parameters
+    - etag_matches(): Checks an If-None-Match header against an ETag
+
+Classes:
+    - SearchResultCache: Byte-bounded LRU cache with TTL expiry and metrics
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from server.core.logging import setup_logger
+
+logger = setup_logger("server.service.search_cache")
+
+
+def _normalise_values(values: Optional[Union[str, List[str]]]) -> List[str]:
+    """Returns a sorted list of unique, stripped values"""
+    if not values:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    return sorted({value.strip() for value in values if value and value.strip()})
+
+
+def _normalise_date(value: Optional[str]) -> Optional[str]:
+    """Reduces an ISO date string to the day, which is the precision used by the query"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '')).strftime("%Y-%m-%d")
+
+
+def normalise_search_params(
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 10,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Builds a canonical representation of the search parameters, so that requests which produce
+    the same MongoDB query also produce the same cache key.
+
+    Args:
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start date in ISO format
+        end_date: Optional end date in ISO format
+        page: Page number for pagination
+        page_size: Number of items per page
+        fields: Optional list of article fields to return, None for all fields
+        q: Optional full-text search string
+
+    Returns:
+        dict: The normalised search parameters
+    """
+    return {
+        "categories": _normalise_values(categories),
+        "countries": _normalise_values(countries),
+        "start_date": _normalise_date(start_date),
+        "end_date": _normalise_date(end_date),
+        "page": page,
+        "page_size": page_size,
+        "fields": _normalise_values(fields) or None,
+        "q": " ".join(q.split()) if q and q.strip() else None
+    }
+
+
+def make_cache_key(normalised_params: Dict[str, Any]) -> str:
+    """Builds a cache key from the output of normalise_search_params()"""
+    return json.dumps(normalised_params, sort_keys=True, separators=(",", ":"))
+
+
+def make_etag(scope: str, corpus_version: int, normalised_params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Builds a weak ETag for a response. The body of a response only depends on the corpus
+    version and the normalised request parameters, so the ETag can be computed without
+    running the query.
+
+    Args:
+        scope: Name of the endpoint, so different endpoints never share an ETag
+        corpus_version: Current corpus version
+        normalised_params: Output of normalise_search_params(), if the endpoint takes parameters
+
+    Returns:
+        str: The quoted weak ETag
+    """
+    payload = f"{scope}:{corpus_version}:{make_cache_key(normalised_params or {})}"
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match request header against an ETag using weak comparison.
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: ETag of the current representation
+
+    Returns:
+        bool: True if the client already has the current representation
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def estimate_size(value: Any) -> int:
+    """Estimates the memory cost of a cached value from its JSON encoded size"""
+    return len(json.dumps(value, default=str))
+
+
+class SearchResultCache:
+    """
+    Byte-bounded LRU cache with TTL expiry for search results.
+
+    Cached values are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (value, size_bytes, stored_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size_bytes = 0
+        self._corpus_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_corpus_version(self, corpus_version: int) -> None:
+        """Drops every entry when the corpus version differs from the one they were cached under"""
+        if self._corpus_version != corpus_version:
+            if self._entries:
+                logger.info(f"Corpus version changed to {corpus_version}, "
+                            f"invalidating {len(self._entries)} cached searches")
+                self.invalidations += 1
+            self._entries.clear()
+            self._size_bytes = 0
+            self._corpus_version = corpus_version
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def get(self, key: str, corpus_version: int) -> Optional[Any]:
+        """
+        Returns the cached value for key, or None on a miss.
+
+        Args:
+            key: Cache key from make_cache_key()
+            corpus_version: Current corpus version
+
+        Returns:
+            The cached value or None
+        """
+        with self._lock:
+            self._check_corpus_version(corpus_version)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, _, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, corpus_version: int) -> None:
+        """
+        Stores value under key, evicting least recently used entries until the cache fits.
+
+        Args:
+            key: Cache key from make_cache_key()
+            value: Value to cache
+            corpus_version: Corpus version the value was computed against
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.info(f"Search result of {size} bytes exceeds cache capacity, not caching")
+            return
+
+        with self._lock:
+            self._check_corpus_version(corpus_version)
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, time.monotonic())
+            self._size_bytes += size
+
+            while self._size_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every entry, keeping the metrics"""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache metrics.
+
+        Returns:
+            dict: Hit ratio, size, eviction and invalidation counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "corpus_version": self._corpus_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
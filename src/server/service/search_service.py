@@ -5,10 +5,19 @@ This module handles all database search operations for the news article applicat
 It provides functionality to connect to MongoDB and retrieve unique country data.
 
 Functions:
-    - get_mongodb_connection(): Establishes and returns a MongoDB connection
+    - get_mongodb_client(): Establishes the shared MongoDB client
+    - get_mongodb_connection(): Returns the database with the read preference for an operation
     - get_unique_countries(): Retrieves unique country names from the database
-    - search_articles(): Search articles with filters for category, country, and date range
-    - get_saved_dashboards(): Retrieves saved dashboards from MongoDB
+    - get_current_corpus_version(): Returns the corpus version used to invalidate cached results
+    - build_search_query(): Builds the MongoDB filter shared by search and export queries
+    - build_result_projection(): Builds the projection for the requested article fields
+    - search_articles(): Search articles with filters for category, country, date range and text
+    - iter_export_articles(): Streams every article matching the search filters
+    - get_article_analytics(): Returns dashboard time series and breakdowns from the rollups
+    - load_suggest_entries(): Loads the titles, sources and countries indexed for autocomplete
+    - get_suggestions(): Returns autocomplete suggestions for a prefix
+    - get_search_cache_stats(): Returns the search result cache metrics
+    - get_saved_dashboards(): Retrieves a page of saved dashboards from MongoDB
     - save_dashboard(): Save a new dashboard to MongoDB
     - update_dashboard_name(): Update a dashboard's name in MongoDB
 """
@@ -17,8 +26,15 @@ import pymongo
 from pymongo.server_api import ServerApi
 from server.core.logging import setup_logger
 from src.server.core.config import get_settings
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from src.server.service.corpus_version import get_corpus_version
+from src.server.service.analytics_service import query_article_rollups
+from src.server.service.read_routing import read_preference_for
+from src.server.service.suggest_index import SuggestIndexHolder
+from src.server.service.text_search import parse_text_query, add_highlights
+from src.server.service.search_cache import SearchResultCache, normalise_search_params, make_cache_key
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 
 # Configure logging - use consistent name without 'src.' prefix
 logger = setup_logger("server.service.search_service")
@@ -26,12 +42,20 @@ logger = setup_logger("server.service.search_service")
 # Get settings once at module level
 settings = get_settings()
 
-def get_mongodb_connection():
+# Shared search result cache, invalidated when the corpus version changes
+search_cache = SearchResultCache(
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+)
+
+@lru_cache()
+def get_mongodb_client() -> pymongo.MongoClient:
     """
-    Establishes a connection to MongoDB using configuration settings.
+    Creates the MongoDB client shared by all requests, so that connections are pooled.
     
     Returns:
-        pymongo.database.Database: MongoDB database instance
+        pymongo.MongoClient: MongoDB client
         
     Raises:
         pymongo.errors.ConnectionError: If connection to MongoDB fails
@@ -48,15 +72,31 @@ def get_mongodb_connection():
         # Verify connection
         client.admin.command('ping')
         logger.info("Successfully connected to MongoDB")
-        
-        db = client[settings.MONGODB_DB_NAME]
-        logger.info(f"Connected to database: {settings.MONGODB_DB_NAME}")
-        return db
+        return client
         
     except Exception as e:
         logger.warning(f"Failed to connect to MongoDB: {str(e)}")
         raise
 
+def get_mongodb_connection(operation: Optional[str] = None):
+    """
+    Returns the database, with the read preference for the operation. Interactive operations
+    read from the primary, analytics, export, facet and suggest reads from secondaries.
+    
+    Args:
+        operation: Optional operation name used to pick the read preference, see read_routing
+    
+    Returns:
+        pymongo.database.Database: MongoDB database instance
+        
+    Raises:
+        pymongo.errors.ConnectionError: If connection to MongoDB fails
+    """
+    return get_mongodb_client().get_database(
+        settings.MONGODB_DB_NAME,
+        read_preference=read_preference_for(operation)
+    )
+
 def get_unique_countries():
     """
     Retrieves a list of unique country names from the database.
@@ -90,7 +130,105 @@ def get_unique_countries():
         logger.warning(f"Error fetching unique countries: {str(e)}")
         return []
 
+def get_current_corpus_version() -> int:
+    """
+    Returns the current corpus version. The value is cached in-process and only
+    re-read from MongoDB every CORPUS_VERSION_TTL_SECONDS.
+    
+    Returns:
+        int: The corpus version
+    """
+    return get_corpus_version(get_mongodb_connection)
+
+
+# Fields returned for each article. published_date and media_source are derived from the
+# normalised msbm_published_date and msbm_media_source fields written at ingest time.
+SEARCH_RESULT_PROJECTION = {
+    "_id": 0,
+    "title": 1,
+    "link": 1,
+    "domain_url": 1,
+    "published_date": {
+        "$ifNull": [
+            {"$dateToString": {"format": "%Y-%m-%d", "date": "$msbm_published_date"}},
+            "Date not available"
+        ]
+    },
+    "msbm_country_full_name": 1,
+    "msbm_category": 1,
+    "msbm_llm_summary": 1,
+    "media_source": {"$ifNull": ["$msbm_media_source", "Source not available"]}
+}
 
+# Fields clients may request through the fields parameter
+SEARCH_RESULT_FIELDS = [field for field in SEARCH_RESULT_PROJECTION if field != "_id"]
+
+def build_result_projection(fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Builds the $project stage for search results, limited to the requested fields.
+    
+    Args:
+        fields: Optional list of fields from SEARCH_RESULT_FIELDS, None for all fields
+        
+    Returns:
+        dict: The projection
+        
+    Raises:
+        ValueError: If a requested field is not a known article field
+    """
+    if not fields:
+        return SEARCH_RESULT_PROJECTION
+    
+    unknown_fields = [field for field in fields if field not in SEARCH_RESULT_FIELDS]
+    if unknown_fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown_fields)}")
+    
+    projection = {"_id": 0}
+    projection.update({field: SEARCH_RESULT_PROJECTION[field] for field in fields})
+    return projection
+
+def build_search_query(
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    q: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Builds the MongoDB filter for an article search.
+    
+    Args:
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start date in ISO format
+        end_date: Optional end date in ISO format, inclusive of the whole day
+        q: Optional full-text search string matched against titles and summaries
+        
+    Returns:
+        dict: The MongoDB query
+    """
+    if isinstance(countries, str):
+        countries = [countries]
+    
+    # Convert date strings to datetime objects, matching against the normalised BSON date
+    start_date_obj = datetime.fromisoformat(start_date.replace('Z', '')) if start_date else datetime(1900, 1, 1)
+    end_date_obj = datetime.fromisoformat(end_date.replace('Z', '')) if end_date else datetime(2100, 12, 31)
+    start_of_range = datetime.combine(start_date_obj.date(), datetime.min.time())
+    end_of_range = datetime.combine(end_date_obj.date(), datetime.min.time()) + timedelta(days=1)
+    
+    # Build the query using the specified structure
+    query = {
+        "msbm_category": {"$in": categories} if categories else {"$exists": True},
+        "msbm_country_full_name": {"$in": countries} if countries else {"$exists": True},
+        "msbm_published_date": {
+            "$gte": start_of_range,
+            "$lt": end_of_range
+        },
+        "msbm_caribbean_article": "True"
+    }
+    if q and q.strip():
+        query["$text"] = {"$search": q}
+    return query
 
 def search_articles(
     categories: Optional[List[str]] = None,
@@ -98,10 +236,14 @@ def search_articles(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     page: int = 1,
-    page_size: int = 10
+    page_size: int = 10,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Search articles with filters for categories, countries, and date range.
+    When q is given, only articles whose title or summary match it are returned, most
+    relevant first, each with a relevance 'score' and the 'highlights' offsets of the terms.
     
     Args:
         categories: Optional list of categories to filter by
@@ -110,6 +252,8 @@ def search_articles(
         end_date: Optional end date in ISO format
         page: Page number for pagination
         page_size: Number of items per page
+        fields: Optional list of article fields to return, None for all fields
+        q: Optional full-text search string in MongoDB $text syntax
         
     Returns:
         Dict containing:
@@ -124,119 +268,281 @@ def search_articles(
         logger.info(f"Countries received in search_articles: {countries}")
         logger.info(f"Date Range: {start_date} to {end_date}")
         logger.info(f"Page: {page}, Page Size: {page_size}")
+        logger.info(f"Fields: {fields or 'all'}")
+        logger.info(f"Text query: {q}")
+        
+        projection = build_result_projection(fields)
+        
+        # Serve repeated searches from the cache
+        corpus_version = get_current_corpus_version()
+        cache_key = make_cache_key(normalise_search_params(
+            categories, countries, start_date, end_date, page, page_size, fields, q
+        ))
+        cached_results = search_cache.get(cache_key, corpus_version)
+        if cached_results is not None:
+            logger.info("Returning cached search results")
+            return cached_results
         
         db = get_mongodb_connection()
         collection = db[settings.MONGODB_COLLECTION_NAME]
         logger.info(f"Connected to collection: {settings.MONGODB_COLLECTION_NAME}")
         
-        # Convert date strings to datetime objects
-        start_date_obj = datetime.fromisoformat(start_date.replace('Z', '')) if start_date else None
-        end_date_obj = datetime.fromisoformat(end_date.replace('Z', '')) if end_date else None
-        
-        # Build the query using the specified structure
-        query = {
-            "msbm_category": {"$in": categories} if categories else {"$exists": True},
-            "msbm_country_full_name": {"$in": countries} if countries else {"$exists": True},
-            "published_date": {
-                "$gte": start_date_obj.strftime("%Y-%m-%d") if start_date_obj else "1900-01-01",
-                "$lte": end_date_obj.strftime("%Y-%m-%d") if end_date_obj else "2100-12-31"
-            },
-            "msbm_caribbean_article": "True"
-        }
-        
+        query = build_search_query(categories, countries, start_date, end_date, q)
         logger.info(f"Built MongoDB query: {query}")
         
         # Get total count for pagination
         total_articles = collection.count_documents(query)
         logger.info(f"Total matching articles: {total_articles}")
         
-        # Log the projection fields we're requesting
-        projection = {
-            "_id": 0,
-            "title": 1,
-            "link": 1,
-            "domain_url": 1,
-            "published_date": 1,
-            "msbm_country_full_name": 1,
-            "msbm_category": 1,
-            "msbm_llm_summary": 1
-        }
-        logger.info("Projections Loaded")
-        
-        # Get paginated results
+        # Get paginated results, with the date and media source formatted by MongoDB
         skip = (page - 1) * page_size
-        articles = list(collection.find(query, projection).skip(skip).limit(page_size))
-        
-        logger.info(f"Retrieved {len(articles)} articles for current page")
-        
-        # Process articles
-        processed_articles = []
-        for article in articles:
-            try:
-                # Format date
-                if 'published_date' in article:
-                    try:
-                        date_obj = datetime.strptime(article['published_date'], '%Y-%m-%d')
-                        article['published_date'] = date_obj.strftime('%Y-%m-%d')
-                    except ValueError:
-                        try:
-                            date_obj = datetime.strptime(article['published_date'], '%Y-%m-%d %H:%M:%S')
-                            article['published_date'] = date_obj.strftime('%Y-%m-%d')
-                        except ValueError:
-                            article['published_date'] = article.get('published_date', 'Date not available')
-                
-                # Set media source
-                article['media_source'] = article.get('domain_url', 'Source not available')
-                if article['media_source'] != 'Source not available':
-                    source = article['media_source']
-                    source = source.replace('http://', '').replace('https://', '').replace('www.', '')
-                    source = source.rstrip('/')
-                    article['media_source'] = source
-                
-                processed_articles.append(article)
-                
-            except Exception as e:
-                logger.warning(f"Error processing article: {str(e)}")
-                continue
-        
-        return {
+        pipeline = [{"$match": query}]
+        if "$text" in query:
+            # Rank by relevance before paginating
+            text_score = {"$meta": "textScore"}
+            pipeline.append({"$sort": {"score": text_score}})
+            projection = {**projection, "score": text_score}
+        pipeline += [
+            {"$skip": skip},
+            {"$limit": page_size},
+            {"$project": projection}
+        ]
+        processed_articles = list(collection.aggregate(pipeline))
+        
+        if "$text" in query:
+            terms = parse_text_query(q)
+            for article in processed_articles:
+                add_highlights(article, terms)
+        
+        logger.info(f"Retrieved {len(processed_articles)} articles for current page")
+        
+        results = {
             "articles": processed_articles,
             "total": total_articles,
             "page": page,
             "total_pages": (total_articles + page_size - 1) // page_size
         }
+        search_cache.set(cache_key, results, corpus_version)
+        return results
         
     except Exception as e:
         logger.warning(f"Search operation failed: {str(e)}", exc_info=True)
         raise
 
-def get_saved_dashboards():
+# Documents fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = 500
+
+def iter_export_articles(
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams every article matching the search filters from a server-side cursor.
+    Only one batch of EXPORT_BATCH_SIZE documents is held in memory at a time.
+    
+    The query is sent and its first batch read before this function returns, so an invalid
+    filter or an unreachable database raises here, while the caller can still answer with an
+    error status, rather than part way through the streamed response.
+    
+    Args:
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start date in ISO format
+        end_date: Optional end date in ISO format
+        fields: Optional list of article fields to return, None for all fields
+        q: Optional full-text search string matched against titles and summaries
+        
+    Returns:
+        Iterator[dict]: Articles in the same shape as search_articles() results
+    """
+    projection = build_result_projection(fields)
+    query = build_search_query(categories, countries, start_date, end_date, q)
+    logger.info(f"Starting article export with query: {query}")
+    
+    db = get_mongodb_connection("export")
+    collection = db[settings.MONGODB_COLLECTION_NAME]
+    
+    cursor = collection.aggregate(
+        [{"$match": query}, {"$project": projection}],
+        batchSize=EXPORT_BATCH_SIZE
+    )
+    try:
+        first_article = next(cursor, None)
+    except Exception:
+        cursor.close()
+        raise
+    return _iter_export_cursor(cursor, first_article)
+
+def _iter_export_cursor(cursor, first_article: Optional[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yields the primed first article and then the rest of the cursor, closing it at the end."""
+    exported_count = 0
+    try:
+        if first_article is None:
+            return
+        exported_count += 1
+        yield first_article
+        for article in cursor:
+            exported_count += 1
+            yield article
+    finally:
+        cursor.close()
+        logger.info(f"Article export finished after {exported_count} articles")
+
+def get_article_analytics(
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    granularity: str = "month",
+    top_n: int = 10
+) -> Dict[str, Any]:
+    """
+    Returns article counts over time and top-N country and category breakdowns.
+    Reads the precomputed rollups, so the cost does not depend on the size of the corpus.
+    
+    Args:
+        categories: Optional list of categories to filter by
+        countries: Optional list of countries to filter by
+        start_date: Optional start date in ISO format
+        end_date: Optional end date in ISO format
+        granularity: 'month' or 'week'
+        top_n: Number of countries and categories in the breakdowns
+        
+    Returns:
+        dict: Contains 'series', 'top_countries', 'top_categories' and 'total'
+    """
+    try:
+        logger.info(f"Fetching {granularity} analytics for categories={categories}, countries={countries}")
+        start_date_obj = datetime.fromisoformat(start_date.replace('Z', '')) if start_date else None
+        end_date_obj = datetime.fromisoformat(end_date.replace('Z', '')) if end_date else None
+        
+        db = get_mongodb_connection("analytics")
+        analytics = query_article_rollups(
+            db,
+            categories=categories,
+            countries=countries,
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            granularity=granularity,
+            top_n=top_n
+        )
+        logger.info(f"Retrieved {len(analytics['series'])} periods covering {analytics['total']} articles")
+        return analytics
+        
+    except Exception as e:
+        logger.warning(f"Analytics query failed: {str(e)}")
+        raise
+
+def load_suggest_entries() -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Streams the titles, media sources and countries of searchable articles for the suggest index.
+    
+    Yields:
+        tuple: (type, value, link) with link set for titles only
+    """
+    db = get_mongodb_connection("suggest")
+    collection = db[settings.MONGODB_COLLECTION_NAME]
+    cursor = collection.find(
+        {"msbm_caribbean_article": "True"},
+        {"_id": 0, "title": 1, "link": 1, "domain_url": 1, "msbm_media_source": 1, "msbm_country_full_name": 1},
+        batch_size=EXPORT_BATCH_SIZE
+    )
+    try:
+        for article in cursor:
+            yield "title", article.get("title"), article.get("link")
+            yield "source", article.get("msbm_media_source") or article.get("domain_url"), None
+            yield "country", article.get("msbm_country_full_name"), None
+    finally:
+        cursor.close()
+
+# In-memory autocomplete index, rebuilt when the corpus version changes
+suggest_index = SuggestIndexHolder(load_suggest_entries)
+
+def get_suggestions(prefix: str, limit: int = 10, types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Returns autocomplete suggestions for titles, sources and countries starting with a prefix.
+    
+    Args:
+        prefix: The text typed so far
+        limit: Maximum number of suggestions
+        types: Optional subset of 'title', 'source' and 'country'
+        
+    Returns:
+        list: Suggestions with 'type', 'value', 'count' and, for titles, 'link'
+    """
+    return suggest_index.get(get_current_corpus_version()).lookup(prefix, limit=limit, types=types)
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    """
+    Returns the search result cache metrics.
+    
+    Returns:
+        dict: Hit ratio, size, eviction and invalidation counters
+    """
+    return search_cache.stats()
+
+# Dashboard fields clients may request, and the ones returned by default
+DASHBOARD_FIELDS = ["dashboard_name", "selected_keywords", "selected_countries", "start_date", "end_date", "created_at"]
+DEFAULT_DASHBOARD_FIELDS = ["dashboard_name", "selected_keywords", "selected_countries", "created_at"]
+
+def get_saved_dashboards(
+    page: int = 1,
+    page_size: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
-    Retrieves saved dashboards from MongoDB.
+    Retrieves a page of saved dashboards from MongoDB, oldest first.
     
+    Args:
+        page: Page number for pagination
+        page_size: Number of dashboards per page, None for every dashboard on a single page
+        fields: Optional list of fields from DASHBOARD_FIELDS, None for the default fields
+        
     Returns:
-        list: List of dashboard names and their IDs
+        Dict containing:
+            - dashboards: List of dashboards with their IDs
+            - total: Total number of dashboards
+            - page: Current page number
+            - total_pages: Total number of pages
+            
+    Raises:
+        ValueError: If a requested field is not a known dashboard field
     """
     try:
-        logger.info("Fetching saved dashboards")
+        logger.info(f"Fetching saved dashboards, page {page} of size {page_size or 'all'}")
+        fields = fields or DEFAULT_DASHBOARD_FIELDS
+        unknown_fields = [field for field in fields if field not in DASHBOARD_FIELDS]
+        if unknown_fields:
+            raise ValueError(f"Unknown fields: {', '.join(unknown_fields)}")
+        
         db = get_mongodb_connection()
         collection = db['dashboards']
+        total_dashboards = collection.count_documents({})
+        
+        # Only fetch the requested fields, ObjectIds increase with creation time
+        cursor = collection.find({}, {field: 1 for field in fields}).sort("_id", pymongo.ASCENDING)
+        if page_size:
+            cursor = cursor.skip((page - 1) * page_size).limit(page_size)
         
-        # Get dashboards with only necessary fields and convert ObjectId to string
         dashboards = []
-        for dashboard in collection.find({}):
-            # Convert ObjectId to string and only include necessary fields
-            dashboard_data = {
-                "dashboard_name": dashboard.get("dashboard_name", "Unnamed Dashboard"),
-                "_id": str(dashboard["_id"]),  # Convert ObjectId to string
-                "selected_keywords": dashboard.get("selected_keywords", {}),
-                "selected_countries": dashboard.get("selected_countries", {}),
-                "created_at": dashboard.get("created_at", datetime.now().isoformat())
-            }
+        for dashboard in cursor:
+            dashboard_data = {field: dashboard.get(field) for field in fields}
+            dashboard_data["_id"] = str(dashboard["_id"])  # Convert ObjectId to string
+            if "dashboard_name" in fields:
+                dashboard_data["dashboard_name"] = dashboard.get("dashboard_name") or "Unnamed Dashboard"
             dashboards.append(dashboard_data)
         
-        logger.info(f"Retrieved {len(dashboards)} dashboards")
-        return dashboards
+        logger.info(f"Retrieved {len(dashboards)} of {total_dashboards} dashboards")
+        return {
+            "dashboards": dashboards,
+            "total": total_dashboards,
+            "page": page if page_size else 1,
+            "total_pages": (total_dashboards + page_size - 1) // page_size if page_size else min(total_dashboards, 1)
+        }
         
     except Exception as e:
         logger.warning(f"Error fetching dashboards: {str(e)}")
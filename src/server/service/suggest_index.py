@@ -0,0 +1,208 @@
+"""
+Suggest Index Module
+------------------
+This module provides the in-memory index behind title, source and country autocomplete.
+Each kind of suggestion is kept in a sorted array of normalised keys, so a prefix lookup is a
+binary search followed by a short scan, and the whole index is a handful of flat lists.
+The index is rebuilt in a background thread when the corpus version changes, and the previous
+index keeps serving lookups until the new one is ready.
+
+Functions:
+    - normalise_key(): Folds case and accents so lookups ignore them
+
+Classes:
+    - PrefixIndex: Immutable sorted-array prefix index
+    - SuggestIndexHolder: Holds the current index and rebuilds it for new corpus versions
+"""
+
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from server.core.logging import setup_logger
+
+logger = setup_logger("server.service.suggest_index")
+
+SUGGESTION_TYPES = ("title", "source", "country")
+
+# Maximum number of keys scanned per type for one lookup, bounding the cost of short prefixes
+MAX_SCAN = 1000
+
+
+def normalise_key(value: str) -> str:
+    """Lowercases a value, strips accents and collapses whitespace"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+class PrefixIndex:
+    """
+    Immutable prefix index over suggestions of several types.
+
+    Entries with the same type and normalised key are merged and counted, so sources and
+    countries are ranked by the number of articles they cover.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Optional[str]]]):
+        """
+        Builds the index.
+
+        Args:
+            entries: (type, value, link) tuples, with link set for titles and None otherwise
+        """
+        merged: Dict[str, Dict[str, list]] = {suggestion_type: {} for suggestion_type in SUGGESTION_TYPES}
+        for suggestion_type, value, link in entries:
+            if not isinstance(value, str) or not value.strip():
+                continue
+            key = normalise_key(value)
+            entry = merged[suggestion_type].get(key)
+            if entry is None:
+                merged[suggestion_type][key] = [value.strip(), link, 1]
+            else:
+                entry[2] += 1
+
+        # Per type: sorted keys and, at the same positions, (value, link, count)
+        self._keys: Dict[str, List[str]] = {}
+        self._values: Dict[str, List[tuple]] = {}
+        for suggestion_type, entries_by_key in merged.items():
+            keys = sorted(entries_by_key)
+            self._keys[suggestion_type] = keys
+            self._values[suggestion_type] = [tuple(entries_by_key[key]) for key in keys]
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._keys.values())
+
+    def lookup(self, prefix: str, limit: int = 10, types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Returns suggestions whose value starts with the prefix, ignoring case and accents.
+        Countries come first, then sources, then titles; within a type, values covering more
+        articles come first.
+
+        Args:
+            prefix: The text typed so far
+            limit: Maximum number of suggestions
+            types: Optional subset of SUGGESTION_TYPES to search
+
+        Returns:
+            list: Suggestions with 'type', 'value', 'count' and, for titles, 'link'
+        """
+        key_prefix = normalise_key(prefix)
+        if not key_prefix:
+            return []
+
+        suggestions = []
+        for suggestion_type in ("country", "source", "title"):
+            if types and suggestion_type not in types:
+                continue
+            keys = self._keys[suggestion_type]
+            values = self._values[suggestion_type]
+
+            matches = []
+            position = bisect_left(keys, key_prefix)
+            end = min(len(keys), position + MAX_SCAN)
+            while position < end and keys[position].startswith(key_prefix):
+                matches.append(values[position])
+                position += 1
+
+            matches.sort(key=lambda match: -match[2])
+            for value, link, count in matches[:limit - len(suggestions)]:
+                suggestion = {"type": suggestion_type, "value": value, "count": count}
+                if link:
+                    suggestion["link"] = link
+                suggestions.append(suggestion)
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def memory_bytes(self) -> int:
+        """Approximates the memory used by the index"""
+        total = 0
+        for suggestion_type in SUGGESTION_TYPES:
+            keys = self._keys[suggestion_type]
+            values = self._values[suggestion_type]
+            total += sys.getsizeof(keys) + sys.getsizeof(values)
+            total += sum(sys.getsizeof(key) for key in keys)
+            for value, link, count in values:
+                total += sys.getsizeof((value, link, count)) + sys.getsizeof(value)
+                if link:
+                    total += sys.getsizeof(link)
+        return total
+
+
+class SuggestIndexHolder:
+    """Holds the current PrefixIndex and rebuilds it when the corpus version changes"""
+
+    def __init__(self, load_entries: Callable[[], Iterable[Tuple[str, str, Optional[str]]]]):
+        """
+        Args:
+            load_entries: Returns the (type, value, link) tuples to index
+        """
+        self._load_entries = load_entries
+        self._index: Optional[PrefixIndex] = None
+        self._corpus_version: Optional[int] = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    def build(self, corpus_version: int) -> PrefixIndex:
+        """
+        Builds a new index for a corpus version and swaps it in.
+
+        Args:
+            corpus_version: Corpus version the entries are loaded from
+
+        Returns:
+            PrefixIndex: The new index
+        """
+        started = time.perf_counter()
+        index = PrefixIndex(self._load_entries())
+        with self._lock:
+            self._index = index
+            self._corpus_version = corpus_version
+            self._building = False
+        logger.info(
+            f"Built suggest index for corpus version {corpus_version}: {len(index)} keys, "
+            f"~{index.memory_bytes() / (1024 * 1024):.1f} MiB, {time.perf_counter() - started:.2f}s"
+        )
+        return index
+
+    def _build_in_background(self, corpus_version: int) -> None:
+        try:
+            self.build(corpus_version)
+        except Exception as e:
+            with self._lock:
+                self._building = False
+            logger.warning(f"Failed to rebuild suggest index: {str(e)}")
+
+    def get(self, corpus_version: int) -> PrefixIndex:
+        """
+        Returns the current index. If it was built for an older corpus version, a rebuild is
+        started in the background and the current index is returned meanwhile. The very first
+        call builds the index before returning.
+
+        Args:
+            corpus_version: Current corpus version
+
+        Returns:
+            PrefixIndex: The index
+        """
+        with self._lock:
+            index = self._index
+            if index is not None and (self._corpus_version == corpus_version or self._building):
+                return index
+            if index is not None:
+                self._building = True
+
+        if index is None:
+            return self.build(corpus_version)
+
+        threading.Thread(
+            target=self._build_in_background,
+            args=(corpus_version,),
+            name="suggest-index-build",
+            daemon=True
+        ).start()
+        return index
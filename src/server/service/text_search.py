@@ -0,0 +1,110 @@
+"""
+Text Search Module
+----------------
+This module supports the q= full-text search over article titles and summaries. Matching and
+relevance ranking are done by a MongoDB text index; this module defines that index and computes
+the highlighting offsets returned with each result, since MongoDB does not report where terms matched.
+
+Functions:
+    - ensure_text_index(): Creates the text index on titles and summaries
+    - parse_text_query(): Extracts the terms to highlight from a $text search string
+    - find_term_offsets(): Finds the character offsets of query terms in a text
+    - add_highlights(): Adds highlighting offsets to a search result
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+from server.core.logging import setup_logger
+
+logger = setup_logger("server.service.text_search")
+
+TEXT_INDEX_NAME = "article_text"
+
+# Title matches count three times as much as summary matches towards the relevance score
+TEXT_INDEX_WEIGHTS = {"title": 3, "msbm_llm_summary": 1}
+
+# Fields highlighting offsets are computed for
+HIGHLIGHT_FIELDS = tuple(TEXT_INDEX_WEIGHTS)
+
+# Terms in a search string: quoted phrases, or single words not negated with a leading '-'
+_QUERY_TOKEN = re.compile(r'"([^"]+)"|(?<!\S)(-?)([^\s"]+)')
+_WORD = re.compile(r"\w+")
+
+
+def ensure_text_index(collection) -> None:
+    """
+    Creates the text index used by the q= search parameter if it does not exist yet.
+
+    Args:
+        collection: The articles collection
+    """
+    collection.create_index(
+        [(field, "text") for field in TEXT_INDEX_WEIGHTS],
+        name=TEXT_INDEX_NAME,
+        weights=TEXT_INDEX_WEIGHTS,
+        default_language="english",
+        # Newscatcher articles have a 'language' field with codes MongoDB does not support,
+        # which would make inserts fail if it were used as the per-document language
+        language_override="msbm_text_language"
+    )
+    logger.info("Ensured text index on articles collection")
+
+
+def parse_text_query(q: str) -> List[str]:
+    """
+    Extracts the terms to highlight from a search string in MongoDB $text syntax.
+    Negated terms are dropped and quoted phrases are split into their words.
+
+    Args:
+        q: The search string, e.g. 'domestic "sexual violence" -sport'
+
+    Returns:
+        list: Unique lowercase terms in the order they appear
+    """
+    terms = []
+    for phrase, negation, word in _QUERY_TOKEN.findall(q or ""):
+        if negation:
+            continue
+        for term in _WORD.findall((phrase or word).lower()):
+            if term not in terms:
+                terms.append(term)
+    return terms
+
+
+def find_term_offsets(text: str, terms: List[str]) -> List[Tuple[int, int]]:
+    """
+    Finds the words in a text that match a query term. A word matches when it starts with the
+    term, which approximates the stemming done by the text index ('violence' matches 'violences').
+
+    Args:
+        text: The text to search
+        terms: Lowercase terms from parse_text_query()
+
+    Returns:
+        list: Sorted (start, end) character offsets of the matching words
+    """
+    if not text or not terms:
+        return []
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    return [match.span() for match in pattern.finditer(text)]
+
+
+def add_highlights(article: Dict[str, Any], terms: List[str]) -> Dict[str, Any]:
+    """
+    Adds a 'highlights' entry mapping each highlighted field present in the article to the
+    offsets of the query terms in it.
+
+    Args:
+        article: A search result
+        terms: Lowercase terms from parse_text_query()
+
+    Returns:
+        dict: The article, modified in place
+    """
+    article["highlights"] = {
+        field: [list(span) for span in find_term_offsets(article[field], terms)]
+        for field in HIGHLIGHT_FIELDS
+        if isinstance(article.get(field), str)
+    }
+    return article
@@ -1,5 +1,6 @@
 # Built-in imports
 import uuid
+from datetime import datetime
 
 # External library imports
 from langchain_core.documents import Document
@@ -9,13 +10,21 @@ from pymongo import MongoClient
 from langchain.embeddings import HuggingFaceEmbeddings
 
 # Local application imports
-from core.config import get_settings
-from core.logging import setup_logger
+from server.core.config import get_settings
+from server.core.logging import setup_logger
 
 # Initialize settings and logger
 settings = get_settings()
 logger = setup_logger(__name__)
 
+# Caribbean articles not yet added to AstraDB by sync_articles_to_astra(). Near duplicates are
+# left out, their representative is already in the vector store.
+VECTOR_SYNC_PENDING_QUERY = {
+    "msbm_caribbean_article": {"$eq": "True"},
+    "msbm_vector_synced_at": {"$exists": False},
+    "msbm_is_duplicate": {"$ne": True}
+}
+
 def get_embeddings():
     """Initialize and return the embedding model"""
     try:
@@ -75,13 +84,14 @@ class DatabaseConnectionInit:
         except Exception as e:
             logger.info(f"Error closing MongoDB connection: {str(e)}")
 
-def get_msbm_articles(database_connection, batch_size=100):
+def get_msbm_articles(database_connection, batch_size=100, query=None):
     """
     Query MongoDB for all MSBM Caribbean articles using pagination with PyMongo's native find()
     
     Args:
         database_connection: Instance of DatabaseConnectionInit
         batch_size (int): Number of documents to retrieve per batch
+        query (dict): Optional filter, all MSBM Caribbean articles by default
         
     Returns:
         list: All matching MSBM Caribbean articles
@@ -91,7 +101,7 @@ def get_msbm_articles(database_connection, batch_size=100):
         
         # Use PyMongo's find() instead of vector search
         cursor = database_connection.mongo_collection.find(
-            {"msbm_caribbean_article": {"$eq": "True"}},
+            query if query is not None else {"msbm_caribbean_article": {"$eq": "True"}},
             batch_size=batch_size
         )
         
@@ -175,6 +185,31 @@ def add_articles_to_astra(database_connection, articles):
         logger.info(f"Failed to add articles to AstraDB: {str(e)}")
         raise
 
+def sync_articles_to_astra(database_connection, query):
+    """
+    Add the MongoDB articles matching a query to AstraDB and mark them as synced, so they are
+    not added again
+    
+    Args:
+        database_connection: Instance of DatabaseConnectionInit
+        query (dict): Filter of the articles to sync, e.g. VECTOR_SYNC_PENDING_QUERY
+        
+    Returns:
+        dict: 'processed' count, 'succeeded_ids' and 'failed_ids'
+    """
+    articles = get_msbm_articles(database_connection, query=query)
+    article_ids = [article.metadata['_id'] for article in articles]
+    if not articles:
+        return {'processed': 0, 'succeeded_ids': [], 'failed_ids': []}
+    
+    add_articles_to_astra(database_connection, articles)
+    database_connection.mongo_collection.update_many(
+        {'_id': {'$in': article_ids}},
+        {'$set': {'msbm_vector_synced_at': datetime.now()}}
+    )
+    logger.info(f"Marked {len(article_ids)} articles as synced to AstraDB")
+    return {'processed': len(article_ids), 'succeeded_ids': article_ids, 'failed_ids': []}
+
 def main():
     """
     Main function to handle vector store operations using match-case
@@ -0,0 +1,95 @@
+"""
+Shared fixtures.
+
+The collector tests never call Newscatcher: the fake server is recorded once per session into a
+ResponseStore, and the tests replay the store, as CI does with a recording made against the API.
+"""
+
+# Python Imports
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+# Third Party Imports
+import httpx
+import pytest
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app, load_fixture_keywords
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector
+from server.service.news_articles.newscatcher_recorder import FaultInjector, RecordingTransport, ReplayTransport, ResponseStore
+from server.service.news_articles.query_planner import QueryPlanner
+
+CORPUS_SIZE = 2000
+FROM = "365 days ago"
+PAGE_SIZE = 100
+
+# Small enough for the planner to pack several batches and split the ones with more hits
+PLANNER_MAX_LENGTH = 120
+PLANNER_MAX_RESULTS = 150
+
+
+def make_collector(transport: httpx.AsyncBaseTransport) -> AsyncNewscatcherCollector:
+    return AsyncNewscatcherCollector(
+        api_key="test",
+        base_url="http://fake",
+        rate_per_second=1000,
+        max_retries=3,
+        page_size=PAGE_SIZE,
+        transport=transport
+    )
+
+
+def collect_links(transport: httpx.AsyncBaseTransport, keywords: List[str], planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
+    """
+    Collect the keywords one by one, or through the planner's batches, returning the links and
+    the collector.
+    """
+    links: Set[str] = set()
+    collector = make_collector(transport)
+
+    def on_page(query, page, articles):
+        links.update(article['link'] for article in articles)
+
+    if planner is None:
+        asyncio.run(collector.collect(keywords, FROM, on_page))
+    else:
+        collector.max_results = PLANNER_MAX_RESULTS
+        asyncio.run(planner.collect(collector, planner.plan({'en': keywords}), FROM, on_page))
+    return {'links': links, 'collector': collector}
+
+
+@pytest.fixture(scope="session")
+def keywords() -> List[str]:
+    return load_fixture_keywords()[:40]
+
+
+@pytest.fixture(scope="session")
+def recording(tmp_path_factory, keywords) -> Dict[str, Any]:
+    """Records the per-keyword and the planned collection of the keywords from the fake server."""
+    store = ResponseStore(str(tmp_path_factory.mktemp("recordings")))
+    transport = RecordingTransport(store, inner=httpx.ASGITransport(app=create_app(CORPUS_SIZE)))
+    per_keyword = collect_links(transport, keywords)
+    planner = QueryPlanner(PLANNER_MAX_LENGTH)
+    planned = collect_links(transport, keywords, planner)
+    return {
+        'store': store,
+        'per_keyword_links': per_keyword['links'],
+        'per_keyword_requests': per_keyword['collector'].requests_made,
+        'planned_links': planned['links'],
+        'planner': planner
+    }
+
+
+@pytest.fixture
+def replay(recording, keywords):
+    """Collects the keywords again from the recording, optionally with injected faults or through a planner."""
+    def run(faults: Optional[FaultInjector] = None, planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
+        faults = faults or FaultInjector(latency=0, rate_limit_every=0)
+        return collect_links(ReplayTransport(recording['store'], faults), keywords, planner)
+    return run
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient()['test']
@@ -0,0 +1,99 @@
+# Python Imports
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+# Third Party Imports
+import httpx
+import pytest
+
+# Local Imports
+from server.benchmarks.fake_newscatcher import create_app
+from server.service.news_articles.async_collector import AsyncNewscatcherCollector, parse_retry_after
+
+FROM = "365 days ago"
+
+
+class InFlightTransport(httpx.AsyncBaseTransport):
+    """Counts the requests in flight on the way to the fake server"""
+
+    def __init__(self, app):
+        self.inner = httpx.ASGITransport(app=app)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self.inner.handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+
+
+def collect(app, keyword, **kwargs):
+    """Collect one keyword from the fake server, returning the collector, the links and the elapsed time."""
+    transport = kwargs.pop('transport', None) or httpx.ASGITransport(app=app)
+    collector = AsyncNewscatcherCollector(
+        api_key="test", base_url="http://fake", transport=transport, max_retries=5, **kwargs
+    )
+    links = []
+
+    def on_page(query, page, articles):
+        links.extend(article['link'] for article in articles)
+
+    started = time.monotonic()
+    asyncio.run(collector.collect([keyword], FROM, on_page))
+    return collector, links, time.monotonic() - started
+
+
+@pytest.fixture(scope="module")
+def keyword():
+    # A fixture keyword with about 150 hits in the corpus
+    return "abus"
+
+
+def test_collects_every_page_of_a_query(keyword):
+    app = create_app(2000)
+
+    collector, links, elapsed = collect(app, keyword, rate_per_second=1000, page_size=10)
+
+    progress = collector.progress[keyword]
+    assert progress.total_pages > 1
+    assert progress.complete
+    assert len(links) == len(set(links)) == progress.total_hits
+    assert collector.requests_made == app.state.requests == progress.total_pages
+
+
+def test_pages_are_fetched_concurrently_up_to_the_limit(keyword):
+    app = create_app(2000, latency=0.02)
+    transport = InFlightTransport(app)
+
+    collector, links, elapsed = collect(app, keyword, rate_per_second=1000, page_size=10, concurrency=3, transport=transport)
+
+    assert collector.progress[keyword].total_pages > 4
+    assert transport.max_in_flight == 3
+
+
+def test_rate_limited_requests_wait_for_retry_after(keyword):
+    app = create_app(2000, rate_limit=5, retry_after=1)
+
+    collector, links, elapsed = collect(app, keyword, rate_per_second=1000, page_size=20, concurrency=8)
+
+    progress = collector.progress[keyword]
+    assert progress.complete
+    assert len(set(links)) == progress.total_hits
+    assert collector.rate_limited == app.state.rate_limited > 0
+    # The whole bucket pauses for the Retry-After of the first 429
+    assert elapsed >= 1
+
+
+def test_parse_retry_after():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert parse_retry_after("3", default=1) == 3
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True), default=1) <= 30
+    assert parse_retry_after(None, default=2) == 2
+    assert parse_retry_after("soon", default=2) == 2
+    assert parse_retry_after("-5", default=2) == 0
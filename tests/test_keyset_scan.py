@@ -0,0 +1,81 @@
+# Local Imports
+from server.service.news_articles.keyset_scan import SCAN_CHECKPOINT_PREFIX, KeysetScan
+from server.service.news_articles.pipeline_checkpoints import CheckpointStore
+
+QUERY = {'msbm_llm_summary': {'$exists': False}}
+
+
+def insert_articles(db, count):
+    return [db.articles.insert_one({'index': index}).inserted_id for index in range(count)]
+
+
+def test_scan_reads_every_article_in_id_order(db):
+    ids = insert_articles(db, 25)
+
+    scan = KeysetScan(db.articles, QUERY, batch_size=10)
+
+    assert [article['_id'] for article in scan] == ids
+    assert scan.exhausted
+
+
+def test_scan_resumes_after_the_saved_position(db):
+    ids = insert_articles(db, 25)
+    scan = KeysetScan(db.articles, QUERY, name="test", batch_size=10)
+    for article in scan:
+        if article['index'] == 12:
+            break
+    # Only the first 10 are handled, the 11th failed to write
+    scan.done(ids[:10])
+    scan.done(ids[11:13])
+    scan.save()
+
+    resumed = KeysetScan(db.articles, QUERY, name="test", batch_size=10)
+
+    assert resumed.start_id == ids[9]
+    assert [article['_id'] for article in resumed] == ids[10:]
+
+
+def test_finished_scan_removes_its_checkpoint(db):
+    ids = insert_articles(db, 5)
+    scan = KeysetScan(db.articles, QUERY, name="test", batch_size=2)
+    for article in scan:
+        scan.done([article['_id']])
+        scan.save()
+    assert CheckpointStore(db).get(SCAN_CHECKPOINT_PREFIX + "test")['last_id'] == ids[-1]
+
+    scan.finish()
+
+    assert CheckpointStore(db).get(SCAN_CHECKPOINT_PREFIX + "test")['last_id'] is None
+
+
+def test_checkpoint_of_another_query_is_ignored(db):
+    ids = insert_articles(db, 5)
+    CheckpointStore(db).save_position(SCAN_CHECKPOINT_PREFIX + "test", ids[2], query="other")
+
+    scan = KeysetScan(db.articles, QUERY, name="test")
+
+    assert scan.start_id is None
+    assert len(list(scan)) == 5
+
+
+def test_checkpoint_store_never_moves_back(db):
+    checkpoints = CheckpointStore(db)
+
+    checkpoints.advance("summarise", 10, failed_ids=[3], stats={'processed': 10})
+    checkpoints.advance("summarise", 5, failed_ids=[4])
+
+    checkpoint = checkpoints.get("summarise")
+    assert checkpoint['last_id'] == 10
+    assert sorted(checkpoint['retry_ids']) == [3, 4]
+
+
+def test_checkpoint_store_retries_and_reset(db):
+    checkpoints = CheckpointStore(db)
+    checkpoints.add_retries("caribbean", [1, 2])
+    checkpoints.add_retries("caribbean", [2])
+    checkpoints.resolve_retries("caribbean", [1])
+    assert checkpoints.get("caribbean")['retry_ids'] == [2]
+
+    checkpoints.reset("caribbean")
+
+    assert checkpoints.get("caribbean") == {'_id': "caribbean", 'last_id': None, 'retry_ids': []}
@@ -0,0 +1,94 @@
+# Third Party Imports
+import pytest
+
+# Local Imports
+from server.service.news_articles.link_deduplicator import BloomFilter, LinkDeduplicator
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    links = [f"https://example.com/news/{index}" for index in range(5000)]
+
+    for link in links:
+        bloom.add(link)
+
+    assert all(link in bloom for link in links)
+    assert bloom.count == 5000
+
+
+def test_bloom_filter_false_positive_rate_at_capacity():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for index in range(5000):
+        bloom.add(f"https://example.com/news/{index}")
+
+    false_positives = sum(f"https://other.com/news/{index}" in bloom for index in range(20000))
+
+    # Twice the configured rate leaves room for the variance of the sample
+    assert false_positives / 20000 < 0.02
+
+
+def test_empty_bloom_filter_contains_nothing():
+    assert "https://example.com" not in BloomFilter(capacity=0)
+
+
+def page(*links):
+    return [{'link': link, 'title': link} for link in links]
+
+
+@pytest.fixture
+def articles(db):
+    db.articles.create_index('link', unique=True)
+    db.articles.insert_many(page("stored-1", "stored-2"))
+    return db.articles
+
+
+def test_filter_drops_stored_and_already_seen_links(articles):
+    deduplicator = LinkDeduplicator(articles, use_bloom_filter=True)
+    assert deduplicator.preload() == 2
+
+    first = deduplicator.filter("abuse", page("stored-1", "new-1", "new-1", "new-2"))
+    second = deduplicator.filter("femicide", page("new-2", "stored-2", "new-3"))
+
+    assert [article['link'] for article in first] == ["new-1", "new-2"]
+    assert [article['link'] for article in second] == ["new-3"]
+    assert deduplicator.false_positives == 0
+
+
+def test_filter_without_bloom_filter_keeps_stored_links_for_the_upsert(articles):
+    deduplicator = LinkDeduplicator(articles, use_bloom_filter=False)
+
+    assert deduplicator.preload() == 0
+    assert [article['link'] for article in deduplicator.filter("abuse", page("stored-1", "new-1", "new-1"))] == ["stored-1", "new-1"]
+
+
+def test_bloom_false_positives_are_confirmed_against_the_collection(articles):
+    deduplicator = LinkDeduplicator(articles, use_bloom_filter=True)
+    deduplicator.preload()
+    # Every link of the page looks stored to the filter, only the $in query can tell them apart
+    for link in ("new-1", "new-2"):
+        deduplicator.bloom_filter.add(link)
+
+    new_articles = deduplicator.filter("abuse", page("stored-1", "new-1", "new-2"))
+
+    assert [article['link'] for article in new_articles] == ["new-1", "new-2"]
+    assert deduplicator.false_positives == 2
+
+
+def test_articles_without_links_are_dropped(articles):
+    deduplicator = LinkDeduplicator(articles, use_bloom_filter=False)
+
+    assert deduplicator.filter("abuse", [{'title': "no link"}, {'link': ""}]) == []
+
+
+def test_report_ranks_queries_by_duplicate_ratio(articles):
+    deduplicator = LinkDeduplicator(articles, use_bloom_filter=True)
+    deduplicator.preload()
+    deduplicator.filter("abuse", page("new-1", "new-2", "stored-1", "new-3"))
+    deduplicator.filter("femicide", page("new-1", "new-2"))
+    deduplicator.filter("harassment", [])
+
+    assert deduplicator.report() == [
+        {'query': "femicide", 'received': 2, 'new': 0, 'duplicate_ratio': 1.0},
+        {'query': "abuse", 'received': 4, 'new': 3, 'duplicate_ratio': 0.25},
+        {'query': "harassment", 'received': 0, 'new': 0, 'duplicate_ratio': 0.0}
+    ]
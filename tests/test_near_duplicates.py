@@ -0,0 +1,124 @@
+# Third Party Imports
+import pytest
+
+# Local Imports
+from server.service.news_articles.near_duplicates import (
+    CLUSTER_FIELD,
+    CLUSTER_PENDING_QUERY,
+    DUPLICATE_FIELD,
+    ENRICHMENT_FIELDS,
+    MinHasher,
+    assign_duplicate_clusters,
+    copy_to_duplicates
+)
+
+ARTICLE = (
+    "The Ministry of Gender Affairs launched a national campaign against domestic violence on "
+    "Monday, pledging new shelters in every parish and training for police officers who respond "
+    "to reports of abuse. Advocates welcomed the plan but warned that funding remains uncertain."
+)
+EDITED = ARTICLE.replace("on Monday", "on Tuesday") + " Read more."
+UNRELATED = "Cricket fans gathered at Sabina Park as the West Indies chased a record target on the final day."
+ENRICHMENT = {'msbm_llm_summary': "A campaign against domestic violence.", 'msbm_caribbean_article': True, 'msbm_category': "Gender-Based Violence"}
+
+
+@pytest.fixture
+def hasher():
+    return MinHasher(num_perm=128, bands=32, shingle_size=3)
+
+
+def test_identical_texts_share_signature_and_bands(hasher):
+    first = hasher.signature(ARTICLE)
+    second = hasher.signature(ARTICLE.upper())
+
+    assert hasher.similarity(first, second) == 1.0
+    assert hasher.band_keys(first) == hasher.band_keys(second)
+
+
+def test_near_duplicates_are_similar(hasher):
+    similarity = hasher.similarity(hasher.signature(ARTICLE), hasher.signature(EDITED))
+
+    assert similarity > 0.7
+    assert set(hasher.band_keys(hasher.signature(ARTICLE))) & set(hasher.band_keys(hasher.signature(EDITED)))
+
+
+def test_unrelated_texts_are_not_similar(hasher):
+    assert hasher.similarity(hasher.signature(ARTICLE), hasher.signature(UNRELATED)) < 0.1
+
+
+def test_signature_of_text_without_words(hasher):
+    assert hasher.signature("") is None
+    assert hasher.signature(None) is None
+    assert hasher.shingles("Short text") == {"short text"}
+
+
+def test_signature_binary_round_trip(hasher):
+    signature = hasher.signature(ARTICLE)
+    assert (MinHasher.from_binary(MinHasher.to_binary(signature)) == signature).all()
+
+
+def test_bands_must_divide_signature():
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=100, bands=32)
+
+
+def clusters(db):
+    return {article['_id']: (article[CLUSTER_FIELD], article[DUPLICATE_FIELD]) for article in db.articles.find()}
+
+
+def test_near_duplicates_join_the_cluster_of_the_oldest_article(db, hasher):
+    db.articles.insert_many([
+        {'_id': 1, 'content': ARTICLE},
+        {'_id': 2, 'content': UNRELATED},
+        {'_id': 3, 'content': EDITED}
+    ])
+
+    result = assign_duplicate_clusters(db.articles, CLUSTER_PENDING_QUERY, threshold=0.7, hasher=hasher)
+
+    assert result['processed'] == 3
+    assert result['duplicates'] == 1
+    assert clusters(db) == {1: (1, False), 2: (2, False), 3: (1, True)}
+
+
+def test_later_duplicate_joins_a_stored_cluster_and_gets_its_enrichment(db, hasher):
+    db.articles.insert_one({'_id': 1, 'content': ARTICLE})
+    assign_duplicate_clusters(db.articles, CLUSTER_PENDING_QUERY, threshold=0.7, hasher=hasher)
+    db.articles.update_one({'_id': 1}, {'$set': ENRICHMENT})
+    db.articles.insert_one({'_id': 2, 'content': EDITED})
+
+    result = assign_duplicate_clusters(db.articles, CLUSTER_PENDING_QUERY, threshold=0.7, hasher=hasher)
+
+    assert result['processed'] == 1
+    assert result['llm_calls_saved'] == 1
+    duplicate = db.articles.find_one({'_id': 2})
+    assert (duplicate[CLUSTER_FIELD], duplicate[DUPLICATE_FIELD]) == (1, True)
+    assert {field: duplicate[field] for field in ENRICHMENT_FIELDS} == ENRICHMENT
+
+
+def test_stored_clusters_of_newer_articles_are_not_joined(db, hasher):
+    # A backfilled article older than a clustered copy of it starts its own cluster
+    db.articles.insert_one({'_id': 2, 'content': ARTICLE})
+    assign_duplicate_clusters(db.articles, CLUSTER_PENDING_QUERY, threshold=0.7, hasher=hasher)
+    db.articles.insert_one({'_id': 1, 'content': EDITED})
+
+    assign_duplicate_clusters(db.articles, CLUSTER_PENDING_QUERY, threshold=0.7, hasher=hasher)
+
+    assert clusters(db) == {1: (1, False), 2: (2, False)}
+
+
+def test_copy_to_duplicates_counts_each_updated_duplicate_once(db):
+    db.articles.insert_many([
+        {'_id': 1, CLUSTER_FIELD: 1, DUPLICATE_FIELD: False, **ENRICHMENT},
+        {'_id': 2, CLUSTER_FIELD: 1, DUPLICATE_FIELD: True},
+        {'_id': 3, CLUSTER_FIELD: 1, DUPLICATE_FIELD: True, 'msbm_category': ENRICHMENT['msbm_category']},
+        {'_id': 4, CLUSTER_FIELD: 1, DUPLICATE_FIELD: True, **ENRICHMENT},
+        {'_id': 5, CLUSTER_FIELD: 5, DUPLICATE_FIELD: False},
+        {'_id': 6, CLUSTER_FIELD: 5, DUPLICATE_FIELD: True}
+    ])
+
+    assert copy_to_duplicates(db.articles, [1, 5], ENRICHMENT_FIELDS) == 2
+
+    for article_id in (2, 3):
+        assert {field: db.articles.find_one({'_id': article_id})[field] for field in ENRICHMENT_FIELDS} == ENRICHMENT
+    assert all(field not in db.articles.find_one({'_id': 6}) for field in ENRICHMENT_FIELDS)
+    assert copy_to_duplicates(db.articles, [1], ENRICHMENT_FIELDS) == 0
@@ -0,0 +1,85 @@
+# Python Imports
+import asyncio
+
+# Third Party Imports
+import httpx
+import pytest
+
+# Local Imports
+from server.service.news_articles.newscatcher_recorder import (
+    FaultInjector,
+    RecordedResponse,
+    ReplayMissError,
+    ReplayTransport,
+    ResponseStore,
+    canonical_params
+)
+
+
+def test_canonical_params_match_sdk_and_http():
+    sdk = {'q': 'abuse', 'from_': '365 days ago', 'page': 2, 'is_paid_content': False, 'countries': ['JM', 'TT'], 'lang': None}
+    http = {'q': 'abuse', 'from_': '365 days ago', 'page': '2', 'is_paid_content': 'false', 'countries': 'JM,TT'}
+
+    assert canonical_params(sdk) == http
+    assert ResponseStore.key("/api/search", sdk) == ResponseStore.key("/api/search", http)
+
+
+def test_canonical_params_keep_window_names():
+    assert set(canonical_params({'from_': '2024/01/01', 'to_': '2024/02/01'})) == {'from_', 'to_'}
+
+
+def test_response_store_round_trip(tmp_path):
+    store = ResponseStore(str(tmp_path))
+    body = {'total_pages': 1, 'articles': [{'link': 'https://example.com/a', 'title': 'A'}]}
+
+    store.save("/api/search", {'q': 'abuse', 'page': 1}, body)
+    record = store.load("/api/search", {'q': 'abuse', 'page': '1'})
+
+    assert record['status_code'] == 200
+    assert record['body'] == body
+    assert RecordedResponse(record['body']).articles[0].link == 'https://example.com/a'
+
+
+def test_response_store_miss(tmp_path):
+    with pytest.raises(ReplayMissError):
+        ResponseStore(str(tmp_path)).load("/api/search", {'q': 'never recorded'})
+
+
+def test_fault_injector_cadence():
+    faults = FaultInjector(latency=0, rate_limit_every=3)
+
+    limited = [faults.next_request() for _ in range(9)]
+
+    assert limited == [False, False, True] * 3
+    assert faults.requests == 9
+    assert faults.rate_limited == 3
+
+
+def test_fault_injector_disabled():
+    faults = FaultInjector(latency=0, rate_limit_every=0)
+    assert not any(faults.next_request() for _ in range(10))
+
+
+def test_replay_returns_recorded_links(recording, replay):
+    replayed = replay()
+
+    assert replayed['links'] == recording['per_keyword_links']
+    assert replayed['links']
+
+
+def test_replay_retries_injected_rate_limits(recording, replay):
+    faults = FaultInjector(latency=0, rate_limit_every=4, retry_after=0)
+
+    replayed = replay(faults)
+
+    assert faults.rate_limited > 0
+    assert replayed['collector'].rate_limited == faults.rate_limited
+    assert replayed['links'] == recording['per_keyword_links']
+
+
+def test_replay_miss_raises(recording):
+    transport = ReplayTransport(recording['store'], FaultInjector(latency=0, rate_limit_every=0))
+    request = httpx.Request("GET", "http://fake/api/search", params={'q': 'never recorded'})
+
+    with pytest.raises(ReplayMissError):
+        asyncio.run(transport.handle_async_request(request))
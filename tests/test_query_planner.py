@@ -0,0 +1,50 @@
+# Local Imports
+from server.service.news_articles.query_planner import OR_SEPARATOR, QueryPlanner, build_or_query, pack_keywords, quote_keyword
+
+
+def test_only_multi_word_keywords_are_quoted():
+    assert quote_keyword("abuse") == "abuse"
+    assert quote_keyword('gender "gap"') == '"gender gap"'
+    assert quote_keyword('gender  "gap" ') == '"gender gap"'
+    assert build_or_query(["abuse", "gender gap", "femicide"]) == 'abuse OR "gender gap" OR femicide'
+
+
+def test_single_keyword_query_is_bare():
+    assert build_or_query(["gender gap"]) == "gender gap"
+
+
+def test_pack_keywords_stays_within_max_length():
+    keywords = [f"keyword{index}" for index in range(50)]
+
+    batches = pack_keywords(keywords, 60)
+
+    assert [keyword for batch in batches for keyword in batch] == keywords
+    assert all(len(build_or_query(batch)) <= 60 for batch in batches)
+    assert len(batches) > 1
+
+
+def test_multi_word_keywords_get_their_own_batch():
+    batches = pack_keywords(["abuse", "gender gap", "femicide"], 400)
+    assert batches == [["gender gap"], ["abuse", "femicide"]]
+
+
+def test_plan_searches_shared_keywords_once():
+    planner = QueryPlanner(400)
+
+    batches = planner.plan({'en': ["abuse", "femicide"], 'es': ["abuse", "acoso"]})
+
+    keywords = [keyword for batch in batches for keyword in batch]
+    assert sorted(keywords) == ["abuse", "acoso", "femicide"]
+    assert planner.keyword_count == 3
+    assert OR_SEPARATOR.join(["abuse", "femicide"]) in [build_or_query(batch) for batch in batches]
+
+
+def test_planned_collection_matches_per_keyword(recording, replay):
+    planner = QueryPlanner(recording['planner'].max_length)
+
+    replayed = replay(planner=planner)
+
+    assert recording['planner'].splits > 0
+    assert planner.splits == recording['planner'].splits
+    assert replayed['links'] == recording['planned_links'] == recording['per_keyword_links']
+    assert replayed['collector'].requests_made < recording['per_keyword_requests']
@@ -0,0 +1,52 @@
+# Python Imports
+import asyncio
+import time
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from server.core.rate_limiter import AsyncTokenBucket
+
+
+def timed(coroutine) -> float:
+    started = time.monotonic()
+    asyncio.run(coroutine)
+    return time.monotonic() - started
+
+
+async def acquire(bucket: AsyncTokenBucket, count: int) -> None:
+    await asyncio.gather(*(bucket.acquire() for _ in range(count)))
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        AsyncTokenBucket(0)
+
+
+def test_burst_up_to_capacity_does_not_wait():
+    bucket = AsyncTokenBucket(rate=10, capacity=5)
+
+    assert timed(acquire(bucket, 5)) < 0.05
+
+
+def test_acquire_holds_the_rate_after_the_burst():
+    bucket = AsyncTokenBucket(rate=50, capacity=5)
+
+    # 5 tokens from the burst, the other 10 at 50 per second
+    elapsed = timed(acquire(bucket, 15))
+
+    assert 0.18 <= elapsed < 0.5
+
+
+def test_pause_holds_every_caller_back():
+    async def paused_acquire():
+        bucket = AsyncTokenBucket(rate=100, capacity=10)
+        bucket.pause(0.2)
+        bucket.pause(0.1)
+        await acquire(bucket, 3)
+
+    # The longer pause wins and no burst is allowed when it ends
+    elapsed = timed(paused_acquire())
+
+    assert 0.2 + 2 / 100 <= elapsed < 0.5
@@ -0,0 +1,52 @@
+# Local Imports
+from server.service.suggest_index import PrefixIndex, normalise_key
+
+ENTRIES = [
+    ("title", "Gender gap widens in Jamaica", "https://example.com/1"),
+    ("title", "Gender-based violence bill passed", "https://example.com/2"),
+    ("source", "gleaner.com", None),
+    ("source", "gleaner.com", None),
+    ("source", "gleanerjobs.com", None),
+    ("country", "Jamaica", None),
+    ("country", "Haïti", None),
+    ("title", "", None)
+]
+
+
+def test_normalise_key_strips_case_accents_and_spaces():
+    assert normalise_key("  Haïti   News ") == "haiti news"
+
+
+def test_lookup_ignores_case_and_accents():
+    index = PrefixIndex(ENTRIES)
+
+    assert [suggestion['value'] for suggestion in index.lookup("HAI")] == ["Haïti"]
+    assert [suggestion['value'] for suggestion in index.lookup("gend")] == [
+        "Gender gap widens in Jamaica",
+        "Gender-based violence bill passed"
+    ]
+
+
+def test_lookup_ranks_by_count_and_type():
+    index = PrefixIndex(ENTRIES)
+
+    suggestions = index.lookup("gle")
+
+    assert suggestions == [
+        {"type": "source", "value": "gleaner.com", "count": 2},
+        {"type": "source", "value": "gleanerjobs.com", "count": 1}
+    ]
+    assert index.lookup("ja")[0] == {"type": "country", "value": "Jamaica", "count": 1}
+
+
+def test_lookup_filters_types_and_limits():
+    index = PrefixIndex(ENTRIES)
+
+    assert index.lookup("ja", types=["title"]) == []
+    assert len(index.lookup("g", limit=1)) == 1
+    assert index.lookup("   ") == []
+    assert index.lookup("gender gap")[0]['link'] == "https://example.com/1"
+
+
+def test_empty_values_are_skipped():
+    assert len(PrefixIndex(ENTRIES)) == 6